@@ -0,0 +1 @@
+"""Benchmarks for the chr_pipeline stages (python -m benchmarks.run)."""
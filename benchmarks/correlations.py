@@ -0,0 +1,67 @@
+"""
+Time correlations.correlate() against a per-group pandas .corr() loop
+
+    python -m benchmarks.correlations
+    python -m benchmarks.correlations --csv data/county_health_data.csv --repeat 5
+
+Both sides compute the same national-year and (year, state) Pearson and
+Spearman matrices; the largest difference between them is printed with
+the timings, so a speedup never comes from a different answer.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from chr_pipeline import correlations
+from chr_pipeline.converter import metric_columns
+
+DATASET = 'data/county_health_data.csv'
+
+
+def pandas_correlate(df, metrics, method, min_pairs=correlations.MIN_PAIRS):
+    """One DataFrame.corr() per group, in correlate()'s group order."""
+    matrices = []
+    for keys in (['year'], ['year', 'state']):
+        for _, group in df.groupby(keys, sort=True):
+            matrices.append(group[metrics].corr(method, min_periods=min_pairs).to_numpy())
+    return np.stack(matrices)
+
+
+def _timed(fn, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        seconds.append(time.perf_counter() - start)
+    return value, statistics.median(seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.correlations',
+                                     description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=DATASET)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.csv, dtype={'fips': str})
+    metrics = metric_columns(df)
+    patterns = len(np.unique(df[metrics].notna().to_numpy().T, axis=0))
+    print(f"{len(df):,} rows x {len(metrics)} metrics, {patterns} missingness patterns")
+
+    result, ours = _timed(lambda: correlations.correlate(df, metrics), args.repeat)
+    print(f"  {'correlate()':24s} {ours:8.3f}s  (Pearson + Spearman)")
+    total = 0.0
+    for method in ('pearson', 'spearman'):
+        expected, seconds = _timed(lambda: pandas_correlate(df, metrics, method), args.repeat)
+        total += seconds
+        diff = np.nanmax(np.abs(result[method] - expected))
+        print(f"  {'pandas ' + method:24s} {seconds:8.3f}s  max |diff| {diff:.1e}")
+    print(f"  speedup {total / ours:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Time each pipeline stage on synthetic inputs at several scales
+
+    python -m benchmarks.run --counties 3143 20000 --years 5 --measures 7 30
+    python -m benchmarks.run --baseline benchmarks/results/previous.json
+
+For every (counties, years, measures) point a workbook and PLACES releases
+are generated into --work-dir, then each stage runs `--repeat` times in a
+fresh process. Stage inputs are handed over as pickles loaded before the
+clock starts; a stage whose input stage isn't selected gets it built first,
+untimed. A spawned process inherits its parent's ru_maxrss, so the child
+resets the RSS high-water mark (VmHWM) once its inputs are loaded and
+reports that, or the peak of any worker process if higher; off Linux it
+falls back to ru_maxrss. Results go to one JSON file; with --baseline,
+stages slower than the baseline by more than --tolerance are listed and
+the exit code is 1.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from chr_pipeline.profiling import _proc_status, _reset_peak
+
+from . import synthetic
+
+WORK_DIR = 'benchmarks/work'
+RESULTS_FILE = 'benchmarks/results/latest.json'
+STAGES = ['convert', 'integrate', 'write', 'figures', 'models']
+# The stage whose pickled output each stage reads
+REQUIRES = {'integrate': 'convert', 'write': 'integrate', 'figures': 'integrate', 'models': 'integrate'}
+
+
+def _peak_rss_mb(can_reset):
+    # ru_maxrss is KiB on Linux; RUSAGE_CHILDREN covers the stage's own workers
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    if can_reset:
+        return max(_proc_status('VmHWM') or 0, children)
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, children)
+
+
+def plan_stages(stages):
+    """(stage, timed) in pipeline order, adding the untimed prerequisites of `stages`."""
+    needed = set(stages)
+    for stage in reversed(STAGES):
+        if stage in needed and stage in REQUIRES:
+            needed.add(REQUIRES[stage])
+    return [(stage, stage in stages) for stage in STAGES if stage in needed]
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence stdout at the descriptor level, so worker processes' prints go too."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def _load(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def _dump(value, path):
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def run_stage(stage, work, jobs):
+    """Run one stage in this (fresh) process; returns its measurements."""
+    from chr_pipeline import converter, pipeline, places
+
+    paths = _load(os.path.join(work, 'inputs.pkl'))
+    if stage == 'integrate':
+        chr_df = _load(os.path.join(work, 'convert.pkl'))
+    elif stage in ('write', 'figures', 'models'):
+        combined_df = _load(os.path.join(work, 'integrate.pkl'))
+    can_reset = _reset_peak()
+    rss_before = _proc_status('VmRSS') if can_reset else _peak_rss_mb(False)
+
+    # The stages (and their workers) print progress; keep it out of the benchmark output
+    with _quiet():
+        wall, cpu = time.perf_counter(), time.process_time()
+        if stage == 'convert':
+            out = converter.convert(paths['workbook'])
+            rows_in, bytes_in = paths['workbook_rows'], os.path.getsize(paths['workbook'])
+        elif stage == 'integrate':
+            out = places.integrate(places.chr_baseline(chr_df), paths['file_mapping'], jobs=jobs)
+            rows_in = sum(paths['places_rows'].values())
+            bytes_in = sum(os.path.getsize(p) for _, p in paths['file_mapping'].values())
+        elif stage == 'write':
+            out = combined_df
+            csv_path = os.path.join(work, 'dataset.csv')
+            pipeline.write_dataset(combined_df, csv_path)
+            rows_in, bytes_in = len(combined_df), os.path.getsize(csv_path)
+        elif stage == 'figures':
+            from chr_pipeline.analysis import render_figures
+            out = combined_df
+            render_figures(combined_df, os.path.join(work, 'figures'), jobs=jobs, force=True)
+            rows_in, bytes_in = len(combined_df), 0
+        elif stage == 'models':
+            from chr_pipeline import models
+            out = combined_df
+            models.train_all(combined_df, out_dir=os.path.join(work, 'models'), workers=jobs, force=True)
+            rows_in, bytes_in = len(combined_df), 0
+        seconds = time.perf_counter() - wall
+        cpu_seconds = time.process_time() - cpu
+
+    peak = _peak_rss_mb(can_reset)
+    if stage in ('convert', 'integrate'):
+        _dump(out, os.path.join(work, f'{stage}.pkl'))
+    return {
+        'seconds': seconds,
+        'cpu_seconds': cpu_seconds,
+        'peak_rss_mb': round(peak, 1),
+        'rss_growth_mb': round(peak - rss_before, 1),
+        'rows_in': int(rows_in),
+        'rows_out': int(len(out)),
+        'bytes_in': int(bytes_in),
+    }
+
+
+def _in_child(stage, work, jobs):
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_stage, stage, work, jobs).result()
+
+
+def bench_point(n_counties, n_years, measures, stages, repeat, jobs, work_dir, seed=0):
+    """Generate inputs for one scale point and time every stage on them."""
+    work = os.path.join(work_dir, f'c{n_counties}_y{n_years}_m{measures}')
+    start = time.perf_counter()
+    workbook, file_mapping, places_rows = synthetic.generate(work, n_counties, n_years, measures, seed)
+    generate_seconds = time.perf_counter() - start
+    states = len(synthetic.make_counties(n_counties)['state'].unique())
+    _dump({
+        'workbook': workbook,
+        # Both sheets: national row + state rollups + counties
+        'workbook_rows': 2 * (1 + states + n_counties),
+        'file_mapping': file_mapping,
+        'places_rows': places_rows,
+    }, os.path.join(work, 'inputs.pkl'))
+
+    results = {}
+    for stage, timed in plan_stages(stages):
+        if not timed:
+            _in_child(stage, work, jobs)
+            print(f"    {stage:10s} (built as input, not timed)")
+            continue
+        runs = [_in_child(stage, work, jobs) for _ in range(repeat)]
+        seconds = [r['seconds'] for r in runs]
+        best = statistics.median(seconds)
+        result = dict(runs[0], seconds=round(best, 4), min_seconds=round(min(seconds), 4),
+                      all_seconds=[round(s, 4) for s in seconds],
+                      cpu_seconds=round(statistics.median(r['cpu_seconds'] for r in runs), 4),
+                      peak_rss_mb=max(r['peak_rss_mb'] for r in runs))
+        result['rows_per_second'] = round(result['rows_in'] / best) if best else None
+        result['mb_per_second'] = round(result['bytes_in'] / 1e6 / best, 2) if best else None
+        results[stage] = result
+        print(f"    {stage:10s} {best:8.3f}s  {result['peak_rss_mb']:8.1f} MB peak  "
+              f"{result['rows_per_second'] or 0:>12,} rows/s")
+    return {
+        'counties': n_counties,
+        'years': n_years,
+        'measures': measures,
+        'jobs': jobs,
+        'generate_seconds': round(generate_seconds, 3),
+        'stages': results,
+    }
+
+
+def _point_key(point):
+    return (point['counties'], point['years'], point['measures'], point['jobs'])
+
+
+def compare(results, baseline, tolerance):
+    """Stages slower than the baseline by more than `tolerance`, as printable lines."""
+    previous = {_point_key(p): p for p in baseline['points']}
+    regressions = []
+    for point in results['points']:
+        old = previous.get(_point_key(point))
+        if old is None:
+            continue
+        for stage, result in point['stages'].items():
+            if stage not in old['stages'] or not old['stages'][stage]['seconds']:
+                continue
+            ratio = result['seconds'] / old['stages'][stage]['seconds']
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{stage} at {point['counties']:,} counties x {point['years']} years x "
+                    f"{point['measures']} measures: {old['stages'][stage]['seconds']:.3f}s -> "
+                    f"{result['seconds']:.3f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counties', type=int, nargs='+', default=[3143])
+    parser.add_argument('--years', type=int, nargs='+', default=[5], help='PLACES releases to generate')
+    parser.add_argument('--measures', type=int, nargs='+', default=[len(synthetic.PLACES_MAPPING)],
+                        help='PLACES measures per release (mapped ones first, the rest filler)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES[:3])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=1, help='passed to integrate, figures and models (0 = all cores)')
+    parser.add_argument('--work-dir', default=WORK_DIR)
+    parser.add_argument('--out', default=RESULTS_FILE)
+    parser.add_argument('--baseline', help='earlier results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before flagging')
+    args = parser.parse_args(argv)
+
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'points': [],
+    }
+    for n_counties, n_years, measures in itertools.product(args.counties, args.years, args.measures):
+        print(f"\n[{n_counties:,} counties x {n_years} years x {measures} measures]")
+        results['points'].append(bench_point(n_counties, n_years, measures, args.stages,
+                                             args.repeat, args.jobs, args.work_dir))
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=1)
+    print(f"\n[OK] Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"  [REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"  No stage slower than baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Synthetic CHR workbooks and PLACES release CSVs at any scale
+
+The files have the shapes the pipeline reads:
+
+    workbook   'Select Measure Data' and 'Additional Measure Data' sheets,
+               group labels on row 0, column names on row 1, a national
+               row (00000) and one rollup row per state (xx000), then one
+               row per county with every mapped column plus filler columns.
+    PLACES     one CSV per release with the real column set, two BRFSS
+               years per release, crude and age-adjusted rows, the mapped
+               measures plus unmapped filler measures. The 2020 release
+               has no LocationID column, like the real file.
+
+Counties are spread over the 50 states + DC with real state FIPS codes;
+past 998 per state (~51k) further units use the unused 2-digit prefixes
+up to 99 with synthetic state names, which reaches tract-level counts
+(~85k). Names of those synthetic states are not in state_abbr_map, so the
+2020 release's name match only covers the real states.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from chr_pipeline.converter import SHEETS, metrics_mapping
+from chr_pipeline.places import PLACES_MAPPING, state_abbr_map
+
+STATE_FIPS = {
+    'Alabama': '01', 'Alaska': '02', 'Arizona': '04', 'Arkansas': '05', 'California': '06',
+    'Colorado': '08', 'Connecticut': '09', 'Delaware': '10', 'District of Columbia': '11',
+    'Florida': '12', 'Georgia': '13', 'Hawaii': '15', 'Idaho': '16', 'Illinois': '17',
+    'Indiana': '18', 'Iowa': '19', 'Kansas': '20', 'Kentucky': '21', 'Louisiana': '22',
+    'Maine': '23', 'Maryland': '24', 'Massachusetts': '25', 'Michigan': '26', 'Minnesota': '27',
+    'Mississippi': '28', 'Missouri': '29', 'Montana': '30', 'Nebraska': '31', 'Nevada': '32',
+    'New Hampshire': '33', 'New Jersey': '34', 'New Mexico': '35', 'New York': '36',
+    'North Carolina': '37', 'North Dakota': '38', 'Ohio': '39', 'Oklahoma': '40', 'Oregon': '41',
+    'Pennsylvania': '42', 'Rhode Island': '44', 'South Carolina': '45', 'South Dakota': '46',
+    'Tennessee': '47', 'Texas': '48', 'Utah': '49', 'Vermont': '50', 'Virginia': '51',
+    'Washington': '53', 'West Virginia': '54', 'Wisconsin': '55', 'Wyoming': '56',
+}
+
+COUNTIES_PER_STATE = 998
+MAX_COUNTIES = 99 * COUNTIES_PER_STATE
+FIRST_DATA_YEAR = 2018
+
+_SYLLABLES = ['Ash', 'Bel', 'Cor', 'Dun', 'El', 'Fair', 'Glen', 'Har', 'Ith', 'Jas',
+              'Kel', 'Lin', 'Mar', 'Nor', 'Oak', 'Pem', 'Quin', 'Ros', 'Sal', 'Tam']
+
+
+def _states():
+    """(name, abbr, fips prefix) for every prefix the generator may use."""
+    states = [(name, state_abbr_map[name], code) for name, code in STATE_FIPS.items()]
+    used = set(STATE_FIPS.values())
+    for prefix in range(1, 100):
+        code = f'{prefix:02d}'
+        if code not in used:
+            states.append((f'Synthetic {code}', f'X{code}', code))
+    return states
+
+
+def make_counties(n_counties, seed=0):
+    """fips/county/state/abbr for `n_counties` units, spread round-robin over states."""
+    if n_counties > MAX_COUNTIES:
+        raise ValueError(f'at most {MAX_COUNTIES:,} units fit in 5-digit FIPS codes')
+    states = _states()
+    n_states = len(STATE_FIPS) if n_counties <= len(STATE_FIPS) * COUNTIES_PER_STATE else len(states)
+    i = np.arange(n_counties)
+    state_idx, county_no = i % n_states, i // n_states + 1
+
+    rng = np.random.default_rng(seed)
+    first = rng.integers(0, len(_SYLLABLES), n_counties)
+    second = rng.integers(0, len(_SYLLABLES), n_counties)
+    names = [f'{_SYLLABLES[a]}{_SYLLABLES[b].lower()} {n}' for a, b, n in zip(first, second, county_no)]
+    return pd.DataFrame({
+        'fips': [f'{states[s][2]}{c:03d}' for s, c in zip(state_idx, county_no)],
+        'county': names,
+        'state': [states[s][0] for s in state_idx],
+        'abbr': [states[s][1] for s in state_idx],
+    })
+
+
+def _sheet_rows(counties, columns, rng):
+    """Key and value frames: national row, state rollups, then counties."""
+    rollups = counties.drop_duplicates('state')
+    keys = pd.concat([
+        pd.DataFrame({'FIPS': ['00000'], 'State': ['United States'], 'County': [None]}),
+        pd.DataFrame({'FIPS': rollups['fips'].str[:2] + '000', 'State': rollups['state'], 'County': None}),
+        pd.DataFrame({'FIPS': counties['fips'], 'State': counties['state'], 'County': counties['county']}),
+    ], ignore_index=True)
+    values = rng.uniform(1, 100, (len(keys), len(columns))).round(1)
+    # Suppressed cells show up as blanks in the real workbook
+    values[rng.random(values.shape) < 0.03] = np.nan
+    return keys, pd.DataFrame(values, columns=columns)
+
+
+def write_workbook(path, counties, measures=0, seed=0):
+    """CHR-style workbook: every mapped column plus `measures` filler columns per sheet."""
+    rng = np.random.default_rng(seed)
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for key, sheet_name in SHEETS.items():
+            columns = list(metrics_mapping[key]) + [f'Filler Measure {k}' for k in range(measures)]
+            keys, values = _sheet_rows(counties, columns, rng)
+            header = list(keys.columns) + columns
+            groups = ['', '', ''] + ['Synthetic measures'] * len(columns)
+            body = pd.concat([keys, values], axis=1)
+            frame = pd.DataFrame([groups, header], columns=header)
+            pd.concat([frame, body.astype(object)], ignore_index=True).to_excel(
+                writer, sheet_name=sheet_name, header=False, index=False)
+    return path
+
+
+def places_rows(counties, data_year, measures, rng):
+    """Long PLACES rows for one release: 2 years x measures x 2 value types."""
+    names = list(PLACES_MAPPING) + [f'Filler measure {k} among adults'
+                                    for k in range(max(0, measures - len(PLACES_MAPPING)))]
+    names = names[:max(measures, 1)]
+    n = len(counties)
+    frames = []
+    for year in (data_year - 1, data_year):
+        for m, measure in enumerate(names):
+            for type_id, value_type in (('CrdPrv', 'Crude prevalence'), ('AgeAdjPrv', 'Age-adjusted prevalence')):
+                value = rng.uniform(5, 45, n).round(1)
+                frames.append(pd.DataFrame({
+                    'Year': year,
+                    'StateAbbr': counties['abbr'].to_numpy(),
+                    'StateDesc': counties['state'].to_numpy(),
+                    'LocationName': counties['county'].to_numpy(),
+                    'DataSource': 'BRFSS',
+                    'Category': 'Health Outcomes',
+                    'Measure': measure,
+                    'Data_Value_Unit': '%',
+                    'Data_Value_Type': value_type,
+                    'Data_Value': value,
+                    'Low_Confidence_Limit': (value - 1.5).round(1),
+                    'High_Confidence_Limit': (value + 1.5).round(1),
+                    'TotalPopulation': rng.integers(1_000, 1_000_000, n),
+                    'LocationID': counties['fips'].to_numpy(),
+                    'CategoryID': 'HLTHOUT',
+                    'MeasureId': f'M{m:02d}',
+                    'DataValueTypeID': type_id,
+                    'Geolocation': 'POINT (-86.6 32.5)',
+                }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_places_release(path, counties, data_year, measures=len(PLACES_MAPPING), seed=0):
+    """One release CSV; returns the number of rows written."""
+    rows = places_rows(counties, data_year, measures, np.random.default_rng(seed + data_year))
+    if data_year == FIRST_DATA_YEAR:
+        # The 2020 release identifies counties by name only
+        rows = rows.drop(columns='LocationID')
+    rows.to_csv(path, index=False)
+    return len(rows)
+
+
+def generate(out_dir, n_counties, n_years=5, measures=len(PLACES_MAPPING), seed=0):
+    """Write a workbook and `n_years` releases; returns (workbook, file_mapping, rows)."""
+    os.makedirs(out_dir, exist_ok=True)
+    counties = make_counties(n_counties, seed)
+    workbook = write_workbook(os.path.join(out_dir, 'chr_synthetic.xlsx'), counties,
+                              max(0, measures - len(PLACES_MAPPING)), seed)
+    file_mapping, rows = {}, {}
+    for data_year in range(FIRST_DATA_YEAR, FIRST_DATA_YEAR + n_years):
+        release = f'{data_year + 2}_release'
+        path = os.path.join(out_dir, f'places_{release}.csv')
+        rows[data_year] = write_places_release(path, counties, data_year, measures, seed)
+        file_mapping[data_year] = (release, path)
+    return workbook, file_mapping, rows
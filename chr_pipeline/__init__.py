@@ -0,0 +1,30 @@
+"""
+County Health Rankings data pipeline
+
+Stages are plain functions that take and return DataFrames, so they can be
+chained in memory (see `run`) or driven from `python -m chr_pipeline`.
+"""
+
+from .cache import BuildCache
+from .converter import convert, load_chr, normalize_fips
+from .cube import MetricCube, build_cube
+from .places import integrate, load_releases, read_places_release
+from .pipeline import read_dataset, run, write_dataset
+from .store import load_wide, write_store
+
+__all__ = [
+    'BuildCache',
+    'MetricCube',
+    'build_cube',
+    'convert',
+    'integrate',
+    'load_chr',
+    'load_releases',
+    'load_wide',
+    'normalize_fips',
+    'read_dataset',
+    'read_places_release',
+    'run',
+    'write_dataset',
+    'write_store',
+]
@@ -0,0 +1,283 @@
+"""
+Exploratory Analysis for County Health Rankings Data
+Creates 6 static visualizations to inform the research question
+
+Each figure is declared in FIGURES with the columns it reads and a render
+function; figures.py turns (figure, year, state) into jobs, skips the ones
+whose inputs and spec are unchanged and renders the rest in a process pool.
+matplotlib is imported inside the render functions, and seaborn/sklearn
+only by the figures that use them, so processes load what they draw with.
+"""
+
+import os
+
+import pandas as pd
+
+from . import models
+from .correlations import pairwise_pearson
+from .figures import FigureSpec
+
+FIGURES_DIR = 'exploratory_figures'
+DPI = 300
+
+# sns.set_style("whitegrid"), without importing seaborn in every process
+WHITEGRID = {
+    'figure.facecolor': 'white', 'axes.facecolor': 'white', 'axes.edgecolor': '.8',
+    'axes.grid': True, 'axes.axisbelow': True, 'axes.labelcolor': '.15',
+    'grid.color': '.8', 'grid.linestyle': '-', 'text.color': '.15',
+    'xtick.color': '.15', 'ytick.color': '.15', 'xtick.direction': 'out', 'ytick.direction': 'out',
+    'xtick.top': False, 'ytick.right': False, 'xtick.bottom': False, 'ytick.left': False,
+    'font.family': ['sans-serif'],
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans', 'sans-serif'],
+    'lines.solid_capstyle': 'round', 'patch.edgecolor': 'w', 'patch.force_edgecolor': True,
+    'axes.spines.left': True, 'axes.spines.bottom': True, 'axes.spines.right': True, 'axes.spines.top': True,
+}
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    plt.rcParams.update(WHITEGRID)
+    plt.rcParams['figure.figsize'] = (10, 6)
+    return plt
+
+
+def _save(plt, path):
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches='tight')
+    plt.close()
+
+
+# ========================================
+# GRAPH 1: Correlation Heatmap
+# ========================================
+# Select key metrics for correlation
+metrics_for_corr = [
+    'life_expectancy', 'premature_death', 'adult_obesity',
+    'adult_smoking', 'physical_inactivity', 'diabetes',
+    'median_income', 'hs_graduation',
+    'uninsured', 'primary_care_rate', 'poor_health'
+]
+
+
+def correlation_heatmap(df, path, year, scope):
+    plt = _pyplot()
+    import seaborn as sns
+
+    # Same pairwise-complete Pearson as .corr(), via the batched engine
+    r, _ = pairwise_pearson(df[metrics_for_corr].to_numpy(dtype=float))
+    corr_data = pd.DataFrame(r, index=metrics_for_corr, columns=metrics_for_corr)
+
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(corr_data, annot=True, fmt='.2f', cmap='coolwarm',
+                center=0, square=True, linewidths=1,
+                cbar_kws={"shrink": 0.8})
+    plt.title(f'Correlation Between Health Outcomes and Socioeconomic Factors\n'
+              f'({scope + ", " if scope != "U.S." else ""}{year} County Health Rankings Data)',
+              fontsize=14, fontweight='bold', pad=20)
+    _save(plt, path)
+
+
+# ========================================
+# GRAPH 2: Income vs Life Expectancy Scatter
+# ========================================
+def income_life_expectancy(df, path, year, scope):
+    plt = _pyplot()
+
+    plt.figure(figsize=(12, 7))
+    scatter = plt.scatter(df['median_income'], df['life_expectancy'],
+                          c=df['hs_graduation'], cmap='viridis',
+                          alpha=0.6, s=30, edgecolors='black', linewidth=0.3)
+    plt.colorbar(scatter, label='High School Graduation Rate (%)')
+    plt.xlabel('Median Household Income ($)', fontsize=12, fontweight='bold')
+    plt.ylabel('Life Expectancy (years)', fontsize=12, fontweight='bold')
+    plt.title(f'Income and Education as Predictors of Life Expectancy\n'
+              f'Each point = one {scope} county (n={len(df):,}), {year}',
+              fontsize=14, fontweight='bold', pad=15)
+    plt.grid(True, alpha=0.3)
+    _save(plt, path)
+
+
+# ========================================
+# GRAPH 3: Distribution of Life Expectancy by Income Quartile
+# ========================================
+def life_expectancy_by_income(df, path, year, scope):
+    plt = _pyplot()
+    import seaborn as sns
+
+    # Create income quartiles
+    df = df.assign(income_quartile=pd.qcut(df['median_income'], q=4,
+                                           labels=['Q1 (Lowest)', 'Q2', 'Q3', 'Q4 (Highest)']))
+
+    plt.figure(figsize=(12, 7))
+    sns.violinplot(data=df, x='income_quartile', y='life_expectancy', hue='income_quartile',
+                   palette='Set2', inner='box', legend=False)
+    plt.xlabel('Income Quartile', fontsize=12, fontweight='bold')
+    plt.ylabel('Life Expectancy (years)', fontsize=12, fontweight='bold')
+    plt.title(f'Life Expectancy Varies Dramatically by County Income Level\n'
+              f'Distribution across {len(df):,} {scope} Counties, {year}',
+              fontsize=14, fontweight='bold', pad=15)
+    plt.grid(True, alpha=0.3, axis='y')
+    _save(plt, path)
+
+
+# ========================================
+# GRAPH 4: Healthcare Access vs Health Outcomes
+# ========================================
+def healthcare_access_mortality(df, path, year, scope):
+    plt = _pyplot()
+
+    plt.figure(figsize=(12, 7))
+    scatter = plt.scatter(df['primary_care_rate'], df['premature_death'],
+                          c=df['uninsured'], cmap='YlOrRd',
+                          alpha=0.6, s=30, edgecolors='black', linewidth=0.3)
+    plt.colorbar(scatter, label='Uninsured Rate (%)')
+    plt.xlabel('Primary Care Physicians (per 100k residents)', fontsize=12, fontweight='bold')
+    plt.ylabel('Premature Death Rate (per 100k)', fontsize=12, fontweight='bold')
+    plt.title(f'Healthcare Access and Insurance Coverage Impact Mortality\n{scope} Counties, {year}',
+              fontsize=14, fontweight='bold', pad=15)
+    plt.grid(True, alpha=0.3)
+    _save(plt, path)
+
+
+# ========================================
+# GRAPH 5: Health Behaviors Comparison
+# ========================================
+behaviors = ['adult_obesity', 'adult_smoking', 'physical_inactivity', 'diabetes', 'excessive_drinking']
+
+
+def health_behaviors(df, path, year, scope):
+    plt = _pyplot()
+
+    # Calculate mean values for each behavior
+    behavior_means = df[behaviors].mean()
+    behavior_std = df[behaviors].std()
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    ax.bar(range(len(behaviors)), behavior_means, yerr=behavior_std,
+           capsize=5, alpha=0.7, color=['#e74c3c', '#e67e22', '#f39c12', '#9b59b6', '#3498db'],
+           edgecolor='black', linewidth=1.5)
+    ax.set_xticks(range(len(behaviors)))
+    ax.set_xticklabels(['Adult Obesity', 'Adult Smoking', 'Physical Inactivity', 'Diabetes', 'Excessive Drinking'],
+                       fontsize=11, fontweight='bold')
+    ax.set_ylabel('Prevalence (%)', fontsize=12, fontweight='bold')
+    ax.set_title(f'Prevalence of Health Risk Behaviors Across {scope} Counties\n'
+                 f'Mean ± Standard Deviation ({year})',
+                 fontsize=14, fontweight='bold', pad=15)
+    ax.grid(True, alpha=0.3, axis='y')
+    _save(plt, path)
+
+
+# ========================================
+# GRAPH 6: Multiple Regression - Feature Importance
+# ========================================
+# Prepare data for modeling
+features = models.FEATURE_SETS['all']
+
+
+def _model_data(df):
+    """Complete rows of the figure's features and target, as the model sees them."""
+    return df.dropna().reset_index(drop=True)
+
+
+def _model_features(df):
+    return [c for c in df.columns if c != models.TARGET]
+
+
+def importance_model_key(df):
+    """Key of the model figure 6 draws, so a retrained model re-renders it."""
+    return models.model_key(_model_data(df), _model_features(df))
+
+
+def feature_importance(df, path, year, scope):
+    plt = _pyplot()
+    from matplotlib.patches import Patch
+
+    # Cross-validated forest from the model store, trained there first if missing;
+    # the features are whatever the spec's columns hold besides the target
+    features = _model_features(df)
+    result = models.fit_cached(_model_data(df), features)
+
+    # Drop in held-out R² when each feature is shuffled
+    importance = pd.DataFrame({
+        'feature': features,
+        'importance': result['permutation_mean'],
+        'std': result['permutation_std'],
+    }).sort_values('importance', ascending=True)
+
+    plt.figure(figsize=(12, 7))
+    colors = ['#3498db' if f in models.FEATURE_SETS['socioeconomic']
+              else '#e74c3c' for f in importance['feature']]
+    plt.barh(range(len(importance)), importance['importance'], xerr=importance['std'], color=colors,
+             edgecolor='black', linewidth=1.5, capsize=4)
+    labels = {'median_income': 'Median Income', 'uninsured': 'Uninsured Rate',
+              'primary_care_rate': 'Primary Care Access', 'adult_obesity': 'Adult Obesity',
+              'adult_smoking': 'Adult Smoking', 'physical_inactivity': 'Physical Inactivity',
+              'diabetes': 'Diabetes', 'hs_graduation': 'HS Graduation',
+              'excessive_drinking': 'Excessive Drinking'}
+    plt.yticks(range(len(importance)),
+               [labels.get(f, f.replace('_', ' ').title()) for f in importance['feature']])
+    plt.xlabel('Permutation Importance (drop in held-out R²)', fontsize=12, fontweight='bold')
+    plt.title('Socioeconomic Factors Are Strongest Predictors of Life Expectancy\n'
+              'Random Forest Model ({}-fold CV R² = {:.3f} ± {:.3f}), {} {}'.format(
+                  len(result['cv_r2']), result['cv_r2_mean'], result['cv_r2_std'], scope, year),
+              fontsize=14, fontweight='bold', pad=15)
+    plt.grid(True, alpha=0.3, axis='x')
+
+    # Add legend
+    legend_elements = [Patch(facecolor='#3498db', label='Socioeconomic/Healthcare'),
+                       Patch(facecolor='#e74c3c', label='Health Behaviors')]
+    plt.legend(handles=legend_elements, loc='lower right')
+    _save(plt, path)
+
+
+FIGURES = [
+    FigureSpec('1_correlation_heatmap', correlation_heatmap, metrics_for_corr, min_rows=3, version=2),
+    FigureSpec('2_income_life_expectancy', income_life_expectancy,
+               ['median_income', 'life_expectancy', 'hs_graduation']),
+    FigureSpec('3_life_expectancy_by_income', life_expectancy_by_income,
+               ['median_income', 'life_expectancy'], min_rows=8, complete=True),
+    FigureSpec('4_healthcare_access_mortality', healthcare_access_mortality,
+               ['primary_care_rate', 'premature_death', 'uninsured']),
+    FigureSpec('5_health_behaviors', health_behaviors, behaviors, min_rows=2),
+    FigureSpec('6_feature_importance', feature_importance, features + ['life_expectancy'],
+               min_rows=models.MIN_ROWS, complete=True, version=3, key=importance_model_key),
+]
+
+
+def render_figures(df, out_dir=FIGURES_DIR, year=2024, years=None, states=None, jobs=1, force=False):
+    """Render the six exploratory figures; unchanged ones are skipped.
+
+    With only `year`, the national figures go straight into `out_dir` as
+    before. `years` and/or `states` (names, or 'all') add one set per
+    (year, state) under out_dir/<year>/<state>/.
+    """
+    from .figures import plan_jobs, run_jobs
+
+    df_year = df[df['year'] == year]
+    print(f"Total counties: {len(df_year)}")
+    print(f"Available metrics: {df_year.columns.tolist()}")
+
+    if states in ('all', ['all']):
+        states = sorted(df['state'].dropna().unique())
+    flat = years is None and not states
+    jobs_list = plan_jobs(df, FIGURES, years or [year], [None] + list(states or []), out_dir, flat=flat)
+    results = run_jobs(jobs_list, out_dir, workers=jobs, force=force)
+
+    # ========================================
+    # Summary Statistics
+    # ========================================
+    print("\n" + "="*60)
+    print("EXPLORATORY ANALYSIS COMPLETE")
+    print("="*60)
+    print(f"\nGenerated {sum(r['status'] == 'rendered' for r in results)} figures in '{out_dir}/' "
+          f"({sum(r['status'] == 'unchanged' for r in results)} unchanged, "
+          f"{sum(r['status'] == 'skipped' for r in results)} skipped)")
+    print(f"\nKey Findings:")
+    print(f"   • Income strongly correlates with life expectancy (r = {df_year['median_income'].corr(df_year['life_expectancy']):.3f})")
+    print(f"   • Life expectancy range: {df_year['life_expectancy'].min():.1f} - {df_year['life_expectancy'].max():.1f} years")
+    print(f"   • Income range: ${df_year['median_income'].min():.0f} - ${df_year['median_income'].max():.0f}")
+    print(f"   • Counties analyzed: {len(df_year):,}")
+    print("\n" + "="*60)
+    return results
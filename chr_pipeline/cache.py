@@ -0,0 +1,209 @@
+"""
+Content-hashed incremental build cache for the data pipeline
+
+Entries are keyed by the SHA-256 of their source files plus the mapping
+config that shaped them, stored as pickles (fast binary, keeps dtypes) and
+tracked in a JSON manifest. The cache is evicted least-recently-used first
+once it grows past its size budget.
+
+Several processes may share one cache directory (parallel stages, two CLI
+runs). Every manifest write happens under an exclusive lock on
+`manifest.lock`: the on-disk manifest is re-read, this process's changes
+are merged into it, and the result is written to a temporary file and
+renamed into place, so no writer drops another's entries and a reader
+never sees a half-written manifest. Where fcntl is unavailable the lock is
+skipped and only the atomic rename remains.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+CACHE_DIR = 'data/.cache'
+MAX_BYTES = 2 * 1024 ** 3
+MANIFEST = 'manifest.json'
+LOCK_FILE = 'manifest.lock'
+BLOCK_SIZE = 1 << 20
+
+
+def config_digest(config):
+    """Stable hash of a JSON-able config (dict key order does not matter)."""
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def frame_digest(df):
+    """SHA-256 of a DataFrame's column names and values (index ignored)."""
+    import pandas as pd
+    digest = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    """On-disk cache of parsed intermediates under `root`."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.manifest_path = os.path.join(root, MANIFEST)
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._read()
+        # Keys this process added/used or dropped since its last save()
+        self._touched, self._removed = set(), set()
+
+    def _read(self):
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault('entries', {})
+        manifest.setdefault('digests', {})
+        return manifest
+
+    @contextmanager
+    def _locked(self):
+        """Hold the manifest lock; other processes' saves wait for it."""
+        with open(os.path.join(self.root, LOCK_FILE), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @property
+    def entries(self):
+        return self.manifest['entries']
+
+    def source_digest(self, path):
+        """File digest, memoized on (size, mtime) so unchanged files are not re-read."""
+        stat = os.stat(path)
+        abspath = os.path.abspath(path)
+        memo = self.manifest['digests'].get(abspath)
+        if memo and memo['size'] == stat.st_size and memo['mtime_ns'] == stat.st_mtime_ns:
+            return memo['sha256']
+        sha = file_digest(path)
+        self.manifest['digests'][abspath] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha,
+        }
+        return sha
+
+    def key(self, label, sources=(), config=None):
+        """Cache key for `label` built from `sources` under `config`."""
+        return config_digest({
+            'label': label,
+            'sources': [self.source_digest(path) for path in sources],
+            'config': config,
+        })
+
+    def _path(self, key):
+        return os.path.join(self.root, key + '.pkl')
+
+    def get(self, key):
+        """Cached value for `key`, or None on a miss."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            # Corrupt, missing or from classes that no longer load: drop the file too so the key is rebuilt cleanly
+            self._discard(key)
+            return None
+        entry['last_used'] = time.time()
+        self._touched.add(key)
+        return value
+
+    def _discard(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        self.entries.pop(key, None)
+        self._touched.discard(key)
+        self._removed.add(key)
+
+    def put(self, key, value, label=''):
+        """Store `value` under `key`, then evict down to the size budget."""
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        now = time.time()
+        self.entries[key] = {
+            'label': label,
+            'bytes': os.path.getsize(path),
+            'created': now,
+            'last_used': now,
+        }
+        self._touched.add(key)
+        self._removed.discard(key)
+        self.save(keep=key)
+
+    def get_or_build(self, label, sources, config, build):
+        """Return (value, hit): the cached value, or build() stored under the key."""
+        key = self.key(label, sources, config)
+        value = self.get(key)
+        if value is not None:
+            self.save()
+            return value, True
+        value = build()
+        self.put(key, value, label=label)
+        return value, False
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.entries.values())
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        total = self.total_bytes()
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entry['bytes']
+            self._discard(key)
+
+    def save(self, keep=None):
+        """Merge this process's changes into the on-disk manifest, evict, write atomically."""
+        with self._locked():
+            manifest = self._read()
+            for key in self._removed:
+                manifest['entries'].pop(key, None)
+            for key in self._touched:
+                # Skip entries another process evicted meanwhile
+                if key in self.entries and os.path.exists(self._path(key)):
+                    manifest['entries'][key] = self.entries[key]
+            manifest['digests'].update(self.manifest['digests'])
+            self.manifest = manifest
+            self._touched, self._removed = set(), set()
+            self.evict(keep=keep)
+            self._removed = set()
+
+            tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,340 @@
+"""
+Command-line entry point: python -m chr_pipeline <stage> [options]
+
+    convert    CHR workbook -> one row per county (writes the dataset CSV)
+    integrate  dataset CSV + PLACES releases -> multi-year dataset CSV
+    analyze    dataset CSV -> exploratory figures
+    run        convert + integrate (+ figures) in memory, one write at the end
+    store      dataset CSV -> normalized Parquet store
+    cube       dataset CSV -> memory-mappable county x year x metric cube
+    summaries  dataset CSV -> per-year/metric/state stats and class breaks
+    correlations  dataset CSV -> Pearson/Spearman matrices per year and state
+    models     dataset CSV -> cross-validated life-expectancy forests per year/state
+    neighbors  dataset CSV -> top-k most similar counties per county and year
+    spatial    dataset CSV + county topology -> Moran's I and LISA hot/cold spots
+    rankings   dataset CSV -> within-state ranks, percentiles and composite rank CIs
+    trends     dataset CSV -> per-county PLACES trends, outliers and labeled estimates
+    shards     dataset CSV -> per-state county time-series shards + index
+    geometry   us-atlas TopoJSON -> pre-projected multi-level county paths
+    fetch-topology  download the us-atlas county TopoJSON (SHA-256 verified)
+    serve      local JSON API over the dataset (asyncio, in-memory columns)
+"""
+
+import argparse
+
+from . import (converter, correlations, cube, geometry, models, neighbors, places, pipeline, profiling, server,
+               rankings, shards, spatial, store, summaries, trends)
+from .cache import BuildCache, CACHE_DIR
+
+
+def _cache(args):
+    return None if args.no_cache else BuildCache(args.cache_dir)
+
+
+def cmd_convert(args):
+    print("County Health Rankings Excel Converter (Corrected)")
+    print("=" * 60)
+
+    print("\nReading data sheets...")
+    df_output = converter.load_chr(args.workbook, _cache(args))
+    print(f"\n[SUCCESS] Processed {len(df_output)} counties")
+    converter.report(df_output)
+
+    pipeline.write_dataset(df_output, args.output)
+    print(f"  Total counties: {len(df_output)}")
+    print(f"  Total metrics: {len(converter.metric_columns(df_output))}")
+
+    print("\n" + "=" * 60)
+    print("DONE! Update JavaScript and refresh browser!")
+    print("=" * 60)
+
+
+def cmd_integrate(args):
+    print("=" * 70)
+    print("INTEGRATING REAL PLACES DATA (Correct Year Mapping)")
+    print("=" * 70)
+
+    # Load the 2024 CHR baseline
+    chr_2024 = places.chr_baseline(pipeline.read_dataset(args.input))
+    print(f"\n[1] Loaded CHR 2024 baseline: {len(chr_2024)} counties")
+
+    combined_df = places.integrate(chr_2024, jobs=args.jobs, cache=_cache(args))
+    pipeline.write_dataset(combined_df, args.output)
+    print(f"\n[SUCCESS] Real historical data integrated!")
+    places.report(combined_df)
+
+
+def cmd_analyze(args):
+    from .analysis import render_figures
+    render_figures(pipeline.read_dataset(args.input), args.figures_dir, year=args.year,
+                   years=args.years, states=args.states, jobs=args.jobs, force=args.force)
+
+
+def cmd_run(args):
+    print("=" * 70)
+    print("COUNTY HEALTH PIPELINE (convert -> integrate -> figures)")
+    print("=" * 70)
+    combined_df = pipeline.run(
+        workbook=args.workbook,
+        output=None if args.no_write else args.output,
+        jobs=args.jobs,
+        cache=_cache(args),
+        figures_dir=None if args.skip_figures else args.figures_dir,
+    )
+    if args.store:
+        store.write_store(combined_df, args.store)
+    if args.cube:
+        cube.build_cube(combined_df, args.cube)
+    if args.summaries:
+        summaries.write_summaries(combined_df, args.summaries)
+    if args.shards:
+        shards.write_shards(combined_df, args.shards)
+    if args.correlations:
+        correlations.write_correlations(combined_df, args.correlations, cache=_cache(args))
+
+
+def cmd_store(args):
+    store.write_store(pipeline.read_dataset(args.input), args.out)
+
+
+def cmd_cube(args):
+    cube.build_cube(pipeline.read_dataset(args.input), args.out)
+
+
+def cmd_summaries(args):
+    summaries.write_summaries(pipeline.read_dataset(args.input), args.out, n_classes=args.classes)
+
+
+def cmd_correlations(args):
+    correlations.write_correlations(pipeline.read_dataset(args.input), args.out,
+                                    min_pairs=args.min_pairs, cache=_cache(args))
+
+
+def cmd_models(args):
+    feature_sets = {name: models.FEATURE_SETS[name] for name in args.feature_sets}
+    models.train_all(pipeline.read_dataset(args.input), years=args.years, states=args.states,
+                     feature_sets=feature_sets, out_dir=args.out, workers=args.jobs, force=args.force,
+                     folds=args.folds, repeats=args.repeats)
+
+
+def cmd_neighbors(args):
+    neighbors.write_neighbors(pipeline.read_dataset(args.input), args.out, k=args.k, cache=_cache(args))
+
+
+def _require_topology(path):
+    problem = geometry.topology_problem(path)
+    if problem:
+        print(f"[ERROR] {problem}")
+        print(f"        Fetch it with: python -m chr_pipeline fetch-topology --out {path}")
+        raise SystemExit(1)
+
+
+def cmd_spatial(args):
+    _require_topology(args.topology)
+    spatial.write_spatial(pipeline.read_dataset(args.input), args.out, args.topology,
+                          permutations=args.permutations, alpha=args.alpha, workers=args.jobs,
+                          cache=_cache(args))
+
+
+def cmd_rankings(args):
+    rankings.write_rankings(pipeline.read_dataset(args.input), args.out,
+                            resamples=args.resamples, cache=_cache(args))
+
+
+def cmd_trends(args):
+    try:
+        trends.write_trends(pipeline.read_dataset(args.input), args.out, project=args.project,
+                            method=args.method, cache=_cache(args))
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        print("        Trends need the integrated dataset (python -m chr_pipeline integrate)")
+        raise SystemExit(1)
+
+
+def cmd_shards(args):
+    shards.write_shards(pipeline.read_dataset(args.input), args.out)
+
+
+def cmd_geometry(args):
+    _require_topology(args.topology)
+    geometry.build_geometry(args.topology, args.out)
+
+
+def cmd_fetch_topology(args):
+    try:
+        geometry.fetch_topology(args.out, args.url, args.sha256, args.force)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not fetch the county topology: {e}")
+        raise SystemExit(1)
+
+
+def cmd_serve(args):
+    server.run_server(args.input, args.store, args.host, args.port, args.result_cache)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m chr_pipeline', description=__doc__.strip().splitlines()[0])
+    stages = parser.add_subparsers(dest='stage', required=True)
+
+    cached = argparse.ArgumentParser(add_help=False)
+    cached.add_argument('--no-cache', action='store_true', help='always re-parse source files')
+    cached.add_argument('--cache-dir', default=CACHE_DIR)
+
+    traced = argparse.ArgumentParser(add_help=False)
+    traced.add_argument('--trace', metavar='PATH', help='write one JSON line per pipeline step')
+    traced.add_argument('--chrome-trace', metavar='PATH', help='also write a Chrome trace-event file')
+    traced.add_argument('--profile-stage', metavar='NAME', help='run cProfile on this step (e.g. places.pivot)')
+    traced.add_argument('--profile-dir', default=profiling.PROFILE_DIR)
+
+    p = stages.add_parser('convert', parents=[cached, traced], help='CHR workbook -> dataset CSV')
+    p.add_argument('--workbook', default=converter.input_file)
+    p.add_argument('--output', default=pipeline.DATA_FILE)
+    p.set_defaults(func=cmd_convert)
+
+    p = stages.add_parser('integrate', parents=[cached, traced], help='add PLACES releases to the dataset CSV')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--output', default=pipeline.DATA_FILE)
+    p.add_argument('--jobs', type=int, default=1, help='worker processes for reading releases (0 = all cores)')
+    p.set_defaults(func=cmd_integrate)
+
+    p = stages.add_parser('analyze', parents=[traced], help='render exploratory figures')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--figures-dir', default='exploratory_figures')
+    p.add_argument('--year', type=int, default=2024)
+    p.add_argument('--years', type=int, nargs='+', help='render a set per year under <figures-dir>/<year>/')
+    p.add_argument('--states', nargs='+', help="also render per state ('all' for every state)")
+    p.add_argument('--jobs', type=int, default=1, help='render processes (0 = all cores)')
+    p.add_argument('--force', action='store_true', help='re-render figures whose inputs are unchanged')
+    p.set_defaults(func=cmd_analyze)
+
+    p = stages.add_parser('run', parents=[cached, traced], help='convert + integrate (+ figures) in memory')
+    p.add_argument('--workbook', default=converter.input_file)
+    p.add_argument('--output', default=pipeline.DATA_FILE)
+    p.add_argument('--no-write', action='store_true', help='keep the result in memory only')
+    p.add_argument('--jobs', type=int, default=1, help='worker processes for reading releases (0 = all cores)')
+    p.add_argument('--figures-dir', default='exploratory_figures')
+    p.add_argument('--skip-figures', action='store_true')
+    p.add_argument('--store', metavar='DIR', help='also write the normalized Parquet store')
+    p.add_argument('--cube', metavar='DIR', help='also write the memory-mappable cube')
+    p.add_argument('--summaries', metavar='PATH', help='also write the summary/class-break sidecar')
+    p.add_argument('--shards', metavar='DIR', help='also write the per-county time-series shards')
+    p.add_argument('--correlations', metavar='PATH', help='also write the correlation matrices')
+    p.set_defaults(func=cmd_run)
+
+    p = stages.add_parser('store', parents=[traced], help='write the normalized Parquet store')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=store.STORE_DIR)
+    p.set_defaults(func=cmd_store)
+
+    p = stages.add_parser('cube', parents=[traced], help='write the memory-mappable county x year x metric cube')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=cube.CUBE_DIR)
+    p.set_defaults(func=cmd_cube)
+
+    p = stages.add_parser('summaries', parents=[traced],
+                          help='write summary stats and class breaks for the front end')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=summaries.SUMMARIES_FILE)
+    p.add_argument('--classes', type=int, default=summaries.N_CLASSES)
+    p.set_defaults(func=cmd_summaries)
+
+    p = stages.add_parser('correlations', parents=[cached, traced],
+                          help='write Pearson/Spearman matrices per year and state for the front end')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=correlations.CORRELATIONS_FILE)
+    p.add_argument('--min-pairs', type=int, default=correlations.MIN_PAIRS,
+                   help='fewest shared counties for a coefficient')
+    p.set_defaults(func=cmd_correlations)
+
+    p = stages.add_parser('models', parents=[traced],
+                          help='train and score life-expectancy models per year, state and feature set')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=models.MODELS_DIR, help='model store and results tables')
+    p.add_argument('--years', type=int, nargs='+', help='default: every year in the dataset')
+    p.add_argument('--states', nargs='+', default=['all'], help="state names, or 'all' (national models always run)")
+    p.add_argument('--feature-sets', nargs='+', choices=list(models.FEATURE_SETS), default=list(models.FEATURE_SETS))
+    p.add_argument('--folds', type=int, default=models.FOLDS)
+    p.add_argument('--repeats', type=int, default=models.REPEATS, help='permutations per feature and fold')
+    p.add_argument('--jobs', type=int, default=0, help='training processes (0 = all cores)')
+    p.add_argument('--force', action='store_true', help='retrain models already in the store')
+    p.set_defaults(func=cmd_models)
+
+    p = stages.add_parser('neighbors', parents=[cached, traced],
+                          help='write each county\'s most similar counties per year for the front end')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=neighbors.NEIGHBORS_FILE)
+    p.add_argument('-k', type=int, default=neighbors.K, help='neighbors kept per county')
+    p.set_defaults(func=cmd_neighbors)
+
+    p = stages.add_parser('spatial', parents=[cached, traced],
+                          help="write Moran's I and LISA hot/cold spot classes per metric and year")
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--topology', default=geometry.TOPOLOGY_FILE, help='us-atlas counties-10m.json (see fetch-topology)')
+    p.add_argument('--out', default=spatial.SPATIAL_FILE)
+    p.add_argument('--permutations', type=int, default=spatial.PERMUTATIONS)
+    p.add_argument('--alpha', type=float, default=spatial.ALPHA, help='pseudo p-value for a cluster')
+    p.add_argument('--jobs', type=int, default=0, help='worker processes (0 = all cores)')
+    p.set_defaults(func=cmd_spatial)
+
+    p = stages.add_parser('rankings', parents=[cached, traced],
+                          help='write within-state ranks and composite rank CIs for the front end')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=rankings.RANKINGS_FILE)
+    p.add_argument('--resamples', type=int, default=rankings.RESAMPLES,
+                   help='bootstrap resamples of the composite metrics')
+    p.set_defaults(func=cmd_rankings)
+
+    p = stages.add_parser('trends', parents=[cached, traced],
+                          help='fit per-county trends over the PLACES years and project later years')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=trends.TRENDS_FILE)
+    p.add_argument('--method', choices=trends.METHODS, default='ols', help='fit used for the estimates')
+    p.add_argument('--project', type=int, nargs='+',
+                   help='years to estimate (default: dataset years after the last PLACES year)')
+    p.set_defaults(func=cmd_trends)
+
+    p = stages.add_parser('shards', parents=[traced],
+                          help='write per-state county time-series shards for the modal')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--out', default=shards.SHARD_DIR)
+    p.set_defaults(func=cmd_shards)
+
+    p = stages.add_parser('geometry', parents=[traced],
+                          help='pre-project and simplify county geometry for the map')
+    p.add_argument('--topology', default=geometry.TOPOLOGY_FILE, help='us-atlas counties-10m.json (see fetch-topology)')
+    p.add_argument('--out', default=geometry.GEOMETRY_DIR)
+    p.set_defaults(func=cmd_geometry)
+
+    p = stages.add_parser('fetch-topology', parents=[traced],
+                          help='download and verify the us-atlas county TopoJSON')
+    p.add_argument('--out', default=geometry.TOPOLOGY_FILE)
+    p.add_argument('--url', default=geometry.TOPOLOGY_URL)
+    p.add_argument('--sha256', help='expected hash (default: the pinned or recorded one)')
+    p.add_argument('--force', action='store_true', help='download even if a verified copy exists')
+    p.set_defaults(func=cmd_fetch_topology)
+
+    p = stages.add_parser('serve', parents=[traced], help='serve metric/county/state queries over local HTTP')
+    p.add_argument('--input', default=pipeline.DATA_FILE)
+    p.add_argument('--store', metavar='DIR', help='load the normalized Parquet store instead of the CSV')
+    p.add_argument('--host', default=server.HOST)
+    p.add_argument('--port', type=int, default=server.PORT)
+    p.add_argument('--result-cache', type=int, default=server.RESULT_CACHE_SIZE,
+                   help='number of encoded responses kept in the LRU')
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    traced = any(getattr(args, flag, None) for flag in ('trace', 'chrome_trace', 'profile_stage'))
+    if traced:
+        profiling.enable(args.trace, args.chrome_trace, args.profile_stage, args.profile_dir)
+    try:
+        args.func(args)
+    finally:
+        if traced:
+            profiling.disable()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Converter for the County Health Rankings Excel file
+Uses exact column names from the file
+
+The workbook is opened once and only the key columns (FIPS/County/State)
+plus the mapped measure columns are parsed from each sheet. Both sheets are
+keyed by a normalized 5-digit FIPS and combined with a single indexed join.
+The parsed result is cached by workbook hash + metrics_mapping.
+"""
+
+import pandas as pd
+
+from . import profiling
+
+input_file = 'data/2025 County Health Rankings Data - v3.xlsx'
+output_file = 'data/county_health_data.csv'
+
+# Row 0 of each sheet holds group labels; the real column names are on row 1
+HEADER_ROW = 1
+KEY_COLUMNS = ['FIPS', 'County', 'State']
+
+# Exact column mapping from the files
+metrics_mapping = {
+    # From Select Measure Data
+    'select': {
+        'Years of Potential Life Lost Rate': 'premature_death',
+        '% Uninsured': 'uninsured',
+        'Primary Care Physicians Rate': 'primary_care_rate',
+        '% Fair or Poor Health': 'poor_health',
+        'Average Number of Physically Unhealthy Days': 'poor_physical_days',
+        'Average Number of Mentally Unhealthy Days': 'poor_mental_days',
+        '% Vaccinated': 'vaccinated',
+        '% With Access to Exercise Opportunities': 'exercise_access',
+        'Preventable Hospitalization Rate': 'preventable_hosp',
+        '% with Annual Mammogram': 'mammogram_rate',
+        'Average Daily PM2.5': 'air_pollution',
+        '% Severe Housing Problems': 'housing_problems',
+    },
+    # From Additional Measure Data
+    'additional': {
+        'Life Expectancy': 'life_expectancy',
+        '% Adults with Obesity': 'adult_obesity',
+        '% Adults with Diabetes': 'diabetes',
+        '% Adults Reporting Currently Smoking': 'adult_smoking',
+        'Median Household Income': 'median_income',
+        'High School Graduation Rate': 'hs_graduation',
+        '% Physically Inactive': 'physical_inactivity',
+        '% Excessive Drinking': 'excessive_drinking',
+        '% Children in Poverty': 'child_poverty',
+        '80th Percentile Income': 'income_80th',
+        '20th Percentile Income': 'income_20th',
+        '% Some College': 'some_college',
+        'Unemployment Rate': 'unemployment',
+    }
+}
+
+# Bump when convert() changes shape, so stale cache entries are not reused
+CACHE_VERSION = 1
+
+SHEETS = {
+    'select': 'Select Measure Data',
+    'additional': 'Additional Measure Data',
+}
+
+
+def normalize_fips(values):
+    """Vectorized FIPS normalization to 5-digit strings.
+
+    Accepts text ('01001'), numbers (1001 or 1001.0) and padded strings.
+    Anything that does not reduce to 1-5 digits becomes NaN.
+    """
+    fips = pd.Series(values, copy=False).astype('string').str.strip()
+    fips = fips.str.replace(r'\.0+$', '', regex=True)
+    fips = fips.where(fips.str.fullmatch(r'\d{1,5}').fillna(False))
+    return fips.str.zfill(5)
+
+
+def read_sheet(workbook, sheet_name, measure_columns):
+    """Parse one sheet, keeping only the key columns and the given measures."""
+    wanted = set(KEY_COLUMNS) | set(measure_columns)
+    with profiling.stage('chr.parse_sheet', sheet=sheet_name) as s:
+        df = workbook.parse(
+            sheet_name,
+            header=HEADER_ROW,
+            usecols=lambda col: col in wanted,
+            dtype={'FIPS': str, 'County': str, 'State': str},
+        )
+        s.rows_out = len(df)
+    with profiling.stage('chr.fix_keys', rows_in=len(df), sheet=sheet_name) as s:
+        df['fips'] = normalize_fips(df['FIPS'])
+        s.rows_out = int(df['fips'].notna().sum())
+    return df
+
+
+def measure_frame(df, mapping):
+    """Numeric measure columns from one sheet, renamed and indexed by FIPS."""
+    present = {src: dst for src, dst in mapping.items() if src in df.columns}
+    measures = df[list(present)].apply(pd.to_numeric, errors='coerce')
+    measures = measures.rename(columns=present)
+    measures.index = pd.Index(df['fips'], name='fips')
+    return measures
+
+
+def convert(path=input_file):
+    """Build the one-row-per-county CHR 2024 frame from the workbook."""
+    with profiling.stage('chr.read_excel'), pd.ExcelFile(path) as workbook:
+        df_select = read_sheet(workbook, SHEETS['select'], metrics_mapping['select'])
+        df_additional = read_sheet(workbook, SHEETS['additional'], metrics_mapping['additional'])
+
+    print(f"Select sheet: {len(df_select)} rows")
+    print(f"Additional sheet: {len(df_additional)} rows")
+
+    with profiling.stage('chr.map_metrics', rows_in=len(df_select) + len(df_additional)) as s:
+        df_output = _map_metrics(df_select, df_additional)
+        s.rows_out = len(df_output)
+    return df_output
+
+
+def _map_metrics(df_select, df_additional):
+    """County rows of the Select sheet joined with the Additional measures."""
+    # Counties only: valid FIPS that are not state/national rollups (xx000)
+    is_county = df_select['fips'].notna() & ~df_select['fips'].str.endswith('000').fillna(True)
+    df_select = df_select[is_county]
+
+    df_output = pd.DataFrame({
+        'fips': df_select['fips'].to_numpy(),
+        'county': df_select['County'].astype(str).str.strip().to_numpy(),
+        'state': df_select['State'].astype(str).str.strip().to_numpy(),
+        'year': 2024,
+    })
+    df_output = df_output.join(
+        measure_frame(df_select, metrics_mapping['select']).reset_index(drop=True)
+    )
+
+    # One indexed join for every Additional measure; for a duplicated FIPS each
+    # measure takes its last non-empty value, as the row-by-row merge did
+    print("\nMerging Additional Measure Data...")
+    additional = measure_frame(
+        df_additional[df_additional['fips'].notna()], metrics_mapping['additional']
+    )
+    additional = additional.groupby(level=0, sort=False).last()
+    for col_name, output_name in metrics_mapping['additional'].items():
+        if output_name in additional.columns:
+            print(f"  Adding: {col_name} -> {output_name}")
+    df_output = df_output.join(additional, on='fips')
+
+    return df_output
+
+
+def metric_columns(df):
+    """Measure columns: everything except the county keys and year."""
+    return [c for c in df.columns if c not in ['fips', 'county', 'state', 'year']]
+
+
+def report(df_output):
+    """Print per-metric completeness and return (metric, count, pct) tuples."""
+    print(f"\n[OK] Data completeness by metric:")
+    metrics_stats = []
+    for col in metric_columns(df_output):
+        non_empty = int(df_output[col].notna().sum())
+        pct = (non_empty / len(df_output)) * 100
+        metrics_stats.append((col, non_empty, pct))
+        print(f"  {col:25s}: {non_empty:4d} ({pct:5.1f}%)")
+
+    # Show best metrics
+    print(f"\n[OK] Metrics with best coverage (>90%):")
+    for col, count, pct in sorted(metrics_stats, key=lambda x: -x[2])[:10]:
+        if pct > 90:
+            print(f"  {col:25s}: {pct:5.1f}%")
+    return metrics_stats
+
+
+def load_chr(path=input_file, cache=None):
+    """convert(path), served from `cache` when the workbook and mapping are unchanged."""
+    if cache is None:
+        return convert(path)
+    config = {'version': CACHE_VERSION, 'metrics_mapping': metrics_mapping, 'sheets': SHEETS}
+    df_output, hit = cache.get_or_build('chr', [path], config, lambda: convert(path))
+    if hit:
+        print("[CACHE] Workbook unchanged, reusing parsed data")
+    return df_output
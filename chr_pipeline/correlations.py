@@ -0,0 +1,255 @@
+"""
+Pairwise-complete Pearson and Spearman matrices for every metric, per
+(year) nationally and per (year, state)
+
+All groups are computed in a few batched matrix products instead of one
+.corr() per group. Rows are sorted by group and scattered into a
+(groups, rows, metrics) array padded with NaN; groups are batched by
+padded size so a 3,000-county national year does not pad 3-county states.
+With M the observed mask and Z the values (centered per group, 0 where
+missing), every pairwise-complete sum is a product over the row axis:
+
+    n    = M'M          pairs observed together
+    sx   = Z'M          sum of x over rows where y is also observed
+    sxx  = (Z*Z)'M
+    sxy  = Z'Z
+    r    = (sxy - sx sy / n) / sqrt((sxx - sx^2 / n) (syy - sy^2 / n))
+
+This is exactly what DataFrame.corr() returns for each group.
+
+Spearman is the same Pearson on ranks (average ties) taken within each
+group over just the rows both metrics share, as DataFrame.corr() does.
+Each metric is sorted once per group. Restricted to the rows where b is
+also observed, a's rank is its marginal rank less the rows where a is
+observed but b is not that sort below it (half of those tied with it):
+
+    rank_ab = rank_a - below(~M_b) - ties(~M_b) / 2
+
+and both counts are cumulative sums of ~M_b in a's sort order, for every
+b at once. That gives a (groups, rows, metrics, metrics) tensor of ranks;
+centered on (n + 1) / 2 and masked to shared rows, rho is again a sum of
+products over the row axis. Groups are chunked so the tensor stays within
+BATCH_ELEMENTS.
+
+Results are cached by a hash of the input frame and written as compact
+JSON for the front end (upper triangle only, see `pairs`).
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import frame_digest
+from .converter import metric_columns
+
+CORRELATIONS_FILE = 'data/correlations.json'
+MIN_PAIRS = 3
+# Bump when the computation or result layout changes
+CACHE_VERSION = 2
+# Largest (groups x rows x metrics x metrics) block computed at once
+BATCH_ELEMENTS = 1 << 23
+
+
+def pairwise_pearson(X, min_pairs=MIN_PAIRS):
+    """Pairwise-complete Pearson r and pair counts for a batch (groups, rows, metrics).
+
+    A 2-D (rows, metrics) array is treated as a single group.
+    """
+    X = np.asarray(X, dtype=float)
+    single = X.ndim == 2
+    if single:
+        X = X[None]
+    M = ~np.isnan(X)
+    Mf = M.astype(float)
+    count = Mf.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(M, X, 0.0).sum(axis=1, keepdims=True) / count
+    Z = np.where(M, X - mean, 0.0)
+
+    Zt = Z.transpose(0, 2, 1)
+    n = Mf.transpose(0, 2, 1) @ Mf
+    sx = Zt @ Mf
+    sxx = (Zt * Zt) @ Mf
+    sxy = Zt @ Z
+    sy, syy = sx.transpose(0, 2, 1), sxx.transpose(0, 2, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        r = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    r = np.clip(r, -1.0, 1.0)
+    r[n < min_pairs] = np.nan
+    n = n.astype(np.int64)
+    return (r[0], n[0]) if single else (r, n)
+
+
+def _batched(values, codes, n_groups, min_pairs, pairwise=pairwise_pearson):
+    """`pairwise` (pearson or spearman) for every group of `values` (rows x metrics) by `codes`."""
+    n_metrics = values.shape[1]
+    r = np.full((n_groups, n_metrics, n_metrics), np.nan)
+    n = np.zeros((n_groups, n_metrics, n_metrics), dtype=np.int64)
+
+    order = np.argsort(codes, kind='stable')
+    values, codes = values[order], codes[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    within = np.arange(len(codes)) - starts[codes]
+
+    # Pad each group to the next power of two and batch equal paddings
+    padded = 1 << np.ceil(np.log2(np.maximum(counts, 1))).astype(int)
+    for size in np.unique(padded[counts > 0]):
+        same = np.flatnonzero((padded == size) & (counts > 0))
+        chunk = max(1, BATCH_ELEMENTS // (size * n_metrics * n_metrics))
+        for groups in np.array_split(same, -(-len(same) // chunk)):
+            slot = np.full(n_groups, -1)
+            slot[groups] = np.arange(len(groups))
+            rows = slot[codes] >= 0
+            batch = np.full((len(groups), size, n_metrics), np.nan)
+            batch[slot[codes[rows]], within[rows]] = values[rows]
+            r[groups], n[groups] = pairwise(batch, min_pairs)
+    return r, n
+
+
+def pairwise_spearman_batch(X, min_pairs=MIN_PAIRS):
+    """Pairwise-complete Spearman rho and pair counts for a batch (groups, rows, metrics)."""
+    X = np.asarray(X, dtype=float)
+    n_groups, n_rows, n_metrics = X.shape
+    M = ~np.isnan(X)
+
+    # Each metric's rows in value order, NaN last; runs of equal values are tie blocks
+    order = np.argsort(X, axis=1, kind='stable')
+    xs = np.take_along_axis(X, order, axis=1)
+    position = np.arange(n_rows)[None, :, None]
+    first = np.ones(xs.shape, dtype=bool)
+    first[:, 1:] = xs[:, 1:] != xs[:, :-1]
+    last = np.ones(xs.shape, dtype=bool)
+    last[:, :-1] = first[:, 1:]
+    start = np.maximum.accumulate(np.where(first, position, 0), axis=1)
+    end = np.minimum.accumulate(np.where(last, position, n_rows)[:, ::-1], axis=1)[:, ::-1]
+    # Ranks are kept doubled so ties' halves stay integers, int16 while they fit
+    dtype = np.int16 if 2 * n_rows + 2 <= np.iinfo(np.int16).max else np.int32
+    twice_rank = (start + end + 2).astype(dtype)
+
+    # missing[g, s, a, b]: the row at a's sort position s lacks b (but has a)
+    g, a = np.arange(n_groups)[:, None, None], np.arange(n_metrics)[None, None, :]
+    missing = ~M[g, order] & ~np.isnan(xs)[..., None]
+    cumulative = np.zeros((n_groups, n_rows + 1, n_metrics, n_metrics), dtype=dtype)
+    np.cumsum(missing, axis=1, dtype=dtype, out=cumulative[:, 1:])
+    # 2 * (rank - below - ties / 2) = 2 * rank - below - (below + ties)
+    ranks_sorted = twice_rank[..., None] - cumulative[g, start, a]
+    ranks_sorted -= cumulative[g, end + 1, a]
+
+    # Back to row order: ranks[g, i, a, b] is a's (doubled) rank at row i among the rows b shares
+    ranks = np.empty_like(ranks_sorted)
+    ranks[g, order, a] = ranks_sorted
+    shared = M[:, :, :, None] & M[:, :, None, :]
+    n = shared.sum(axis=1, dtype=np.int64)
+    ranks -= (n[:, None] + 1).astype(dtype)
+    ranks[~shared] = 0
+    centered = ranks.astype(float)
+    suv = np.einsum('gsab,gsba->gab', centered, centered)
+    suu = np.einsum('gsab,gsab->gab', centered, centered)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rho = suv / np.sqrt(suu * suu.transpose(0, 2, 1))
+    rho = np.clip(rho, -1.0, 1.0)
+    rho[n < min_pairs] = np.nan
+    return rho, n
+
+
+def pairwise_spearman(values, codes, n_groups, min_pairs=MIN_PAIRS):
+    """Pairwise-complete Spearman rho for every group of `values` (rows x metrics) by `codes`."""
+    rho, _ = _batched(values, codes, n_groups, min_pairs, pairwise_spearman_batch)
+    return rho
+
+
+def correlate(df, metrics=None, min_pairs=MIN_PAIRS):
+    """Pearson, Spearman and pair counts per national year and per (year, state).
+
+    Returns {'metrics', 'groups' (DataFrame of year, state; state is None
+    for national rows), 'pearson', 'spearman', 'n'}; the arrays are
+    (groups, metrics, metrics) in `groups` order.
+    """
+    metrics = metrics or metric_columns(df)
+    df = df.reset_index(drop=True)
+    values = df[metrics].to_numpy(dtype=float)
+
+    results = []
+    for keys in (['year'], ['year', 'state']):
+        grouped = df.groupby(keys, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        groups = grouped.size().index.to_frame(index=False)
+        if 'state' not in groups:
+            groups['state'] = None
+        with profiling.stage('correlations.pearson', rows_in=len(df), keys='+'.join(keys)) as s:
+            pearson, n = _batched(values, codes, len(groups), min_pairs)
+            s.rows_out = len(groups)
+        with profiling.stage('correlations.spearman', rows_in=len(df), keys='+'.join(keys)) as s:
+            spearman = pairwise_spearman(values, codes, len(groups), min_pairs)
+            s.rows_out = len(groups)
+        results.append((groups, pearson, spearman, n))
+
+    return {
+        'metrics': metrics,
+        'groups': pd.concat([r[0] for r in results], ignore_index=True),
+        'pearson': np.concatenate([r[1] for r in results]),
+        'spearman': np.concatenate([r[2] for r in results]),
+        'n': np.concatenate([r[3] for r in results]),
+    }
+
+
+def load_correlations(df, metrics=None, min_pairs=MIN_PAIRS, cache=None):
+    """correlate(), reused from `cache` while the input frame is unchanged."""
+    if cache is None:
+        return correlate(df, metrics, min_pairs)
+    config = {'version': CACHE_VERSION, 'data': frame_digest(df),
+              'metrics': metrics, 'min_pairs': min_pairs}
+    result, hit = cache.get_or_build('correlations', [], config,
+                                     lambda: correlate(df, metrics, min_pairs))
+    if hit:
+        print("[CACHE] Dataset unchanged, reusing correlation matrices")
+    return result
+
+
+def matrix(result, year, state=None, method='pearson'):
+    """One group's matrix as a labeled DataFrame."""
+    groups = result['groups']
+    match = (groups['year'] == year) & (groups['state'].isna() if state is None else groups['state'] == state)
+    (index,) = np.flatnonzero(match.to_numpy())
+    return pd.DataFrame(result[method][index], index=result['metrics'], columns=result['metrics'])
+
+
+def _clean(values, digits=4):
+    return [None if v != v else round(float(v), digits) for v in values.tolist()]
+
+
+def write_correlations(df, path=CORRELATIONS_FILE, min_pairs=MIN_PAIRS, cache=None):
+    """Write the front-end JSON: upper-triangle values per group."""
+    result = load_correlations(df, min_pairs=min_pairs, cache=cache)
+    metrics = result['metrics']
+    upper = np.triu_indices(len(metrics), k=1)
+
+    national, states = {}, {}
+    for index, group in enumerate(result['groups'].itertuples(index=False)):
+        record = {
+            'n': result['n'][index][upper].tolist(),
+            'pearson': _clean(result['pearson'][index][upper]),
+            'spearman': _clean(result['spearman'][index][upper]),
+        }
+        if pd.isna(group.state):
+            national[str(group.year)] = record
+        else:
+            states.setdefault(group.state, {})[str(group.year)] = record
+
+    sidecar = {
+        'metrics': metrics,
+        'pairs': np.column_stack(upper).tolist(),
+        'min_pairs': min_pairs,
+        'spearman': 'pairwise-complete: each pair re-ranked within group on the rows both share',
+        'national': national,
+        'states': states,
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    print(f"\n[OK] Correlations written to {path}: {len(metrics)} metrics, "
+          f"{len(national)} national and {sum(len(v) for v in states.values())} state groups")
+    return sidecar
@@ -0,0 +1,138 @@
+"""
+County name -> FIPS crosswalk for name-keyed files (the 2020 PLACES release)
+
+Names are normalized the same way on both sides: accents folded to ASCII,
+lower case, Saint/Sainte/St./Ste. unified, '&' spelled out, punctuation
+and spaces dropped ("Prince George's" -> "princegeorges", "De Kalb" ->
+"dekalb"). The index has two tiers, both keyed by "<state abbr>|<name>":
+
+    exact  each reference name, and for names without a designator the
+           name + county/parish/borough/census area/municipality/...
+    core   the name with any trailing designator removed, kept only when
+           it points at a single county in that state
+
+A query hits `exact` first, then its own core in `core`. That keeps
+"Baltimore" / "Baltimore County" -> 24005 and "Baltimore city" -> 24510
+apart, while "Alexandria" still finds "Alexandria City". Both lookups are
+Series.map hash joins over the whole column.
+"""
+
+import hashlib
+
+import pandas as pd
+
+# Bump when the normalization or variant rules change
+CACHE_VERSION = 1
+
+DESIGNATORS = ['city and borough', 'census area', 'county', 'parish', 'borough',
+               'municipality', 'municipio', 'city']
+DESIGNATOR_PATTERN = r'\s+(?:' + '|'.join(DESIGNATORS) + r')$'
+
+# Appended to reference names that carry no designator of their own
+COUNTY_DESIGNATORS = [d for d in DESIGNATORS if d != 'city']
+
+
+def normalize_names(values):
+    """Lower-case ASCII words separated by single spaces (vectorized)."""
+    names = pd.Series(values, copy=False).astype('string')
+    names = names.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    names = names.str.lower().str.replace('&', ' and ', regex=False)
+    names = names.str.replace(r'\bsainte\b|\bste\b\.?', 'ste ', regex=True)
+    names = names.str.replace(r'\bsaint\b|\bst\b\.?', 'st ', regex=True)
+    names = names.str.replace(r"['’.]", '', regex=True)
+    names = names.str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+    return names.astype(object).where(names.notna(), None)
+
+
+def strip_designator(names):
+    return names.str.replace(DESIGNATOR_PATTERN, '', regex=True)
+
+
+def _keys(states, names):
+    """'<abbr>|<name with spaces removed>' join keys."""
+    states = pd.Series(states, copy=False).astype(str).str.strip().str.upper()
+    return states.to_numpy(dtype=object) + '|' + names.str.replace(' ', '', regex=False).to_numpy(dtype=object)
+
+
+class Crosswalk:
+    """Two-tier (state, normalized name) -> FIPS index."""
+
+    def __init__(self, exact, core, ambiguous):
+        self.exact = exact
+        self.core = core
+        self.ambiguous = ambiguous
+
+    @classmethod
+    def build(cls, fips, names, states):
+        """Index every reference county; `states` are postal abbreviations."""
+        ref = pd.DataFrame({
+            'fips': pd.Series(fips, copy=False).to_numpy(),
+            'name': normalize_names(names).to_numpy(),
+            'state': pd.Series(states, copy=False).to_numpy(),
+        }).dropna()
+        ref['core'] = strip_designator(ref['name'])
+        bare = ref[ref['core'] == ref['name']]
+
+        # Real names first so a generated variant never displaces one
+        exact = pd.concat(
+            [pd.DataFrame({'key': _keys(ref['state'], ref['name']), 'fips': ref['fips'].to_numpy()})] +
+            [pd.DataFrame({'key': _keys(bare['state'], bare['name'] + ' ' + d), 'fips': bare['fips'].to_numpy()})
+             for d in COUNTY_DESIGNATORS],
+            ignore_index=True,
+        ).drop_duplicates('key', keep='first')
+
+        core = pd.DataFrame({'key': _keys(ref['state'], ref['core']), 'fips': ref['fips'].to_numpy()})
+        fips_per_core = core.groupby('key')['fips'].nunique()
+        ambiguous = sorted(fips_per_core.index[fips_per_core > 1])
+        core = core[~core['key'].isin(ambiguous)].drop_duplicates('key')
+
+        return cls(exact.set_index('key')['fips'], core.set_index('key')['fips'], ambiguous)
+
+    def lookup(self, names, states):
+        """FIPS for each (name, state abbr) pair, NaN where nothing matches."""
+        names = normalize_names(names).fillna('')
+        states = pd.Series(states, copy=False)
+        fips = pd.Series(_keys(states, names)).map(self.exact).to_numpy(dtype=object)
+        missing = pd.isna(fips)
+        if missing.any():
+            cores = strip_designator(names[missing])
+            fips[missing] = pd.Series(_keys(states[missing], cores)).map(self.core).to_numpy(dtype=object)
+        return pd.Series(fips, index=names.index, name='fips')
+
+    def __len__(self):
+        return len(self.exact)
+
+
+def reference_digest(fips, names, states):
+    """Content hash of the reference county list, for cache keys."""
+    digest = hashlib.sha256()
+    for column in (fips, names, states):
+        digest.update('\x1f'.join(pd.Series(column, copy=False).astype(str)).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def build_crosswalk(fips, names, states, cache=None):
+    """Crosswalk.build, reused from `cache` while the reference list is unchanged."""
+    if cache is None:
+        return Crosswalk.build(fips, names, states)
+    config = {'version': CACHE_VERSION, 'reference': reference_digest(fips, names, states)}
+    crosswalk, hit = cache.get_or_build('crosswalk', [], config,
+                                        lambda: Crosswalk.build(fips, names, states))
+    if hit:
+        print("    [CACHE] Reference counties unchanged, reusing name crosswalk")
+    return crosswalk
+
+
+def report_unmatched(names, states, fips, limit=10):
+    """Print and return the (state, name) pairs that did not resolve."""
+    missing = pd.Series(fips, copy=False).isna().to_numpy()
+    unmatched = sorted(zip(pd.Series(states, copy=False).astype(str)[missing],
+                           pd.Series(names, copy=False).astype(str)[missing]))
+    if unmatched:
+        print(f"    Unmatched names: {len(unmatched)}")
+        for state, name in unmatched[:limit]:
+            print(f"      {state}: {name}")
+        if len(unmatched) > limit:
+            print(f"      ... and {len(unmatched) - limit} more")
+    return unmatched
@@ -0,0 +1,105 @@
+"""
+Dense county x year x metric cube for constant-time lookups
+
+build_cube() writes plain .npy files so any process can np.memmap them and
+share one on-disk copy through the page cache:
+
+    values.npy    float32 (county, year, metric), NaN where missing
+    nan_mask.npy  bool, True where a value is missing
+    fips.npy / years.npy / metrics.npy   axis labels
+
+MetricCube resolves labels through dicts and returns numpy views, so point
+lookups and slices never scan or copy the data.
+"""
+
+import os
+
+import numpy as np
+
+from .converter import metric_columns
+
+CUBE_DIR = 'data/cube'
+
+
+def dense_axes(df):
+    """Sorted (fips, years, metrics) labels and each row's (county, year) position."""
+    metrics = metric_columns(df)
+    fips = np.array(sorted(df['fips'].astype(str).unique()))
+    years = np.array(sorted(df['year'].unique()), dtype=np.int16)
+    county_idx = np.searchsorted(fips, df['fips'].astype(str).to_numpy())
+    year_idx = np.searchsorted(years, df['year'].to_numpy())
+    return fips, years, metrics, (county_idx, year_idx)
+
+
+def fill_dense(values, df, metrics, positions):
+    """Scatter the frame's metric columns into a (county, year, metric) array."""
+    values[:] = np.nan
+    values[positions] = df[metrics].to_numpy(dtype=np.float32)
+    return values
+
+
+def build_cube(df, out_dir=CUBE_DIR):
+    """Write the cube files for an integrated (fips x year) frame."""
+    os.makedirs(out_dir, exist_ok=True)
+    fips, years, metrics, positions = dense_axes(df)
+
+    values = np.lib.format.open_memmap(
+        os.path.join(out_dir, 'values.npy'), mode='w+', dtype=np.float32,
+        shape=(len(fips), len(years), len(metrics)),
+    )
+    fill_dense(values, df, metrics, positions)
+    values.flush()
+
+    np.save(os.path.join(out_dir, 'nan_mask.npy'), np.isnan(values))
+    np.save(os.path.join(out_dir, 'fips.npy'), fips)
+    np.save(os.path.join(out_dir, 'years.npy'), years)
+    np.save(os.path.join(out_dir, 'metrics.npy'), np.array(metrics))
+
+    print(f"\n[OK] Cube written to {out_dir}/ with shape {values.shape} "
+          f"({values.nbytes / 1e6:.1f} MB)")
+    return values.shape
+
+
+class MetricCube:
+    """Read-only accessor over the files written by build_cube()."""
+
+    def __init__(self, cube_dir=CUBE_DIR, mmap_mode='r'):
+        self.values = np.load(os.path.join(cube_dir, 'values.npy'), mmap_mode=mmap_mode)
+        self.nan_mask = np.load(os.path.join(cube_dir, 'nan_mask.npy'), mmap_mode=mmap_mode)
+        self.fips = np.load(os.path.join(cube_dir, 'fips.npy'))
+        self.years = np.load(os.path.join(cube_dir, 'years.npy'))
+        self.metrics = np.load(os.path.join(cube_dir, 'metrics.npy'))
+        self._fips = {f: i for i, f in enumerate(self.fips.tolist())}
+        self._years = {y: i for i, y in enumerate(self.years.tolist())}
+        self._metrics = {m: i for i, m in enumerate(self.metrics.tolist())}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def index(self, fips=None, year=None, metric=None):
+        """Axis positions for the given labels (None keeps the whole axis)."""
+        return (
+            slice(None) if fips is None else self._fips[fips],
+            slice(None) if year is None else self._years[year],
+            slice(None) if metric is None else self._metrics[metric],
+        )
+
+    def get(self, fips, year, metric):
+        """One value, NaN when missing. Raises KeyError for unknown labels."""
+        return float(self.values[self.index(fips, year, metric)])
+
+    def has(self, fips, year, metric):
+        return not self.nan_mask[self.index(fips, year, metric)]
+
+    def county(self, fips):
+        """(year, metric) view for one county."""
+        return self.values[self.index(fips=fips)]
+
+    def year_metric(self, year, metric):
+        """(county,) view of one metric in one year, aligned with self.fips."""
+        return self.values[self.index(year=year, metric=metric)]
+
+    def metric(self, metric):
+        """(county, year) view of one metric across every year."""
+        return self.values[self.index(metric=metric)]
@@ -0,0 +1,188 @@
+"""
+Figure rendering engine: declared figures -> cached, parallel render jobs
+
+A FigureSpec names a render function and the columns it reads. plan_jobs()
+expands specs over years and states (None = all counties); each job gets
+only its own rows and columns, which is what the worker receives and what
+is hashed. run_jobs() skips a job when its PNG exists and both the hash of
+that input and the hash of the spec (name, version, columns, year, state,
+dpi, and its `key` of the job's data if it has one) match the manifest in
+the output directory, and renders the rest in a process pool. Bump a
+spec's `version` when its drawing code changes; give it a `key` when it
+draws something besides its columns, e.g. a stored model's key.
+
+A render function that has nothing to draw prints why and returns without
+saving; the job is reported as 'skipped' and left out of the manifest, so
+the next run tries again.
+"""
+
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import profiling
+from .cache import config_digest, frame_digest
+
+MANIFEST = '.figures.json'
+# Bump when job planning or output layout changes
+ENGINE_VERSION = 1
+NATIONAL = 'U.S.'
+
+
+class FigureSpec:
+    """One declared figure: render(df, path, year, scope) over `columns`.
+
+    Jobs with fewer than `min_rows` usable rows are not planned; rows count
+    as usable when any column is set, or every column with `complete`.
+    `key(data)` returns a string for inputs outside `columns`; it is part
+    of the spec digest.
+    """
+
+    def __init__(self, name, render, columns, min_rows=1, complete=False, version=1, key=None):
+        self.name = name
+        self.render = render
+        self.columns = list(columns)
+        self.min_rows = min_rows
+        self.complete = complete
+        self.version = version
+        self.key = key
+
+
+def _slug(state):
+    return 'US' if state is None else re.sub(r'[^A-Za-z0-9]+', '_', state).strip('_')
+
+
+def spec_digest(spec, year, state, data=None):
+    from .analysis import DPI
+    config = {
+        'engine': ENGINE_VERSION, 'name': spec.name, 'version': spec.version,
+        'columns': spec.columns, 'year': year, 'state': state, 'dpi': DPI,
+    }
+    if spec.key is not None:
+        config['key'] = spec.key(data)
+    return config_digest(config)
+
+
+def plan_jobs(df, specs, years, states, out_dir, flat=False):
+    """One job per (spec, year, state) with enough rows to draw.
+
+    `flat` writes <out_dir>/<name>.png (single national set); otherwise
+    <out_dir>/<year>/<state>/<name>.png.
+    """
+    jobs = []
+    for year in years:
+        df_year = df[df['year'] == year]
+        for state in states:
+            rows = df_year if state is None else df_year[df_year['state'] == state]
+            for spec in specs:
+                data = rows[spec.columns].reset_index(drop=True)
+                if len(data.dropna(how='any' if spec.complete else 'all')) < spec.min_rows:
+                    continue
+                if flat:
+                    path = os.path.join(out_dir, f'{spec.name}.png')
+                else:
+                    path = os.path.join(out_dir, str(year), _slug(state), f'{spec.name}.png')
+                jobs.append({
+                    'spec': spec, 'year': year, 'state': state, 'path': path, 'data': data,
+                    'data_digest': frame_digest(data),
+                    'spec_digest': spec_digest(spec, year, state, data),
+                })
+    return jobs
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def render_job(render, data, path, year, scope):
+    """Worker entry point; returns (seconds, status, error message or None).
+
+    status is 'rendered', 'skipped' (render returned without saving) or 'failed'.
+    """
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        before = _mtime(path)
+        render(data, path, year, scope)
+    except Exception as e:
+        return time.perf_counter() - start, 'failed', f'{type(e).__name__}: {e}'
+    after = _mtime(path)
+    status = 'rendered' if after is not None and after != before else 'skipped'
+    return time.perf_counter() - start, status, None
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def run_jobs(jobs, out_dir, workers=1, force=False):
+    """Render every changed job, `workers` at a time (0 = all cores).
+
+    Returns one {path, status, seconds, error} dict per job, status being
+    'rendered', 'unchanged', 'skipped' or 'failed'.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    workers = workers or os.cpu_count() or 1
+    results = []
+
+    todo = []
+    for job in jobs:
+        key = os.path.relpath(job['path'], out_dir)
+        entry = manifest.get(key)
+        if (not force and entry and os.path.exists(job['path'])
+                and entry == {'data': job['data_digest'], 'spec': job['spec_digest']}):
+            results.append({'path': job['path'], 'status': 'unchanged', 'seconds': 0.0, 'error': None})
+        else:
+            todo.append(job)
+    print(f"\n[FIGURES] {len(jobs)} jobs: {len(todo)} to render, {len(jobs) - len(todo)} unchanged"
+          + (f", {workers} workers" if workers > 1 and len(todo) > 1 else ""))
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(todo))) if workers > 1 and len(todo) > 1 else None
+    try:
+        if pool is None:
+            outcomes = []
+            for job in todo:
+                with profiling.stage(f"figures.{job['spec'].name}", rows_in=len(job['data']),
+                                     year=job['year'], state=job['state']):
+                    outcomes.append(render_job(job['spec'].render, job['data'], job['path'],
+                                               job['year'], job['state'] or NATIONAL))
+        else:
+            with profiling.stage('figures.pool', rows_in=len(todo), workers=workers):
+                futures = [pool.submit(render_job, job['spec'].render, job['data'], job['path'],
+                                       job['year'], job['state'] or NATIONAL) for job in todo]
+                outcomes = [future.result() for future in futures]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for job, (seconds, status, error) in zip(todo, outcomes):
+        key = os.path.relpath(job['path'], out_dir)
+        if status == 'rendered':
+            manifest[key] = {'data': job['data_digest'], 'spec': job['spec_digest']}
+            print(f"   [OK] Saved: {key} ({seconds:.1f}s)")
+        else:
+            manifest.pop(key, None)
+            if status == 'failed':
+                print(f"   [FAILED] {key}: {error}")
+            else:
+                print(f"   [SKIPPED] {key}: nothing saved")
+        results.append({'path': job['path'], 'status': status, 'seconds': seconds, 'error': error})
+    _save_manifest(out_dir, manifest)
+    return results
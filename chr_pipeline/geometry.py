@@ -0,0 +1,290 @@
+"""
+Pre-projected, simplified, quantized county geometry for the map
+
+Reads a local us-atlas TopoJSON (counties-10m.json), projects every arc
+to Albers USA once (same parameters as d3.geoAlbersUsa, scaled to a
+975 x 610 frame), and writes one file per zoom level:
+
+    data/geometry/index.json        viewBox + available levels
+    data/geometry/counties_z<k>.json
+        {"zoom": k, "tolerance": px, "counties": {fips: "M..Z"}, "states": "M.."}
+
+Arcs are simplified before rings are assembled, so neighbouring counties
+keep identical shared borders. Douglas-Peucker runs once per arc and
+records each vertex's importance; every level is then a threshold on that
+importance, quantized to a grid matching its tolerance. County ids are
+joined through the same normalize_fips used for the data.
+
+The TopoJSON is not in the repository; fetch_topology() downloads the
+pinned us-atlas release and checks it against a SHA-256. The hash is
+TOPOLOGY_SHA256 when set, otherwise the `<file>.sha256` recorded next to
+it by the first download (commit that file to pin it for everyone).
+"""
+
+import json
+import math
+import os
+import urllib.request
+
+import numpy as np
+
+from .cache import file_digest
+from .converter import normalize_fips
+
+TOPOLOGY_FILE = 'data/geo/counties-10m.json'
+TOPOLOGY_URL = 'https://cdn.jsdelivr.net/npm/us-atlas@3.0.1/counties-10m.json'
+# SHA-256 of TOPOLOGY_URL; None = trust the recorded <file>.sha256
+TOPOLOGY_SHA256 = None
+GEOMETRY_DIR = 'data/geometry'
+
+WIDTH, HEIGHT = 975, 610
+SCALE = 1300
+
+# (zoom factor, simplification tolerance in base-frame pixels)
+LEVELS = ((1, 0.8), (2, 0.4), (4, 0.2), (8, 0.08))
+
+# d3.geoAlbersUsa drops everything outside the 50 states + DC
+ALASKA, HAWAII = '02', '15'
+TERRITORIES = {'60', '66', '69', '72', '78'}
+
+
+def _recorded_sha256(path):
+    """The pinned hash for `path`: TOPOLOGY_SHA256, else its .sha256 file, else None."""
+    if TOPOLOGY_SHA256:
+        return TOPOLOGY_SHA256
+    try:
+        with open(path + '.sha256') as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def topology_problem(path=TOPOLOGY_FILE):
+    """Why `path` can't be used (missing or checksum mismatch), or None if it can."""
+    if not os.path.exists(path):
+        return f"County topology {path} not found (it is not shipped with the repository)"
+    expected = _recorded_sha256(path)
+    if expected and file_digest(path) != expected:
+        return f"County topology {path} does not match its SHA-256 {expected}"
+    return None
+
+
+def fetch_topology(path=TOPOLOGY_FILE, url=TOPOLOGY_URL, sha256=None, force=False):
+    """Download the us-atlas counties TopoJSON to `path`, verified by SHA-256.
+
+    The expected hash is `sha256`, else the pinned one (_recorded_sha256);
+    with neither, the download's hash is recorded in `<path>.sha256`.
+    """
+    expected = sha256 or _recorded_sha256(path)
+    if not force and os.path.exists(path) and topology_problem(path) is None:
+        print(f"[OK] {path} already present" + (" and verified" if expected else ""))
+        return path
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    print(f"Downloading {url} ...")
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with urllib.request.urlopen(url, timeout=60) as response, open(tmp, 'wb') as f:
+            for block in iter(lambda: response.read(1 << 20), b''):
+                f.write(block)
+        actual = file_digest(tmp)
+        if expected and actual != expected:
+            raise ValueError(f"SHA-256 mismatch for {url}: expected {expected}, got {actual}")
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    if expected:
+        print(f"[OK] {path} written, SHA-256 verified ({actual})")
+    else:
+        with open(path + '.sha256', 'w') as f:
+            f.write(f"{actual}  {os.path.basename(path)}\n")
+        print(f"[OK] {path} written; SHA-256 {actual} recorded in {path}.sha256 "
+              f"(commit it to pin this copy)")
+    return path
+
+
+def conic_equal_area(parallels, rotate, center, scale, translate):
+    """d3.geoConicEqualArea as a vectorized (lon, lat) -> (x, y) function."""
+    sy0 = math.sin(math.radians(parallels[0]))
+    n = (sy0 + math.sin(math.radians(parallels[1]))) / 2
+    c = 1 + sy0 * (2 * n - sy0)
+    r0 = math.sqrt(c) / n
+
+    def raw(lam, phi):
+        r = np.sqrt(c - 2 * n * np.sin(phi)) / n
+        return r * np.sin(lam * n), r0 - r * np.cos(lam * n)
+
+    cx, cy = raw(math.radians(center[0]), math.radians(center[1]))
+    dx, dy = translate[0] - scale * cx, translate[1] + scale * cy
+
+    def project(lon, lat):
+        lam = np.radians(lon + rotate)
+        lam = np.where(lam > np.pi, lam - 2 * np.pi, np.where(lam < -np.pi, lam + 2 * np.pi, lam))
+        x, y = raw(lam, np.radians(lat))
+        return np.column_stack([dx + scale * x, dy - scale * y])
+
+    return project
+
+
+def albers_usa(scale=SCALE, translate=(WIDTH / 2, HEIGHT / 2)):
+    """The three d3.geoAlbersUsa sub-projections, keyed by state FIPS routing."""
+    x, y = translate
+    return {
+        'lower48': conic_equal_area((29.5, 45.5), 96, (-0.6, 38.7), scale, (x, y)),
+        ALASKA: conic_equal_area((55, 65), 154, (-2, 58.5), scale * 0.35,
+                                 (x - 0.307 * scale, y + 0.201 * scale)),
+        HAWAII: conic_equal_area((8, 18), 157, (-3, 19.9), scale,
+                                 (x - 0.205 * scale, y + 0.212 * scale)),
+    }
+
+
+def decode_arcs(topology):
+    """Absolute (lon, lat) arrays for every arc, undoing quantization."""
+    transform = topology.get('transform')
+    arcs = []
+    for arc in topology['arcs']:
+        points = np.asarray(arc, dtype=float)
+        if transform:
+            points = np.cumsum(points, axis=0) * transform['scale'] + transform['translate']
+        arcs.append(points)
+    return arcs
+
+
+def _polygons(geometry):
+    if geometry['type'] == 'Polygon':
+        return [geometry['arcs']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['arcs']
+    return []
+
+
+def _arc_refs(geometry):
+    for polygon in _polygons(geometry):
+        for ring in polygon:
+            for ref in ring:
+                yield ref if ref >= 0 else ~ref
+
+
+def dp_importance(points):
+    """Douglas-Peucker importance per vertex; keeping weight >= t simplifies at t."""
+    n = len(points)
+    weight = np.zeros(n)
+    weight[0] = weight[-1] = np.inf
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        a, b, cap = stack.pop()
+        if b - a < 2:
+            continue
+        inner = points[a + 1:b]
+        start, end = points[a], points[b]
+        chord = end - start
+        length = math.hypot(chord[0], chord[1])
+        if length == 0:
+            dist = np.hypot(*(inner - start).T)
+        else:
+            dist = np.abs(chord[0] * (inner[:, 1] - start[1]) - chord[1] * (inner[:, 0] - start[0])) / length
+        k = int(np.argmax(dist))
+        i = a + 1 + k
+        # A child never outranks its parent, so thresholds stay nested
+        weight[i] = min(dist[k], cap)
+        stack.append((a, i, weight[i]))
+        stack.append((i, b, weight[i]))
+    if n > 3 and np.array_equal(points[0], points[-1]):
+        # Closed arcs (islands) keep enough vertices to stay a polygon
+        weight[np.argsort(weight[1:-1])[-2:] + 1] = np.inf
+    return weight
+
+
+def project_arcs(topology, arcs):
+    """Project each arc with the sub-projection of the counties that use it."""
+    route = {}
+    for geometry in topology['objects']['counties']['geometries']:
+        state = str(geometry.get('id', ''))[:2]
+        for ref in _arc_refs(geometry):
+            route.setdefault(ref, state)
+    projections = albers_usa()
+    projected = []
+    for i, points in enumerate(arcs):
+        state = route.get(i, '')
+        projection = projections.get(state, projections['lower48'])
+        projected.append(projection(points[:, 0], points[:, 1]))
+    return projected
+
+
+def _path(rings, decimals):
+    """SVG path data; rings are closed with Z, polylines are left open."""
+    parts = []
+    for points, closed in rings:
+        coords = ['%s,%s' % (format(x, f'.{decimals}f').rstrip('0').rstrip('.'),
+                             format(y, f'.{decimals}f').rstrip('0').rstrip('.'))
+                  for x, y in points]
+        parts.append('M' + 'L'.join(coords) + ('Z' if closed else ''))
+    return ''.join(parts)
+
+
+def _simplified(arcs, weights, tolerance, decimals):
+    """Arcs thinned to `tolerance`, quantized, with repeated points dropped."""
+    out = []
+    for points, weight in zip(arcs, weights):
+        kept = np.round(points[weight >= tolerance], decimals)
+        repeat = np.r_[False, np.all(kept[1:] == kept[:-1], axis=1)]
+        out.append(kept[~repeat])
+    return out
+
+
+def _ring(arcs, refs):
+    points = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        points.append(arc if not points else arc[1:])
+    return np.vstack(points)
+
+
+def build_geometry(topology_path=TOPOLOGY_FILE, out_dir=GEOMETRY_DIR, levels=LEVELS):
+    """Write one pre-projected geometry file per zoom level plus index.json."""
+    with open(topology_path) as f:
+        topology = json.load(f)
+    os.makedirs(out_dir, exist_ok=True)
+
+    arcs = project_arcs(topology, decode_arcs(topology))
+    weights = [dp_importance(points) for points in arcs]
+
+    counties = [g for g in topology['objects']['counties']['geometries'] if _polygons(g)]
+    fips = normalize_fips([g.get('id') for g in counties]).tolist()
+    keep = [(f, g) for f, g in zip(fips, counties)
+            if isinstance(f, str) and f[:2] not in TERRITORIES]
+
+    # State borders: arcs shared by two different state geometries
+    owners = {}
+    for index, geometry in enumerate(topology['objects'].get('states', {}).get('geometries', [])):
+        for ref in set(_arc_refs(geometry)):
+            owners.setdefault(ref, set()).add(index)
+    border_arcs = sorted(ref for ref, states in owners.items() if len(states) > 1)
+
+    index = {'viewBox': [0, 0, WIDTH, HEIGHT], 'levels': []}
+    for zoom, tolerance in levels:
+        decimals = max(0, math.ceil(-math.log10(tolerance / 2)))
+        level_arcs = _simplified(arcs, weights, tolerance, decimals)
+        paths = {}
+        for county_fips, geometry in keep:
+            rings = [(_ring(level_arcs, ring), True)
+                     for polygon in _polygons(geometry) for ring in polygon]
+            rings = [(points, closed) for points, closed in rings if len(points) >= 4]
+            if rings:
+                paths[county_fips] = _path(rings, decimals)
+        states = _path([(level_arcs[ref], False) for ref in border_arcs], decimals)
+
+        name = f'counties_z{zoom}.json'
+        with open(os.path.join(out_dir, name), 'w') as f:
+            json.dump({'zoom': zoom, 'tolerance': tolerance, 'counties': paths, 'states': states},
+                      f, separators=(',', ':'))
+        index['levels'].append({'zoom': zoom, 'tolerance': tolerance, 'file': name})
+        size = os.path.getsize(os.path.join(out_dir, name))
+        print(f"    z{zoom}: {len(paths):,} counties, tolerance {tolerance}px, {size / 1e3:,.0f} KB")
+
+    with open(os.path.join(out_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=1)
+    print(f"\n[OK] Geometry written to {out_dir}/ ({len(levels)} levels)")
+    return index
@@ -0,0 +1,296 @@
+"""
+Random forest life-expectancy models per (year, state, feature set)
+
+A task is one model: the counties of a year (nationally, or one state's)
+that have the target and every feature of a feature set. evaluate() scores
+it with K-fold cross-validation and measures permutation importance on
+each held-out fold, then refits on all rows for the model that is kept, so
+R² and importances describe counties the forest did not train on. The
+refit's impurity importances and training R² are kept for comparison.
+
+Fitted models are stored as <models dir>/<key>.joblib with their scores in
+<key>.json; the key hashes the task's rows and every parameter (features,
+forest settings, folds, repeats, seed, sklearn version). A stored key is
+never retrained, so unchanged years and states cost nothing and years with
+identical inputs share one model. fit_cached() is the fit-or-load entry
+point for one model (the feature importance figure draws through it);
+train_all() runs every remaining task in a process pool, largest first
+and one core per forest, and writes the results table with per-task
+timings.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import config_digest, frame_digest
+
+MODELS_DIR = 'data/models'
+RESULTS_FILE = 'results.csv'
+IMPORTANCE_FILE = 'importance.csv'
+TARGET = 'life_expectancy'
+FEATURE_SETS = {
+    'all': ['median_income', 'uninsured', 'primary_care_rate',
+            'adult_obesity', 'adult_smoking', 'physical_inactivity', 'diabetes'],
+    'socioeconomic': ['median_income', 'hs_graduation', 'uninsured', 'primary_care_rate'],
+    'behaviors': ['adult_obesity', 'adult_smoking', 'physical_inactivity', 'diabetes', 'excessive_drinking'],
+}
+FOREST = {'n_estimators': 100, 'random_state': 42}
+FOLDS = 5
+REPEATS = 5
+SEED = 42
+# Fewest complete rows for a model (at least 6 held out per fold)
+MIN_ROWS = 30
+# Bump when evaluate() or the stored result layout changes
+MODEL_VERSION = 1
+
+RESULT_COLUMNS = ['year', 'state', 'feature_set', 'n', 'cv_r2_mean', 'cv_r2_std', 'train_r2', 'status',
+                  'seconds', 'cv_seconds', 'permutation_seconds', 'fit_seconds', 'key']
+IMPORTANCE_COLUMNS = ['year', 'state', 'feature_set', 'feature', 'permutation_mean', 'permutation_std',
+                      'impurity']
+
+
+def model_key(data, features, forest=FOREST, folds=FOLDS, repeats=REPEATS, seed=SEED):
+    """Hash of a task's rows and everything that shapes its model."""
+    import sklearn
+    return config_digest({
+        'version': MODEL_VERSION, 'data': frame_digest(data[features + [TARGET]]),
+        'features': features, 'target': TARGET, 'forest': forest,
+        'folds': folds, 'repeats': repeats, 'seed': seed, 'sklearn': sklearn.__version__,
+    })
+
+
+def evaluate(data, features, forest=FOREST, folds=FOLDS, repeats=REPEATS, seed=SEED, n_jobs=1):
+    """Cross-validated R² and held-out permutation importance.
+
+    Returns (model refit on all rows, JSON-able result dict).
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.inspection import permutation_importance
+    from sklearn.model_selection import KFold
+
+    X = data[features].to_numpy(dtype=float)
+    y = data[TARGET].to_numpy(dtype=float)
+
+    scores, importances = [], []
+    cv_seconds = permutation_seconds = 0.0
+    for train, test in KFold(folds, shuffle=True, random_state=seed).split(X):
+        start = time.perf_counter()
+        model = RandomForestRegressor(n_jobs=n_jobs, **forest).fit(X[train], y[train])
+        scores.append(model.score(X[test], y[test]))
+        cv_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        perm = permutation_importance(model, X[test], y[test], n_repeats=repeats,
+                                      random_state=seed, n_jobs=n_jobs)
+        importances.append(perm.importances)
+        permutation_seconds += time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = RandomForestRegressor(n_jobs=n_jobs, **forest).fit(X, y)
+    fit_seconds = time.perf_counter() - start
+
+    # features x (folds * repeats) drops in held-out R²
+    importances = np.concatenate(importances, axis=1)
+    return model, {
+        'n': int(len(y)),
+        'features': list(features),
+        'cv_r2': [round(float(s), 6) for s in scores],
+        'cv_r2_mean': round(float(np.mean(scores)), 6),
+        'cv_r2_std': round(float(np.std(scores)), 6),
+        'train_r2': round(float(model.score(X, y)), 6),
+        'permutation_mean': importances.mean(axis=1).round(6).tolist(),
+        'permutation_std': importances.std(axis=1).round(6).tolist(),
+        'impurity': model.feature_importances_.round(6).tolist(),
+        'cv_seconds': round(cv_seconds, 4),
+        'permutation_seconds': round(permutation_seconds, 4),
+        'fit_seconds': round(fit_seconds, 4),
+    }
+
+
+def _paths(store_dir, key):
+    return os.path.join(store_dir, key + '.joblib'), os.path.join(store_dir, key + '.json')
+
+
+def load_result(key, store_dir=MODELS_DIR):
+    """Stored result for `key`, or None when the model is not stored."""
+    model_path, result_path = _paths(store_dir, key)
+    if not os.path.exists(model_path):
+        return None
+    try:
+        with open(result_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_model(key, store_dir=MODELS_DIR):
+    """The fitted forest stored under `key`."""
+    import joblib
+    return joblib.load(_paths(store_dir, key)[0])
+
+
+def fit_cached(data, features, store_dir=MODELS_DIR, force=False, forest=FOREST,
+               folds=FOLDS, repeats=REPEATS, seed=SEED, n_jobs=1):
+    """evaluate(), reused from `store_dir` while the rows and parameters are unchanged.
+
+    Returns the result dict with its 'key' and a 'status' of 'trained' or 'reused'.
+    """
+    import joblib
+
+    params = dict(forest=forest, folds=folds, repeats=repeats, seed=seed)
+    key = model_key(data, features, **params)
+    result = None if force else load_result(key, store_dir)
+    if result is not None:
+        return dict(result, status='reused')
+
+    model, result = evaluate(data, features, n_jobs=n_jobs, **params)
+    result['key'] = key
+    os.makedirs(store_dir, exist_ok=True)
+    model_path, result_path = _paths(store_dir, key)
+    # Per-process temp names so concurrent writers of one key never collide;
+    # the JSON goes last because its presence marks a complete entry
+    tmp = f'.{os.getpid()}.tmp'
+    joblib.dump(model, model_path + tmp, compress=3)
+    with open(result_path + tmp, 'w') as f:
+        json.dump(result, f)
+    os.replace(model_path + tmp, model_path)
+    os.replace(result_path + tmp, result_path)
+    return dict(result, status='trained')
+
+
+def plan_tasks(df, years, states, feature_sets=FEATURE_SETS, min_rows=MIN_ROWS):
+    """One task per (year, state, feature set) with `min_rows` complete rows.
+
+    `states` may include None for the national model. Returns (tasks, number skipped).
+    """
+    tasks, skipped = [], 0
+    for year in years:
+        df_year = df[df['year'] == year]
+        by_state = dict(tuple(df_year.groupby('state')))
+        for state in states:
+            rows = df_year if state is None else by_state.get(state, df_year.iloc[:0])
+            for name, features in feature_sets.items():
+                data = rows[features + [TARGET]].dropna().reset_index(drop=True)
+                if len(data) < min_rows:
+                    skipped += 1
+                    continue
+                tasks.append({'year': year, 'state': state, 'feature_set': name,
+                              'features': features, 'data': data})
+    return tasks, skipped
+
+
+def _run_task(data, features, store_dir, force, params):
+    """Worker entry point; returns (result, seconds)."""
+    start = time.perf_counter()
+    result = fit_cached(data, features, store_dir, force, **params)
+    return result, time.perf_counter() - start
+
+
+def _label(task):
+    return f"{task['year']} {task['state'] or 'U.S.'} {task['feature_set']}"
+
+
+def _rows(task, result, seconds):
+    """One results row and its per-feature importance rows."""
+    row = {
+        'year': task['year'], 'state': task['state'], 'feature_set': task['feature_set'],
+        'n': result['n'], 'cv_r2_mean': result['cv_r2_mean'], 'cv_r2_std': result['cv_r2_std'],
+        'train_r2': result['train_r2'], 'status': result['status'], 'seconds': round(seconds, 4),
+        'cv_seconds': result['cv_seconds'], 'permutation_seconds': result['permutation_seconds'],
+        'fit_seconds': result['fit_seconds'], 'key': result['key'],
+    }
+    importance = [
+        {'year': task['year'], 'state': task['state'], 'feature_set': task['feature_set'],
+         'feature': feature, 'permutation_mean': mean, 'permutation_std': std, 'impurity': impurity}
+        for feature, mean, std, impurity in zip(result['features'], result['permutation_mean'],
+                                                result['permutation_std'], result['impurity'])
+    ]
+    return row, importance
+
+
+def train_all(df, years=None, states=None, feature_sets=FEATURE_SETS, out_dir=MODELS_DIR,
+              workers=0, force=False, forest=FOREST, folds=FOLDS, repeats=REPEATS, seed=SEED):
+    """Train or reuse every (year, state, feature set) model, `workers` at a time (0 = all cores).
+
+    `states` are names or 'all'; the national model of each year is always
+    included. Writes results.csv and importance.csv to `out_dir` (national
+    rows have an empty state) and returns the results table.
+    """
+    years = years or sorted(df['year'].unique())
+    if states in ('all', ['all']):
+        states = sorted(df['state'].dropna().unique())
+    tasks, skipped = plan_tasks(df, years, [None] + list(states or []), feature_sets)
+    params = dict(forest=forest, folds=folds, repeats=repeats, seed=seed)
+    workers = workers or os.cpu_count() or 1
+
+    # Look stored models up here so reused tasks never ship their rows to a worker
+    rows, importance, todo = [], [], {}
+    for task in tasks:
+        task['key'] = model_key(task['data'], task['features'], **params)
+        stored = None if force else load_result(task['key'], out_dir)
+        if stored is not None:
+            row, imp = _rows(task, dict(stored, status='reused'), 0.0)
+            rows.append(row)
+            importance.extend(imp)
+        else:
+            todo.setdefault(task['key'], []).append(task)
+    # Identical inputs (e.g. CHR-only features repeated across years) train once
+    groups = sorted(todo.values(), key=lambda group: -len(group[0]['data']))
+    pending = sum(len(group) for group in groups)
+    print(f"\n[MODELS] {len(tasks)} models ({skipped} skipped, < {MIN_ROWS} complete rows): "
+          f"{len(groups)} to train, {len(tasks) - pending} reused"
+          + (f", {workers} workers" if workers > 1 and len(groups) > 1 else ""))
+
+    def record(group, result, seconds):
+        for i, task in enumerate(group):
+            # Duplicates of a trained task reuse its model
+            row, imp = _rows(task, result if i == 0 else dict(result, status='reused'),
+                             seconds if i == 0 else 0.0)
+            rows.append(row)
+            importance.extend(imp)
+        if result['status'] == 'trained':
+            print(f"   [OK] {_label(group[0])}: CV R² {result['cv_r2_mean']:.3f} "
+                  f"± {result['cv_r2_std']:.3f} (n={result['n']:,}, {seconds:.1f}s)")
+
+    wall = time.perf_counter()
+    if workers == 1 or len(groups) < 2:
+        for group in groups:
+            task = group[0]
+            with profiling.stage('models.train', rows_in=len(task['data']), year=task['year'],
+                                 state=task['state'], feature_set=task['feature_set']):
+                record(group, *_run_task(task['data'], task['features'], out_dir, force, params))
+    else:
+        with profiling.stage('models.pool', rows_in=len(groups), workers=workers):
+            with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+                futures = {pool.submit(_run_task, group[0]['data'], group[0]['features'],
+                                       out_dir, force, params): group for group in groups}
+                for future in as_completed(futures):
+                    record(futures[future], *future.result())
+    wall = time.perf_counter() - wall
+
+    keys = ['year', 'state', 'feature_set']
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS).sort_values(keys, key=_national_first)
+    importance = pd.DataFrame(importance, columns=IMPORTANCE_COLUMNS).sort_values(
+        keys, key=_national_first, kind='stable')
+    results, importance = results.reset_index(drop=True), importance.reset_index(drop=True)
+    os.makedirs(out_dir, exist_ok=True)
+    results.to_csv(os.path.join(out_dir, RESULTS_FILE), index=False)
+    importance.to_csv(os.path.join(out_dir, IMPORTANCE_FILE), index=False)
+
+    trained = results['status'].eq('trained')
+    task_seconds = results['seconds'].sum()
+    print(f"\n[OK] {len(results)} models in {os.path.join(out_dir, RESULTS_FILE)}: "
+          f"{int(trained.sum())} trained in {wall:.1f}s wall / {task_seconds:.1f}s summed "
+          f"({task_seconds / wall if wall > 0.01 else 1:.1f}x)")
+    return results
+
+
+def _national_first(column):
+    # The national (empty) state sorts ahead of every state name
+    return column.fillna('') if column.name == 'state' else column
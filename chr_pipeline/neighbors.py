@@ -0,0 +1,149 @@
+"""
+Precomputed "similar counties": top-k nearest neighbors per county and year
+
+Each year's metric vectors are standardized (z-scores over that year's
+counties), using only metrics observed for at least MIN_COVERAGE of the
+counties, so PLACES-only metrics drop out of the years they are missing
+from instead of emptying them. Counties observed on fewer than MIN_OBSERVED
+of those metrics are left out; remaining gaps are set to the year's mean
+(z = 0), which neither pulls a county towards nor away from any other on
+that metric beyond the shared offset.
+
+The vectors go into a BallTree (Euclidean) and every county is queried
+against it in batches of BATCH rows, so the whole table costs one tree
+build and a few vectorized queries per year rather than a pairwise
+distance matrix per click. The result is written as compact JSON: per year
+the FIPS order, then each county's neighbors as indices into that order
+with their distances. The map's county panel reads it directly (see
+showCountyInfo in script.js); load_neighbors() gives analysis code the
+same table as a DataFrame.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import frame_digest
+from .converter import metric_columns
+
+NEIGHBORS_FILE = 'data/neighbors.json'
+K = 10
+MIN_COVERAGE = 0.75
+MIN_OBSERVED = 0.5
+BATCH = 2048
+# Bump when the standardization, search or result layout changes
+CACHE_VERSION = 1
+
+
+def standardize(df_year, metrics, min_coverage=MIN_COVERAGE, min_observed=MIN_OBSERVED):
+    """Z-scored vectors for one year; returns (kept row mask, metrics used, matrix)."""
+    values = df_year[metrics].to_numpy(dtype=float)
+    observed = ~np.isnan(values)
+    used = observed.mean(axis=0) >= min_coverage
+    values, observed = values[:, used], observed[:, used]
+    keep = observed.mean(axis=1) >= min_observed if used.any() else np.zeros(len(values), dtype=bool)
+    values, observed = values[keep], observed[keep]
+
+    mean = np.nanmean(values, axis=0)
+    std = np.nanstd(values, axis=0)
+    std[~(std > 0)] = 1.0
+    z = np.where(observed, (values - mean) / std, 0.0)
+    return keep, [m for m, u in zip(metrics, used) if u], z
+
+
+def nearest(z, k=K, batch=BATCH):
+    """Indices and distances of each row's k nearest other rows."""
+    from sklearn.neighbors import BallTree
+
+    k = min(k, len(z) - 1)
+    tree = BallTree(z)
+    indices = np.empty((len(z), k), dtype=np.int64)
+    distances = np.empty((len(z), k))
+    for start in range(0, len(z), batch):
+        rows = np.arange(start, min(start + batch, len(z)))
+        dist, idx = tree.query(z[rows], k=k + 1)
+        # Drop each row itself; with exact duplicates it need not come first
+        is_self = idx == rows[:, None]
+        is_self[~is_self.any(axis=1), -1] = True
+        indices[rows] = idx[~is_self].reshape(len(rows), k)
+        distances[rows] = dist[~is_self].reshape(len(rows), k)
+    return indices, distances
+
+
+def build_neighbors(df, metrics=None, k=K):
+    """Top-k neighbors for every county and year.
+
+    Returns {year: {'metrics', 'fips' (array), 'neighbors' (rows x k
+    indices into 'fips'), 'distance'}}.
+    """
+    metrics = metrics or metric_columns(df)
+    result = {}
+    for year, df_year in df.groupby('year', sort=True):
+        keep, used, z = standardize(df_year, metrics)
+        if len(z) < 2:
+            continue
+        with profiling.stage('neighbors.query', rows_in=len(z), year=year, metrics=len(used)) as s:
+            indices, distances = nearest(z, k)
+            s.rows_out = indices.size
+        result[int(year)] = {
+            'metrics': used,
+            'fips': df_year['fips'].to_numpy()[keep],
+            'neighbors': indices,
+            'distance': distances,
+        }
+    return result
+
+
+def load_result(df, metrics=None, k=K, cache=None):
+    """build_neighbors(), reused from `cache` while the input frame is unchanged."""
+    if cache is None:
+        return build_neighbors(df, metrics, k)
+    config = {'version': CACHE_VERSION, 'data': frame_digest(df), 'metrics': metrics, 'k': k}
+    result, hit = cache.get_or_build('neighbors', [], config, lambda: build_neighbors(df, metrics, k))
+    if hit:
+        print("[CACHE] Dataset unchanged, reusing neighbor table")
+    return result
+
+
+def write_neighbors(df, path=NEIGHBORS_FILE, k=K, cache=None):
+    """Write the front-end JSON neighbor table."""
+    result = load_result(df, k=k, cache=cache)
+    sidecar = {
+        'k': k,
+        'years': {
+            str(year): {
+                'metrics': entry['metrics'],
+                'fips': entry['fips'].tolist(),
+                'neighbors': entry['neighbors'].tolist(),
+                'distance': entry['distance'].round(3).tolist(),
+            }
+            for year, entry in result.items()
+        },
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    counties = max((len(entry['fips']) for entry in result.values()), default=0)
+    print(f"\n[OK] Neighbors written to {path}: top {k} for up to {counties:,} counties "
+          f"in {len(result)} years")
+    return sidecar
+
+
+def load_neighbors(path=NEIGHBORS_FILE):
+    """The written table as a long DataFrame (year, fips, rank, neighbor, distance)."""
+    with open(path) as f:
+        sidecar = json.load(f)
+    frames = []
+    for year, entry in sidecar['years'].items():
+        fips = np.asarray(entry['fips'], dtype=object)
+        neighbors = np.asarray(entry['neighbors'], dtype=np.int64)
+        n, k = neighbors.shape
+        frames.append(pd.DataFrame({
+            'year': int(year),
+            'fips': np.repeat(fips, k),
+            'rank': np.tile(np.arange(1, k + 1), n),
+            'neighbor': fips[neighbors.ravel()],
+            'distance': np.asarray(entry['distance'], dtype=float).ravel(),
+        }))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,50 @@
+"""
+Pipeline stages wired together in memory
+
+Each stage hands its DataFrame straight to the next one. The dataset CSV is
+only read when a stage runs on its own, and only written once at the end.
+"""
+
+import pandas as pd
+
+from . import converter, places, profiling
+
+DATA_FILE = 'data/county_health_data.csv'
+
+
+def read_dataset(path=DATA_FILE):
+    """Load a pipeline CSV with FIPS kept as 5-digit strings."""
+    with profiling.stage('dataset.read_csv') as s:
+        df = pd.read_csv(path, dtype={'fips': str})
+        s.rows_out = len(df)
+    return df
+
+
+def write_dataset(df, path=DATA_FILE):
+    with profiling.stage('dataset.write_csv', rows_in=len(df)):
+        df.to_csv(path, index=False)
+    print(f"\n[SUCCESS] Saved to {path}")
+
+
+def run(workbook=converter.input_file, file_mapping=places.places_file_mapping,
+        output=DATA_FILE, jobs=1, cache=None, figures_dir=None):
+    """Convert -> integrate (-> figures), returning the integrated frame.
+
+    `output=None` skips writing the CSV; `figures_dir` renders the
+    exploratory figures from the in-memory frame.
+    """
+    chr_df = converter.load_chr(workbook, cache)
+    print(f"\n[SUCCESS] Processed {len(chr_df)} counties")
+    converter.report(chr_df)
+
+    print(f"\n[1] CHR 2024 baseline: {len(chr_df)} counties (in memory)")
+    combined_df = places.integrate(places.chr_baseline(chr_df), file_mapping, jobs=jobs, cache=cache)
+    places.report(combined_df)
+
+    if figures_dir:
+        from .analysis import render_figures
+        render_figures(combined_df, figures_dir, jobs=jobs)
+
+    if output:
+        write_dataset(combined_df, output)
+    return combined_df
@@ -0,0 +1,338 @@
+"""
+Integrate REAL PLACES data with correct year mapping
+PLACES release files contain data from 2 years prior!
+
+Release files are streamed in chunks: only the columns we use are parsed,
+with compact dtypes, and each chunk is filtered to the target year and the
+mapped measures before it is kept, so peak memory tracks the filtered rows
+rather than the size of the release file.
+
+Releases are independent until the final concat, so `jobs` spreads
+them across a process pool. Results are merged in data-year order, which
+keeps the output identical to a serial run.
+
+Each release's pivot is cached by file hash + PLACES_MAPPING + its
+places_file_mapping entry, so adding one release only parses that release.
+
+The 2020 release has no LocationID; its county names are resolved to FIPS
+through the crosswalk (see crosswalk.py) and then merged like the others.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from . import profiling
+from .crosswalk import build_crosswalk, report_unmatched
+
+# Mapping PLACES measures to our metric names
+PLACES_MAPPING = {
+    'Obesity among adults': 'adult_obesity',
+    'Current cigarette smoking among adults': 'adult_smoking',
+    'No leisure-time physical activity among adults': 'physical_inactivity',
+    'Diagnosed diabetes among adults': 'diabetes',
+    'Binge drinking among adults': 'excessive_drinking',
+    'Fair or poor self-rated health status among adults': 'poor_health',
+    'Current lack of health insurance among adults aged 18-64 years': 'uninsured',
+}
+
+# Map release files to the data years they contain (using the MOST RECENT year in each file)
+places_file_mapping = {
+    2018: ('2020_release', 'data/PLACES__Local_Data_for_Better_Health,_County_Data_2020_release_20251026.csv'),
+    2019: ('2021_release', 'data/PLACES__Local_Data_for_Better_Health,_County_Data_2021_release_20251026.csv'),
+    2020: ('2022_release', 'data/PLACES__Local_Data_for_Better_Health,_County_Data_2022_release_20251026.csv'),
+    2021: ('2023_release', 'data/PLACES__Local_Data_for_Better_Health,_County_Data_2023_release_20251026.csv'),
+    2022: ('2024_release', 'data/PLACES__Local_Data_for_Better_Health,_County_Data_2024_release_20251026.csv'),
+}
+
+# State abbreviation mapping
+state_abbr_map = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS',
+    'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH',
+    'New Jersey': 'NJ', 'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC',
+    'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA',
+    'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN',
+    'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY', 'District of Columbia': 'DC'
+}
+
+# CHR 2024 metrics that PLACES doesn't have
+chr_only_metrics = [
+    'life_expectancy', 'premature_death', 'median_income',
+    'hs_graduation', 'unemployment', 'primary_care_rate',
+    'poor_physical_days', 'poor_mental_days', 'vaccinated',
+    'exercise_access', 'preventable_hosp', 'mammogram_rate',
+    'air_pollution', 'housing_problems'
+]
+
+MEASURE_DTYPE = pd.CategoricalDtype(list(PLACES_MAPPING))
+
+# Columns read from a PLACES release (older releases have no LocationID)
+PLACES_COLUMNS = ['Year', 'Measure', 'LocationID', 'LocationName', 'StateAbbr', 'Data_Value']
+PLACES_DTYPES = {
+    'Year': 'float32',
+    'Measure': 'category',
+    'LocationID': str,
+    'LocationName': str,
+    'StateAbbr': 'category',
+    'Data_Value': 'float32',
+}
+CHUNK_ROWS = 250_000
+
+# Bump when read_places_release/pivot_places change their output
+CACHE_VERSION = 1
+
+
+def read_places_release(filepath, data_year, chunksize=CHUNK_ROWS):
+    """Stream one PLACES release, keeping only `data_year` rows of mapped measures.
+
+    Peak memory is one raw chunk plus the rows that survive the filter.
+    """
+    reader = pd.read_csv(
+        filepath,
+        usecols=lambda col: col in PLACES_COLUMNS,
+        dtype=PLACES_DTYPES,
+        chunksize=chunksize,
+    )
+    kept, rows_read = [], 0
+    with profiling.stage('places.read', year=data_year) as s, reader:
+        for chunk in reader:
+            rows_read += len(chunk)
+            with profiling.stage('places.filter', rows_in=len(chunk), year=data_year) as f:
+                mask = (chunk['Year'] == data_year) & chunk['Measure'].isin(MEASURE_DTYPE.categories)
+                f.rows_out = int(mask.sum())
+                if f.rows_out:
+                    kept.append(chunk.loc[mask].drop(columns='Year'))
+
+        if not kept:
+            # Nothing survived the filter: an empty frame with the columns and dtypes of a filtered read
+            kept = [pd.DataFrame({col: pd.Series(dtype=PLACES_DTYPES[col])
+                                  for col in PLACES_COLUMNS if col != 'Year'})]
+        df = pd.concat(kept, ignore_index=True)
+        # Chunks infer their own categories, so re-unify them after concat
+        df['Measure'] = df['Measure'].astype(str).astype(MEASURE_DTYPE)
+        df['StateAbbr'] = df['StateAbbr'].astype(str).astype('category')
+        s.rows_in, s.rows_out = rows_read, len(df)
+    return df
+
+
+def _widen(values):
+    """float32 -> float64 via the shortest float32 repr, so 30.1 stays 30.1."""
+    return pd.to_numeric(values.astype(str), errors='coerce')
+
+
+def pivot_places(df):
+    """One row per county with a column per mapped measure."""
+    with profiling.stage('places.pivot', rows_in=len(df)) as s:
+        pivot_df = _pivot(df)
+        s.rows_out = len(pivot_df)
+    return pivot_df
+
+
+def _pivot(df):
+    # Format FIPS codes
+    if 'LocationID' in df.columns:
+        df['fips'] = df['LocationID'].astype(str).str.zfill(5)
+        pivot_index = ['fips', 'LocationName', 'StateAbbr']
+    else:
+        # For 2018 (2020_release), match by county name
+        df['county_state_key'] = df['LocationName'].str.strip() + '|' + df['StateAbbr'].astype(str).str.strip()
+        pivot_index = ['county_state_key', 'LocationName', 'StateAbbr']
+
+    # Pivot to get one row per county
+    pivot_df = df.pivot_table(
+        index=pivot_index,
+        columns='Measure',
+        values='Data_Value',
+        aggfunc='first',
+        observed=True,
+    )
+    pivot_df.columns = [PLACES_MAPPING[str(m)] for m in pivot_df.columns]
+    pivot_df = pivot_df.reset_index()
+
+    for col in PLACES_MAPPING.values():
+        if col in pivot_df.columns:
+            pivot_df[col] = _widen(pivot_df[col])
+    return pivot_df
+
+
+def load_release(data_year, filepath):
+    """Read and pivot one release; returns (rows kept, per-county frame)."""
+    df = read_places_release(filepath, data_year)
+    return len(df), pivot_places(df)
+
+
+def release_cache_config(data_year, release_name):
+    """Everything besides the file contents that shapes one release's pivot."""
+    return {
+        'version': CACHE_VERSION,
+        'places_mapping': PLACES_MAPPING,
+        'release': [data_year, release_name],
+        'columns': PLACES_COLUMNS,
+    }
+
+
+def load_releases(file_mapping, jobs=1, cache=None):
+    """Pivoted PLACES frames keyed by data year.
+
+    Releases found in `cache` are reused; the rest are read serially, or
+    with jobs > 1 by one worker process each (jobs=0 uses every core). The
+    returned dict is always in data-year order.
+    """
+    results, keys, todo = {}, {}, []
+    for year, (release_name, path) in sorted(file_mapping.items()):
+        if cache is not None:
+            keys[year] = cache.key(f'places-{year}', [path], release_cache_config(year, release_name))
+            cached = cache.get(keys[year])
+            if cached is not None:
+                print(f"    [CACHE] {release_name} unchanged, reusing pivot")
+                results[year] = cached
+                continue
+        todo.append((year, path))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1 or len(todo) <= 1:
+        built = [load_release(year, path) for year, path in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            futures = [pool.submit(load_release, year, path) for year, path in todo]
+            built = [future.result() for future in futures]
+
+    for (year, _), result in zip(todo, built):
+        if cache is not None:
+            cache.put(keys[year], result, label=f'places-{year}')
+        results[year] = result
+    if cache is not None:
+        cache.save()
+    return {year: results[year] for year in sorted(results)}
+
+
+def county_crosswalk(chr_2024, cache=None):
+    """Name -> FIPS crosswalk over the CHR county list."""
+    with profiling.stage('places.crosswalk', rows_in=len(chr_2024)) as s:
+        crosswalk = build_crosswalk(chr_2024['fips'], chr_2024['county'],
+                                    chr_2024['state'].map(state_abbr_map), cache)
+        s.rows_out = len(crosswalk)
+    return crosswalk
+
+
+def resolve_names(pivot_df, crosswalk):
+    """Give a name-keyed pivot a fips column, dropping names that don't resolve."""
+    fips = crosswalk.lookup(pivot_df['LocationName'], pivot_df['StateAbbr']).to_numpy()
+    report_unmatched(pivot_df['LocationName'], pivot_df['StateAbbr'], fips)
+    resolved = pivot_df.assign(fips=fips).dropna(subset=['fips'])
+    return resolved.drop_duplicates('fips', keep='first')
+
+
+def merge_year(chr_2024, pivot_df, data_year, crosswalk=None):
+    """Attach one year's PLACES values to the CHR 2024 county list."""
+    # Start with CHR 2024 structure
+    year_df = chr_2024[['fips', 'county', 'state']].copy()
+    year_df['year'] = data_year
+
+    if 'fips' not in pivot_df.columns:
+        # Name-keyed release (2018): resolve LocationName|StateAbbr to FIPS first
+        if crosswalk is None:
+            crosswalk = county_crosswalk(chr_2024)
+        pivot_df = resolve_names(pivot_df, crosswalk)
+
+    # Merge PLACES data on FIPS
+    merge_cols = ['fips'] + [c for c in PLACES_MAPPING.values() if c in pivot_df.columns]
+    year_df = year_df.merge(
+        pivot_df[merge_cols],
+        on='fips',
+        how='left'
+    )
+
+    # Add CHR 2024 metrics that PLACES doesn't have
+    for metric in chr_only_metrics:
+        if metric in chr_2024.columns:
+            year_df[metric] = chr_2024[metric].values
+
+    return year_df
+
+
+def chr_baseline(df):
+    """The CHR 2024 rows of a converted or previously integrated frame."""
+    return df[df['year'] == 2024].reset_index(drop=True)
+
+
+def integrate(chr_2024, file_mapping=places_file_mapping, jobs=1, cache=None):
+    """Combine the CHR 2024 baseline with every PLACES release into one long frame."""
+    print(f"\n[2] PLACES measures mapped:")
+    for places_name, our_name in PLACES_MAPPING.items():
+        print(f"    {our_name:25s} <- {places_name}")
+
+    all_years_data = []
+
+    # Stream each release, keeping only its year's mapped measures
+    if jobs != 1:
+        print(f"\n[3] Loading {len(file_mapping)} releases with {jobs or os.cpu_count()} worker processes...")
+    with profiling.stage('places.load_releases', jobs=jobs) as s:
+        releases = load_releases(file_mapping, jobs=jobs, cache=cache)
+        s.rows_out = sum(len(pivot_df) for _, pivot_df in releases.values())
+
+    # Built on first use; only name-keyed releases need it
+    crosswalk = None
+
+    # Process years 2018-2022 (the years we have PLACES data for)
+    for data_year, (raw_rows, pivot_df) in releases.items():
+        release_name = file_mapping[data_year][0]
+        print(f"\n[3.{data_year}] Processing {release_name} (contains {data_year} data)...")
+        print(f"    Raw rows after filtering: {raw_rows}")
+
+        if 'fips' not in pivot_df.columns and crosswalk is None:
+            crosswalk = county_crosswalk(chr_2024, cache)
+        with profiling.stage('places.merge', rows_in=len(pivot_df), year=data_year) as s:
+            year_df = merge_year(chr_2024, pivot_df, data_year, crosswalk)
+            s.rows_out = len(year_df)
+
+        # Count coverage
+        places_coverage = {metric: year_df[metric].notna().sum() for metric in PLACES_MAPPING.values() if metric in year_df.columns}
+        print(f"    Data coverage: {places_coverage}")
+
+        all_years_data.append(year_df)
+
+    # Add years 2023-2024 using CHR 2024 data (no PLACES data available yet)
+    print(f"\n[4] Adding 2023-2024 (using CHR 2024 data, PLACES not available)")
+    for year in [2023, 2024]:
+        year_df = chr_2024.copy()
+        year_df['year'] = year
+        all_years_data.append(year_df)
+        print(f"    Added {year} with CHR 2024 values")
+
+    # Combine all years
+    with profiling.stage('places.concat', rows_in=sum(len(d) for d in all_years_data)) as s:
+        combined_df = pd.concat(all_years_data, ignore_index=True)
+        combined_df = combined_df.sort_values(['fips', 'year'])
+
+        # Ensure FIPS is 5-digit string
+        combined_df['fips'] = combined_df['fips'].astype(str).str.zfill(5)
+        s.rows_out = len(combined_df)
+
+    print(f"\n[5] Final combined dataset:")
+    print(f"    Total rows: {len(combined_df):,}")
+    print(f"    Years: {sorted(combined_df['year'].unique())}")
+    print(f"    Counties: {combined_df['fips'].nunique()}")
+    return combined_df
+
+
+def report(combined_df):
+    """Print the data breakdown and a spot check of one county."""
+    print(f"\nData breakdown:")
+    print(f"  - 2018-2022: REAL PLACES historical data")
+    print(f"  - 2023-2024: CHR 2024 values (PLACES data not yet available)")
+    print(f"  - All years: CHR 2024 for socioeconomic metrics (no historical source)")
+    print("=" * 70)
+
+    # Verify
+    print(f"\n[6] Data quality check:")
+    sample_fips = '06037'  # Los Angeles
+    sample_data = combined_df[combined_df['fips'] == sample_fips][['year', 'adult_obesity', 'diabetes', 'life_expectancy']].sort_values('year')
+    print(f"\n    Los Angeles County (06037):")
+    print(sample_data.to_string(index=False))
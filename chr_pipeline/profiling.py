@@ -0,0 +1,233 @@
+"""
+Stage-level tracing for the pipeline
+
+Pipeline code wraps each step in `stage()`:
+
+    with profiling.stage('places.pivot', rows_in=len(df)) as s:
+        pivot_df = ...
+        s.rows_out = len(pivot_df)
+
+Nothing is recorded until enable() is called (the CLI does this for
+--trace / --chrome-trace / --profile-stage), so the hooks cost one
+attribute check when tracing is off. Each finished stage becomes one JSON
+line with wall and CPU seconds, the peak RSS reached above the stage's
+starting RSS, rows in/out and bytes read/written (rchar/wchar from
+/proc/self/io). disable() can also write a Chrome trace-event file, which
+chrome://tracing and Perfetto open directly.
+
+Peak memory is per stage: on Linux the kernel's RSS high-water mark is
+reset at stage entry (/proc/self/clear_refs) and read back at exit. A
+nested stage's reset would lose the enclosing stage's peak so far, so the
+high-water mark is read just before it and folded into the enclosing
+stage, and the child's own peak is handed up at its exit: a stage's peak
+is the max of its RSS before, inside and after its children. Elsewhere ru_maxrss is
+used, which only shows growth past the process's previous peak.
+
+Stages run inside worker processes (places.load_releases with jobs > 1)
+are not traced; the enclosing stage in the parent still is.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_DIR = 'data/profiles'
+
+_active = None
+
+
+def _proc_status(field):
+    """A kB field of /proc/self/status in MB, or None off Linux."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _io_counters():
+    """(bytes read, bytes written) through syscalls, including page-cache hits."""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(':') for line in f)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def _reset_peak():
+    """Reset the RSS high-water mark; False where the kernel doesn't support it."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Stage:
+    """One running stage; set `rows_out` (and any `args`) before it exits."""
+
+    __slots__ = ('name', 'rows_in', 'rows_out', 'args', 'held_peak')
+
+    def __init__(self, name, rows_in=None, args=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.args = args or {}
+        # Peak RSS from before the last reset (by a child) and from the children themselves
+        self.held_peak = 0.0
+
+
+_NULL_STAGE = Stage('')
+
+
+class Profiler:
+    """Collects stage records and writes them as JSONL (+ Chrome trace)."""
+
+    def __init__(self, trace_path=None, chrome_path=None, profile_stage=None, profile_dir=PROFILE_DIR):
+        self.pid = os.getpid()
+        self.trace_path = trace_path
+        self.chrome_path = chrome_path
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.records = []
+        self.stack = []
+        self.origin = time.perf_counter()
+        self.cprofile = cProfile.Profile() if profile_stage else None
+        self.profiled_calls = 0
+        self._trace = open(trace_path, 'w') if trace_path else None
+
+    @contextmanager
+    def stage(self, name, rows_in=None, **args):
+        record = Stage(name, rows_in, args)
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append(record)
+
+        if parent is not None:
+            parent.held_peak = max(parent.held_peak, _proc_status('VmHWM') or 0)
+        can_reset = _reset_peak()
+        rss_start = _proc_status('VmRSS') if can_reset else None
+        maxrss_start = _max_rss_mb()
+        read_start, written_start = _io_counters()
+        profiling = self.cprofile is not None and name == self.profile_stage
+        if profiling:
+            self.cprofile.enable()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.process_time() - cpu_start
+            if profiling:
+                self.cprofile.disable()
+                self.profiled_calls += 1
+            read_end, written_end = _io_counters()
+            if can_reset and rss_start is not None:
+                peak = max(_proc_status('VmHWM') or 0, record.held_peak)
+                peak_delta = peak - rss_start
+            else:
+                peak = _max_rss_mb()
+                peak_delta = peak - maxrss_start
+            self.stack.pop()
+            if parent is not None:
+                parent.held_peak = max(parent.held_peak, peak)
+            self._emit({
+                'name': name,
+                'parent': parent.name if parent else None,
+                'depth': len(self.stack),
+                'start': round(start - self.origin, 6),
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'peak_mem_delta_mb': round(max(peak_delta, 0.0), 2),
+                'rows_in': record.rows_in,
+                'rows_out': record.rows_out,
+                'bytes_read': read_end - read_start,
+                'bytes_written': written_end - written_start,
+                'pid': self.pid,
+                'tid': threading.get_ident(),
+                'args': record.args,
+            })
+
+    def _emit(self, record):
+        self.records.append(record)
+        if self._trace:
+            self._trace.write(json.dumps(record, default=str) + '\n')
+            self._trace.flush()
+
+    def chrome_events(self):
+        """Complete ('X') trace events, timestamps in microseconds."""
+        events = []
+        for r in self.records:
+            args = {k: r[k] for k in ('cpu_s', 'peak_mem_delta_mb', 'rows_in', 'rows_out',
+                                      'bytes_read', 'bytes_written')}
+            args.update(r['args'])
+            events.append({
+                'name': r['name'], 'cat': r['name'].split('.')[0], 'ph': 'X',
+                'ts': round(r['start'] * 1e6), 'dur': round(r['wall_s'] * 1e6),
+                'pid': r['pid'], 'tid': r['tid'], 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def close(self):
+        if self._trace:
+            self._trace.close()
+            print(f"\n[OK] Stage trace written to {self.trace_path} ({len(self.records)} stages)")
+        if self.chrome_path:
+            with open(self.chrome_path, 'w') as f:
+                json.dump(self.chrome_events(), f, default=str)
+            print(f"[OK] Chrome trace written to {self.chrome_path}")
+        if self.cprofile is not None:
+            if not self.profiled_calls:
+                print(f"[WARN] Stage {self.profile_stage!r} never ran; no profile written")
+                return
+            os.makedirs(self.profile_dir, exist_ok=True)
+            base = os.path.join(self.profile_dir, self.profile_stage)
+            self.cprofile.dump_stats(base + '.prof')
+            text = io.StringIO()
+            pstats.Stats(self.cprofile, stream=text).sort_stats('cumulative').print_stats(30)
+            with open(base + '.txt', 'w') as f:
+                f.write(text.getvalue())
+            print(f"[OK] cProfile of {self.profile_stage} ({self.profiled_calls} runs) "
+                  f"written to {base}.prof / .txt")
+
+
+def enable(trace_path=None, chrome_path=None, profile_stage=None, profile_dir=PROFILE_DIR):
+    """Start recording stages in this process."""
+    global _active
+    _active = Profiler(trace_path, chrome_path, profile_stage, profile_dir)
+    return _active
+
+
+def disable():
+    """Stop recording and write the trace files."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.close()
+    return profiler
+
+
+def stage(name, rows_in=None, **args):
+    """Context manager for one pipeline step; a no-op unless enable() was called here."""
+    if _active is None or _active.pid != os.getpid():
+        return _null_stage()
+    return _active.stage(name, rows_in, **args)
+
+
+@contextmanager
+def _null_stage():
+    yield _NULL_STAGE
@@ -0,0 +1,197 @@
+"""
+Within-state county rankings per metric and year, plus a composite rank
+with bootstrap confidence intervals
+
+Every metric is signed by DIRECTION so that larger always means better,
+then ranked within each (year, state) in one grouped pass over all metrics:
+rank 1 is the best county, ties share the best rank (CHR style), and the
+percentile is the share of the state's counties doing no better (100 =
+best). Counties without a value get no rank and do not count.
+
+The composite is the mean of within-state z-scores over the county's
+observed metrics among those covering at least COMPOSITE_COVERAGE of the
+year's counties, for counties observed on at least half of them. Its
+uncertainty comes from resampling the metrics: for each (year, state) one
+(resamples x metrics) draw of metric counts gives every resampled
+composite as a single matrix product, and every resampled rank as one
+argsort over the state's counties. The CI is the CI_LEVEL interval of those
+ranks; a resample that draws none of a county's observed metrics has no
+composite for it and is left out of that county's interval.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import frame_digest
+from .converter import metric_columns
+
+RANKINGS_FILE = 'data/rankings.json'
+# +1: higher is better, -1: lower is better
+DIRECTION = {
+    'life_expectancy': 1, 'premature_death': -1, 'poor_health': -1,
+    'poor_physical_days': -1, 'poor_mental_days': -1,
+    'adult_obesity': -1, 'adult_smoking': -1, 'physical_inactivity': -1,
+    'diabetes': -1, 'excessive_drinking': -1,
+    'median_income': 1, 'hs_graduation': 1, 'unemployment': -1, 'housing_problems': -1,
+    'uninsured': -1, 'primary_care_rate': 1, 'preventable_hosp': -1,
+    'mammogram_rate': 1, 'vaccinated': 1, 'exercise_access': 1, 'air_pollution': -1,
+    'child_poverty': -1, 'income_20th': 1, 'income_80th': 1, 'some_college': 1,
+}
+COMPOSITE_COVERAGE = 0.75
+RESAMPLES = 1000
+CI_LEVEL = 0.95
+SEED = 2024
+# Bump when the ranking rules or result layout change
+CACHE_VERSION = 3
+
+
+def metric_ranks(df, metrics):
+    """Rank, group size and percentile of every metric within (year, state).
+
+    Returns three frames aligned to df (columns = metrics).
+    """
+    signed = df[metrics] * pd.Series(DIRECTION)[metrics]
+    grouped = signed.groupby([df['year'], df['state']], sort=False)
+    rank = grouped.rank(method='min', ascending=False)
+    count = grouped.transform('count').where(signed.notna())
+    # Share of counties with a value no better than this one
+    percentile = grouped.rank(method='max', pct=True) * 100
+    return rank, count, percentile
+
+
+def composite_metrics(df_year, metrics):
+    """Metrics observed for at least COMPOSITE_COVERAGE of a year's counties."""
+    coverage = df_year[metrics].notna().mean()
+    return [m for m in metrics if coverage[m] >= COMPOSITE_COVERAGE]
+
+
+def _bootstrap_ranks(z, observed, rng, resamples):
+    """Composite ranks for `resamples` metric resamples of one state (counties x resamples).
+
+    A county none of whose drawn metrics is observed has no composite in
+    that resample: it is left out of the ranking and its rank is NaN.
+    """
+    n_counties, n_metrics = z.shape
+    draws = rng.integers(0, n_metrics, size=(resamples, n_metrics))
+    # How often each metric was drawn in each resample
+    offsets = np.arange(resamples)[:, None] * n_metrics
+    weights = np.bincount((draws + offsets).ravel(), minlength=resamples * n_metrics)
+    weights = weights.reshape(resamples, n_metrics).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        composite = (np.where(observed, z, 0.0) @ weights.T) / (observed @ weights.T)
+    # Best first; undefined composites sort last and are then blanked
+    missing = np.isnan(composite)
+    order = np.argsort(np.where(missing, np.inf, -composite), axis=0, kind='stable')
+    ranks = np.empty(order.shape)
+    np.put_along_axis(ranks, order, np.arange(1, n_counties + 1)[:, None], axis=0)
+    ranks[missing] = np.nan
+    return ranks
+
+
+def composite_ranks(df, metrics, resamples=RESAMPLES, seed=SEED):
+    """Composite z-score, within-state rank and bootstrap rank CI, aligned to df."""
+    out = pd.DataFrame(np.nan, index=df.index,
+                       columns=['composite', 'composite_rank', 'composite_of', 'rank_lo', 'rank_hi'])
+    tail = (1 - CI_LEVEL) / 2 * 100
+    for year, df_year in df.groupby('year', sort=True):
+        used = composite_metrics(df_year, metrics)
+        if not used:
+            continue
+        signed = df_year[used] * pd.Series(DIRECTION)[used]
+        grouped = signed.groupby(df_year['state'])
+        z = (signed - grouped.transform('mean')) / grouped.transform('std').replace(0, np.nan)
+        observed = z.notna()
+        eligible = observed.sum(axis=1) >= len(used) / 2
+        score = z.where(eligible, np.nan).mean(axis=1)
+        out.loc[df_year.index, 'composite'] = score
+
+        with profiling.stage('rankings.bootstrap', rows_in=int(eligible.sum()), year=year,
+                             metrics=len(used), resamples=resamples):
+            for state, rows in df_year[eligible].groupby('state').groups.items():
+                # Seeded per (year, state) so a subset run draws the same resamples
+                code = int(str(df_year.loc[rows[0], 'fips'])[:2])
+                rng = np.random.default_rng([seed, int(year), code])
+                ranks = _bootstrap_ranks(z.loc[rows].to_numpy(dtype=float),
+                                         observed.loc[rows].to_numpy(), rng, resamples)
+                lo = np.nanpercentile(ranks, tail, axis=1, method='lower')
+                hi = np.nanpercentile(ranks, 100 - tail, axis=1, method='higher')
+                out.loc[rows, 'rank_lo'] = lo
+                out.loc[rows, 'rank_hi'] = hi
+                out.loc[rows, 'composite_of'] = len(rows)
+        out.loc[df_year.index, 'composite_rank'] = (
+            score.groupby(df_year['state']).rank(method='min', ascending=False))
+    return out
+
+
+def rank_table(df, metrics=None, resamples=RESAMPLES, seed=SEED):
+    """One row per (fips, year): <metric>_rank/_of/_pct plus the composite columns.
+
+    Every metric needs an entry in DIRECTION; an unknown one raises rather
+    than silently dropping out of the ranks.
+    """
+    metrics = metrics or metric_columns(df)
+    undirected = [m for m in metrics if m not in DIRECTION]
+    if undirected:
+        raise ValueError(f'no ranking direction for {undirected}; add them to rankings.DIRECTION')
+    df = df.reset_index(drop=True)
+    with profiling.stage('rankings.metrics', rows_in=len(df), metrics=len(metrics)) as s:
+        rank, count, percentile = metric_ranks(df, metrics)
+        s.rows_out = len(df)
+    composite = composite_ranks(df, metrics, resamples, seed)
+    parts = [df[['fips', 'county', 'state', 'year']]]
+    for suffix, frame in (('rank', rank), ('of', count), ('pct', percentile)):
+        parts.append(frame.add_suffix(f'_{suffix}'))
+    return pd.concat(parts + [composite], axis=1)
+
+
+def load_rankings(df, resamples=RESAMPLES, seed=SEED, cache=None):
+    """rank_table(), reused from `cache` while the input frame is unchanged."""
+    if cache is None:
+        return rank_table(df, resamples=resamples, seed=seed)
+    config = {'version': CACHE_VERSION, 'data': frame_digest(df), 'direction': DIRECTION,
+              'resamples': resamples, 'seed': seed}
+    table, hit = cache.get_or_build('rankings', [], config,
+                                    lambda: rank_table(df, resamples=resamples, seed=seed))
+    if hit:
+        print("[CACHE] Dataset unchanged, reusing rankings")
+    return table
+
+
+def _ints(values):
+    return [None if v != v else int(v) for v in values]
+
+
+def write_rankings(df, path=RANKINGS_FILE, resamples=RESAMPLES, cache=None):
+    """Write the front-end JSON, keyed by year then FIPS (group sizes keyed by state)."""
+    table = load_rankings(df, resamples=resamples, cache=cache)
+    metrics = [c[:-len('_rank')] for c in table.columns
+               if c.endswith('_rank') and c != 'composite_rank' and table[c].notna().any()]
+
+    years = {}
+    for year, rows in table.groupby('year', sort=True):
+        ranks = rows[[f'{m}_rank' for m in metrics]].to_numpy()
+        composite = rows[['composite', 'composite_rank', 'rank_lo', 'rank_hi']].to_numpy()
+        # Every ranked county in a state shares its metric's group size
+        sizes = rows.groupby('state')[[f'{m}_of' for m in metrics] + ['composite_of']].max()
+        years[str(year)] = {
+            'of': {state: _ints(values) for state, values in zip(sizes.index, sizes.to_numpy())},
+            'rank': {fips: _ints(values) for fips, values in zip(rows['fips'], ranks)},
+            'composite': {fips: [round(float(values[0]), 3)] + _ints(values[1:])
+                          for fips, values in zip(rows['fips'], composite) if values[1] == values[1]},
+        }
+    sidecar = {
+        'metrics': metrics,
+        'direction': {m: DIRECTION[m] for m in metrics},
+        'composite': ['score', 'rank', 'ci_lo', 'ci_hi'],
+        'resamples': resamples,
+        'ci_level': CI_LEVEL,
+        'years': years,
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    print(f"\n[OK] Rankings written to {path}: {len(metrics)} metrics, "
+          f"{table['composite_rank'].notna().sum():,} composite ranks in {len(years)} years")
+    return sidecar
@@ -0,0 +1,315 @@
+"""
+Local asyncio data service over the integrated dataset
+
+The dataset is loaded once into ColumnarCache: one numpy array per column
+plus row-position indexes by year, FIPS and state, so every query is a few
+index lookups and a fancy-index gather. Endpoints (JSON, GET/HEAD):
+
+    /meta                                  metrics, years, states
+    /metric/<metric>?year=Y[&state=S]      one metric for one year, paginated
+    /county/<fips>                         every metric across all years
+    /state/<state>/summary?year=Y          count/mean/median/min/max per metric
+
+Responses carry a strong ETag (If-None-Match -> 304), are gzipped when the
+client accepts it, and are kept in a bounded LRU keyed by the normalized
+query, so repeated slices are served without recomputing or recompressing.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qsl, quote, urlsplit, unquote
+
+import numpy as np
+
+from .cache import frame_digest
+from .converter import metric_columns
+from .pipeline import DATA_FILE, read_dataset
+
+HOST = '127.0.0.1'
+PORT = 8765
+RESULT_CACHE_SIZE = 512
+PER_PAGE = 500
+MAX_PER_PAGE = 5000
+GZIP_MIN_BYTES = 512
+# Request bodies (never used) up to this size are read and dropped to keep the
+# connection; larger or unframed ones close it
+MAX_DISCARD_BYTES = 1 << 20
+
+
+class QueryError(Exception):
+    """Bad request; carries the HTTP status to answer with."""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _clean(values):
+    """JSON-safe list of floats with NaN as None."""
+    return [None if v != v else round(float(v), 6) for v in values.tolist()]
+
+
+def _positions(values):
+    """Row positions grouped by value, built with one stable sort."""
+    order = np.argsort(values, kind='stable')
+    keys, starts = np.unique(values[order], return_index=True)
+    return {k: order[lo:hi] for k, lo, hi in zip(keys.tolist(), starts, np.r_[starts[1:], len(order)])}
+
+
+class ColumnarCache:
+    """Dataset held column-wise with row indexes for year, FIPS and state."""
+
+    def __init__(self, df):
+        df = df.sort_values(['fips', 'year'], kind='stable').reset_index(drop=True)
+        self.metrics = metric_columns(df)
+        self.fips = df['fips'].astype(str).to_numpy()
+        self.county = df['county'].astype(str).to_numpy()
+        self.state = df['state'].astype(str).to_numpy()
+        self.year = df['year'].to_numpy(dtype=np.int64)
+        self.columns = {m: df[m].to_numpy(dtype=np.float64) for m in self.metrics}
+        self.by_year = _positions(self.year)
+        self.by_fips = _positions(self.fips)
+        self.by_state = _positions(self.state)
+        # Identifies this snapshot of the data inside every ETag: every served
+        # column counts, so a changed county or state name invalidates too
+        self.version = frame_digest(df)[:12]
+
+    def _rows(self, year, state=None):
+        if year not in self.by_year:
+            raise QueryError(f'unknown year {year}', HTTPStatus.NOT_FOUND)
+        rows = self.by_year[year]
+        if state is not None:
+            if state not in self.by_state:
+                raise QueryError(f'unknown state {state!r}', HTTPStatus.NOT_FOUND)
+            rows = np.intersect1d(rows, self.by_state[state], assume_unique=True)
+        return rows
+
+    def meta(self):
+        return {
+            'metrics': self.metrics,
+            'years': sorted(self.by_year),
+            'states': sorted(self.by_state),
+            'counties': len(self.by_fips),
+            'version': self.version,
+        }
+
+    def metric_slice(self, metric, year, state=None, page=1, per_page=PER_PAGE):
+        if metric not in self.columns:
+            raise QueryError(f'unknown metric {metric!r}', HTTPStatus.NOT_FOUND)
+        rows = self._rows(year, state)
+        total = len(rows)
+        rows = rows[(page - 1) * per_page:page * per_page]
+        return {
+            'metric': metric,
+            'year': year,
+            'state': state,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': max(1, -(-total // per_page)),
+            'fips': self.fips[rows].tolist(),
+            'county': self.county[rows].tolist(),
+            'state_name': self.state[rows].tolist(),
+            'value': _clean(self.columns[metric][rows]),
+        }
+
+    def county_series(self, fips):
+        if fips not in self.by_fips:
+            raise QueryError(f'unknown county {fips!r}', HTTPStatus.NOT_FOUND)
+        rows = self.by_fips[fips]
+        first = rows[0]
+        return {
+            'fips': fips,
+            'county': str(self.county[first]),
+            'state': str(self.state[first]),
+            'years': self.year[rows].tolist(),
+            'metrics': {m: _clean(self.columns[m][rows]) for m in self.metrics},
+        }
+
+    def state_summary(self, state, year):
+        rows = self._rows(year, state)
+        summary = {}
+        for metric in self.metrics:
+            values = self.columns[metric][rows]
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                summary[metric] = {'count': 0}
+                continue
+            summary[metric] = {
+                'count': int(len(values)),
+                'mean': round(float(values.mean()), 6),
+                'median': round(float(np.median(values)), 6),
+                'min': round(float(values.min()), 6),
+                'max': round(float(values.max()), 6),
+            }
+        return {'state': state, 'year': year, 'counties': int(len(rows)), 'metrics': summary}
+
+
+def _int_param(params, name, default=None, lo=None, hi=None):
+    if name not in params:
+        if default is None:
+            raise QueryError(f'missing query parameter {name!r}')
+        return default
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise QueryError(f'{name} must be an integer')
+    if lo is not None and hi is not None and not lo <= value <= hi:
+        raise QueryError(f'{name} must be between {lo} and {hi}')
+    if lo is not None and value < lo:
+        raise QueryError(f'{name} must be at least {lo}')
+    if hi is not None and value > hi:
+        raise QueryError(f'{name} must be at most {hi}')
+    return value
+
+
+class DataService:
+    """Routes requests to ColumnarCache and caches encoded responses."""
+
+    def __init__(self, cache, result_cache_size=RESULT_CACHE_SIZE):
+        self.cache = cache
+        self.results = OrderedDict()
+        self.result_cache_size = result_cache_size
+        self.hits = self.misses = 0
+
+    def route(self, path, params):
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        if parts == ['meta']:
+            return self.cache.meta()
+        if len(parts) == 2 and parts[0] == 'metric':
+            per_page = _int_param(params, 'per_page', PER_PAGE, 1, MAX_PER_PAGE)
+            result = self.cache.metric_slice(
+                parts[1],
+                _int_param(params, 'year'),
+                params.get('state'),
+                page=_int_param(params, 'page', 1, 1),
+                per_page=per_page,
+            )
+            if result['page'] < result['pages']:
+                query = dict(params, page=result['page'] + 1)
+                result['next'] = path + '?' + '&'.join(f'{k}={quote(str(v))}' for k, v in sorted(query.items()))
+            else:
+                result['next'] = None
+            return result
+        if len(parts) == 2 and parts[0] == 'county':
+            return self.cache.county_series(parts[1])
+        if len(parts) == 3 and parts[0] == 'state' and parts[2] == 'summary':
+            return self.cache.state_summary(parts[1], _int_param(params, 'year'))
+        raise QueryError(f'no route for {path}', HTTPStatus.NOT_FOUND)
+
+    def respond(self, target):
+        """(status, body, gzipped body or None, etag) for a request target."""
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        key = (url.path, tuple(sorted(params.items())))
+        if key in self.results:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return self.results[key]
+        self.misses += 1
+
+        try:
+            status, payload = HTTPStatus.OK, self.route(url.path, params)
+        except QueryError as e:
+            status, payload = e.status, {'error': str(e)}
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        etag = '"%s-%s"' % (self.cache.version, hashlib.sha1(body).hexdigest()[:16])
+        gzipped = gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None
+        result = (status, body, gzipped, etag)
+
+        if status == HTTPStatus.OK:
+            self.results[key] = result
+            if len(self.results) > self.result_cache_size:
+                self.results.popitem(last=False)
+        return result
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = (request_line.decode('latin-1').split() + ['', '', ''])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                # Consume any body so its bytes are not read as the next request
+                if 'transfer-encoding' in headers:
+                    keep_alive = False
+                elif 'content-length' in headers:
+                    try:
+                        length = int(headers['content-length'])
+                    except ValueError:
+                        length = -1
+                    if 0 <= length <= MAX_DISCARD_BYTES:
+                        await reader.readexactly(length)
+                    else:
+                        keep_alive = False
+                if method not in ('GET', 'HEAD'):
+                    status, body, gzipped, etag = HTTPStatus.METHOD_NOT_ALLOWED, b'', None, None
+                else:
+                    status, body, gzipped, etag = self.respond(target)
+
+                response_headers = {
+                    'Content-Type': 'application/json',
+                    'Cache-Control': 'no-cache',
+                    'Vary': 'Accept-Encoding',
+                    'Connection': 'keep-alive' if keep_alive else 'close',
+                }
+                if status == HTTPStatus.METHOD_NOT_ALLOWED:
+                    response_headers['Allow'] = 'GET, HEAD'
+                if etag:
+                    response_headers['ETag'] = etag
+                if etag and status == HTTPStatus.OK and etag in headers.get('if-none-match', ''):
+                    status, body = HTTPStatus.NOT_MODIFIED, b''
+                elif gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+                    body = gzipped
+                    response_headers['Content-Encoding'] = 'gzip'
+                response_headers['Content-Length'] = str(len(body))
+
+                head = f'HTTP/1.1 {status.value} {status.phrase}\r\n' + ''.join(
+                    f'{name}: {value}\r\n' for name, value in response_headers.items()
+                ) + '\r\n'
+                writer.write(head.encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host=HOST, port=PORT):
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"\n[OK] Serving {len(service.cache.by_fips):,} counties on http://{host}:{port}/meta")
+    async with server:
+        await server.serve_forever()
+
+
+def run_server(dataset=DATA_FILE, store_dir=None, host=HOST, port=PORT,
+               result_cache_size=RESULT_CACHE_SIZE):
+    """Load the dataset once (CSV or normalized store) and serve it until interrupted."""
+    if store_dir:
+        from .store import load_wide
+        df = load_wide(store_dir)
+    else:
+        df = read_dataset(dataset)
+    service = DataService(ColumnarCache(df), result_cache_size)
+    try:
+        asyncio.run(serve(service, host, port))
+    except KeyboardInterrupt:
+        print("\n[OK] Server stopped")
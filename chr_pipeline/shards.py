@@ -0,0 +1,71 @@
+"""
+County-major time-series shards for the county detail modal
+
+Counties are grouped by state FIPS into one binary file per state. Each
+county is a fixed-size record of (year x metric) little-endian float32
+values, NaN where missing, so opening a county is one HTTP Range request
+for a few KB located through index.json:
+
+    {"years": [...], "metrics": [...], "record_bytes": n,
+     "counties": {"06037": ["06", offset], ...}}
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .cube import dense_axes, fill_dense
+
+SHARD_DIR = 'data/shards'
+INDEX_FILE = 'index.json'
+DTYPE = np.dtype('<f4')
+
+
+def write_shards(df, out_dir=SHARD_DIR):
+    """Write one shard per state plus the FIPS -> (shard, byte offset) index."""
+    os.makedirs(out_dir, exist_ok=True)
+    fips, years, metrics, positions = dense_axes(df)
+    values = fill_dense(np.empty((len(fips), len(years), len(metrics)), dtype=DTYPE),
+                        df, metrics, positions)
+    record_bytes = len(years) * len(metrics) * DTYPE.itemsize
+
+    # fips is sorted, so each state's counties are one contiguous run
+    states = np.array([f[:2] for f in fips])
+    bounds = np.flatnonzero(np.r_[True, states[1:] != states[:-1], True])
+    counties = {}
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        shard = str(states[lo])
+        with open(os.path.join(out_dir, f'{shard}.bin'), 'wb') as f:
+            f.write(values[lo:hi].tobytes())
+        for i in range(lo, hi):
+            counties[str(fips[i])] = [shard, int((i - lo) * record_bytes)]
+
+    index = {
+        'dtype': 'float32le',
+        'years': years.tolist(),
+        'metrics': list(metrics),
+        'record_bytes': record_bytes,
+        'counties': counties,
+    }
+    with open(os.path.join(out_dir, INDEX_FILE), 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    print(f"\n[OK] {len(bounds) - 1} state shards written to {out_dir}/ "
+          f"({len(counties):,} counties, {record_bytes} bytes each)")
+    return index
+
+
+def load_index(shard_dir=SHARD_DIR):
+    with open(os.path.join(shard_dir, INDEX_FILE)) as f:
+        return json.load(f)
+
+
+def read_county(fips, shard_dir=SHARD_DIR, index=None):
+    """(year x metric) array for one county, read with a single seek."""
+    index = index or load_index(shard_dir)
+    shard, offset = index['counties'][fips]
+    with open(os.path.join(shard_dir, f'{shard}.bin'), 'rb') as f:
+        f.seek(offset)
+        record = np.frombuffer(f.read(index['record_bytes']), dtype=DTYPE)
+    return record.reshape(len(index['years']), len(index['metrics']))
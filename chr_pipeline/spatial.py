@@ -0,0 +1,263 @@
+"""
+Geographic clustering of county metrics: global Moran's I and local LISA
+
+Adjacency comes from the same us-atlas TopoJSON geometry.py reads: two
+counties are neighbors when their rings share an arc (rook contiguity, so
+counties meeting only at a corner are not). It is built once into a
+sparse CSR matrix in FIPS order and cached by the topology's file hash.
+
+For each (metric, year) the matrix is restricted to counties with a value,
+islands are dropped and the rest row-standardized. Significance comes from
+permutations, batched so that no step loops over counties:
+
+    global  I for a block of shuffles at once: W @ Z is one sparse product
+            over a (counties x permutations) matrix
+    local   conditional permutation as in PySAL: one matrix of random ids
+            (permutations x most neighbors) is shared by every county, and
+            county i's permuted lag is the mean of its first k_i ids
+            (skipping i), computed for blocks of counties at a time
+
+(metric, year) tasks run in a process pool that receives the adjacency
+once; inputs repeated across years (CHR-only metrics) are computed once.
+Counties whose pseudo p-value is at most ALPHA get their PySAL quadrant:
+1 High-High (hot spot), 2 Low-High, 3 Low-Low (cold spot), 4 High-Low;
+the rest are 0.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import frame_digest
+from .converter import metric_columns, normalize_fips
+from .geometry import TERRITORIES, TOPOLOGY_FILE, _arc_refs, _polygons
+
+SPATIAL_FILE = 'data/spatial.json'
+PERMUTATIONS = 999
+ALPHA = 0.05
+SEED = 12345
+# Fewest linked counties with a value for a (metric, year) to be tested
+MIN_COUNTIES = 8
+PERMUTATION_BATCH = 128
+COUNTY_BLOCK = 128
+# Bump when the adjacency, statistics or result layout changes
+CACHE_VERSION = 1
+
+CLUSTERS = {0: 'Not significant', 1: 'High-High (hot spot)', 2: 'Low-High',
+            3: 'Low-Low (cold spot)', 4: 'High-Low'}
+
+
+def build_adjacency(topology):
+    """(FIPS array, symmetric 0/1 CSR matrix) of counties sharing an arc."""
+    from scipy import sparse
+
+    counties = [g for g in topology['objects']['counties']['geometries'] if _polygons(g)]
+    fips = normalize_fips([g.get('id') for g in counties])
+    pairs = [(ref, f) for f, geometry in zip(fips, counties)
+             if isinstance(f, str) and f[:2] not in TERRITORIES
+             for ref in set(_arc_refs(geometry))]
+    owners = pd.DataFrame(pairs, columns=['arc', 'fips']).drop_duplicates()
+
+    ids, codes = np.unique(owners['fips'].to_numpy(dtype=str), return_inverse=True)
+    owners['code'] = codes
+    shared = owners.merge(owners, on='arc')
+    shared = shared[shared['code_x'] != shared['code_y']]
+    matrix = sparse.coo_matrix((np.ones(len(shared)), (shared['code_x'], shared['code_y'])),
+                               shape=(len(ids), len(ids))).tocsr()
+    matrix.data[:] = 1.0
+    return ids.astype(object), matrix
+
+
+def load_adjacency(topology_path=TOPOLOGY_FILE, cache=None):
+    """build_adjacency() for a TopoJSON file, reused from `cache` while the file is unchanged."""
+    def build():
+        with open(topology_path) as f:
+            return build_adjacency(json.load(f))
+
+    if cache is None:
+        return build()
+    result, hit = cache.get_or_build('adjacency', [topology_path], {'version': CACHE_VERSION}, build)
+    if hit:
+        print("[CACHE] Topology unchanged, reusing county adjacency")
+    return result
+
+
+def _pseudo_p(sims, observed):
+    """PySAL's folded pseudo p-value: the smaller tail of `sims` against `observed`."""
+    permutations = sims.shape[-1]
+    larger = (sims >= observed[..., None]).sum(axis=-1)
+    larger = np.minimum(larger, permutations - larger)
+    return (larger + 1.0) / (permutations + 1.0)
+
+
+def analyze(x, adjacency, permutations=PERMUTATIONS, alpha=ALPHA, seed=SEED):
+    """Moran's I and LISA for `x` aligned to the adjacency rows (NaN = missing).
+
+    Returns None when too few linked counties have a value, otherwise the
+    global statistics and full-length local arrays (NaN / -1 where untested).
+    """
+    from scipy import sparse
+
+    linked = np.flatnonzero(~np.isnan(x))
+    W = adjacency[linked][:, linked]
+    k = np.asarray(W.sum(axis=1)).ravel()
+    linked, W, k = linked[k > 0], W[k > 0][:, k > 0], k[k > 0]
+    n = len(linked)
+    if n < MIN_COUNTIES:
+        return None
+    W = sparse.diags(1.0 / k) @ W
+
+    z = x[linked] - x[linked].mean()
+    m2 = z @ z / n
+    if m2 == 0:
+        return None
+    lag = W @ z
+    # Row-standardized weights sum to n
+    moran_i = z @ lag / (n * m2)
+
+    rng = np.random.default_rng(seed)
+    sims = []
+    for start in range(0, permutations, PERMUTATION_BATCH):
+        size = min(PERMUTATION_BATCH, permutations - start)
+        Z = rng.permuted(np.repeat(z[:, None], size, axis=1), axis=0)
+        sims.append((Z * (W @ Z)).sum(axis=0) / (n * m2))
+    sims = np.concatenate(sims)
+
+    # Shared random ids over the n - 1 other counties; id r means r, or r + 1 at or past i
+    kmax, k = int(k.max()), k.astype(np.int64)
+    ids = rng.permuted(np.tile(np.arange(n - 1), (permutations, 1)), axis=1)[:, :kmax]
+    below, above = z[ids], z[ids + 1]
+    lag_sims = np.empty((n, permutations))
+    for start in range(0, n, COUNTY_BLOCK):
+        rows = np.arange(start, min(start + COUNTY_BLOCK, n))
+        values = np.where(ids[None] >= rows[:, None, None], above[None], below[None])
+        sums = values.cumsum(axis=2)[np.arange(len(rows)), :, k[rows] - 1]
+        lag_sims[rows] = sums / k[rows, None]
+    local_i = z / m2 * lag
+    local_p = _pseudo_p(z[:, None] / m2 * lag_sims, local_i)
+
+    quadrant = np.where(z > 0, np.where(lag > 0, 1, 4), np.where(lag > 0, 2, 3))
+    full_i, full_p = np.full(len(x), np.nan), np.full(len(x), np.nan)
+    clusters = np.full(len(x), -1, dtype=np.int8)
+    full_i[linked], full_p[linked] = local_i, local_p
+    clusters[linked] = np.where(local_p <= alpha, quadrant, 0)
+    return {
+        'n': n,
+        'I': float(moran_i),
+        'expected': -1.0 / (n - 1),
+        'z': float((moran_i - sims.mean()) / sims.std()) if sims.std() > 0 else None,
+        'p': float(_pseudo_p(sims, np.asarray(moran_i))),
+        'local_i': full_i,
+        'local_p': full_p,
+        'clusters': clusters,
+    }
+
+
+# Set once per worker process so the adjacency is not pickled with every task
+_WORKER = None
+
+
+def _init_worker(adjacency, permutations, alpha, seed):
+    global _WORKER
+    _WORKER = (adjacency, permutations, alpha, seed)
+
+
+def _analyze_task(x):
+    return analyze(x, *_WORKER)
+
+
+def hot_spots(df, fips, adjacency, metrics=None, permutations=PERMUTATIONS, alpha=ALPHA,
+              seed=SEED, workers=1):
+    """analyze() for every (metric, year), `workers` processes at a time (0 = all cores).
+
+    Returns {(metric, year): result or None}.
+    """
+    metrics = metrics or metric_columns(df)
+    tasks, unique = {}, {}
+    for year, df_year in df.groupby('year', sort=True):
+        values = df_year.drop_duplicates('fips').set_index('fips')[metrics].reindex(fips)
+        for metric in metrics:
+            x = values[metric].to_numpy(dtype=float)
+            digest = hashlib.sha256(x.tobytes()).hexdigest()
+            tasks[(metric, int(year))] = digest
+            unique.setdefault(digest, x)
+    workers = workers or os.cpu_count() or 1
+    print(f"\n[SPATIAL] {len(tasks)} metric-years over {len(fips):,} counties: "
+          f"{len(unique)} distinct inputs, {permutations} permutations"
+          + (f", {workers} workers" if workers > 1 and len(unique) > 1 else ""))
+
+    digests = list(unique)
+    with profiling.stage('spatial.lisa', rows_in=len(digests), workers=workers) as s:
+        if workers == 1 or len(digests) < 2:
+            outcomes = [analyze(unique[d], adjacency, permutations, alpha, seed) for d in digests]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(digests)), initializer=_init_worker,
+                                     initargs=(adjacency, permutations, alpha, seed)) as pool:
+                outcomes = list(pool.map(_analyze_task, [unique[d] for d in digests]))
+        s.rows_out = len(tasks)
+    by_digest = dict(zip(digests, outcomes))
+    return {key: by_digest[digest] for key, digest in tasks.items()}
+
+
+def load_result(df, topology_path=TOPOLOGY_FILE, permutations=PERMUTATIONS, alpha=ALPHA,
+                seed=SEED, workers=1, cache=None):
+    """(fips, hot_spots()) reused from `cache` while the dataset and topology are unchanged."""
+    def build():
+        fips, adjacency = load_adjacency(topology_path, cache)
+        return fips, hot_spots(df, fips, adjacency, permutations=permutations, alpha=alpha,
+                               seed=seed, workers=workers)
+
+    if cache is None:
+        return build()
+    config = {'version': CACHE_VERSION, 'data': frame_digest(df), 'permutations': permutations,
+              'alpha': alpha, 'seed': seed}
+    result, hit = cache.get_or_build('spatial', [topology_path], config, build)
+    if hit:
+        print("[CACHE] Dataset and topology unchanged, reusing spatial statistics")
+    return result
+
+
+def cluster_table(fips, results):
+    """Long per-county table: fips, metric, year, local_i, local_p, cluster."""
+    frames = [
+        pd.DataFrame({'fips': fips, 'metric': metric, 'year': year, 'local_i': result['local_i'],
+                      'local_p': result['local_p'], 'cluster': result['clusters']})
+        for (metric, year), result in results.items() if result is not None
+    ]
+    table = pd.concat(frames, ignore_index=True)
+    return table[table['cluster'] >= 0].reset_index(drop=True)
+
+
+def write_spatial(df, path=SPATIAL_FILE, topology_path=TOPOLOGY_FILE, permutations=PERMUTATIONS,
+                  alpha=ALPHA, workers=1, cache=None):
+    """Write the front-end JSON: global statistics plus one cluster code per county."""
+    fips, results = load_result(df, topology_path, permutations, alpha, workers=workers, cache=cache)
+    out = {}
+    for (metric, year), result in results.items():
+        if result is None:
+            continue
+        out.setdefault(metric, {})[str(year)] = {
+            'n': result['n'],
+            'I': round(result['I'], 4),
+            'z': None if result['z'] is None else round(result['z'], 2),
+            'p': round(result['p'], 4),
+            # One character per county in `fips` order; '-' = no value or no neighbors
+            'clusters': ''.join('-' if c < 0 else str(c) for c in result['clusters'].tolist()),
+        }
+    sidecar = {
+        'fips': list(fips),
+        'permutations': permutations,
+        'alpha': alpha,
+        'classes': {str(code): label for code, label in CLUSTERS.items()},
+        'metrics': out,
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    print(f"\n[OK] Spatial clusters written to {path}: {sum(len(v) for v in out.values())} "
+          f"metric-years, {len(fips):,} counties")
+    return sidecar
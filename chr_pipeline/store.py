@@ -0,0 +1,146 @@
+"""
+Normalized columnar store for the integrated dataset
+
+The wide CSV repeats every county string and every CHR-only metric in each
+year's row. The store splits it into:
+
+    counties.parquet  county_id, fips, county, state (dictionary-encoded)
+    static.parquet    county_id + metrics that never change across years
+    series.parquet    county_id, year, metric, value (non-null values only)
+    meta.json         column order, years and year aliases
+
+Years whose time-varying values are an exact copy of another year (2023 is
+the CHR 2024 baseline again) are stored once and aliased. Values are
+float32; load_wide() reassembles the wide view on demand.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .converter import metric_columns
+
+STORE_DIR = 'data/store'
+FORMAT_VERSION = 1
+
+
+def _year_block(df, year, county_ids, metrics):
+    """(counties x metrics) float array for one year, aligned to county_ids."""
+    block = np.full((len(county_ids), len(metrics)), np.nan)
+    rows = df[df['year'] == year]
+    block[county_ids.get_indexer(rows['fips'])] = rows[metrics].to_numpy(dtype=float)
+    return block
+
+
+def write_store(df, out_dir=STORE_DIR):
+    """Write the normalized store for an integrated (fips x year) frame."""
+    os.makedirs(out_dir, exist_ok=True)
+    metrics = metric_columns(df)
+    df = df.sort_values(['fips', 'year'], kind='stable')
+
+    counties = df.drop_duplicates('fips')[['fips', 'county', 'state']].reset_index(drop=True)
+    county_ids = pd.Index(counties['fips'])
+    counties.insert(0, 'county_id', np.arange(len(counties), dtype=np.int32))
+
+    # Static = one distinct value (NaN included) per county across every year
+    distinct = df.groupby('fips', sort=False)[metrics].nunique(dropna=False).max()
+    static_metrics = [m for m in metrics if distinct[m] <= 1]
+    series_metrics = [m for m in metrics if distinct[m] > 1]
+
+    first_rows = df.drop_duplicates('fips')
+    static = pd.DataFrame({'county_id': counties['county_id']})
+    for metric in static_metrics:
+        static[metric] = first_rows[metric].to_numpy(dtype=np.float32)
+
+    # Alias years whose time-varying block duplicates a later year
+    years = sorted(int(y) for y in df['year'].unique())
+    blocks = {year: _year_block(df, year, county_ids, series_metrics) for year in years}
+    aliases = {}
+    for year in years:
+        for source in reversed(years):
+            if source != year and source not in aliases and \
+                    np.array_equal(blocks[year], blocks[source], equal_nan=True):
+                aliases[year] = source
+                break
+    stored_years = [year for year in years if year not in aliases]
+
+    parts = []
+    for year in stored_years:
+        block = blocks[year]
+        county_idx, metric_idx = np.nonzero(~np.isnan(block))
+        parts.append(pd.DataFrame({
+            'county_id': county_idx.astype(np.int32),
+            'year': np.int16(year),
+            'metric': pd.Categorical.from_codes(metric_idx, categories=series_metrics),
+            'value': block[county_idx, metric_idx].astype(np.float32),
+        }))
+    series = pd.concat(parts, ignore_index=True)
+
+    for column in ['fips', 'county', 'state']:
+        counties[column] = counties[column].astype('category')
+    counties.to_parquet(os.path.join(out_dir, 'counties.parquet'), index=False)
+    static.to_parquet(os.path.join(out_dir, 'static.parquet'), index=False)
+    series.to_parquet(os.path.join(out_dir, 'series.parquet'), index=False)
+
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'columns': list(df.columns),
+        'years': years,
+        'year_aliases': {str(year): source for year, source in aliases.items()},
+        'static_metrics': static_metrics,
+        'series_metrics': series_metrics,
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=1)
+
+    print(f"\n[OK] Store written to {out_dir}/")
+    print(f"    Counties: {len(counties):,}  static metrics: {len(static_metrics)}  "
+          f"time-varying: {len(series_metrics)}")
+    print(f"    Series values: {len(series):,}  stored years: {stored_years}  aliases: {aliases}")
+    return meta
+
+
+def load_wide(store_dir=STORE_DIR, years=None):
+    """Reassemble the wide one-row-per-(county, year) frame from the store.
+
+    Metric columns come back as float32. `years` limits the rows returned.
+    """
+    with open(os.path.join(store_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    counties = pd.read_parquet(os.path.join(store_dir, 'counties.parquet'))
+    static = pd.read_parquet(os.path.join(store_dir, 'static.parquet'))
+    series = pd.read_parquet(os.path.join(store_dir, 'series.parquet'))
+
+    all_years = meta['years']
+    years = all_years if years is None else [y for y in all_years if y in set(years)]
+    aliases = {int(year): source for year, source in meta['year_aliases'].items()}
+    series_metrics = meta['series_metrics']
+    n_counties = len(counties)
+
+    # Scatter the long series into a (stored year, county, metric) cube
+    stored_years = sorted(set(aliases.get(y, y) for y in years))
+    year_pos = {year: i for i, year in enumerate(stored_years)}
+    cube = np.full((len(stored_years), n_counties, len(series_metrics)), np.nan, dtype=np.float32)
+    series = series[series['year'].isin(stored_years)]
+    metric_pos = pd.Index(series_metrics).get_indexer(series['metric'].astype(str))
+    cube[series['year'].map(year_pos).to_numpy(), series['county_id'].to_numpy(), metric_pos] = \
+        series['value'].to_numpy()
+
+    # County-major rows: every county x every requested year
+    county_idx = np.repeat(np.arange(n_counties), len(years))
+    year_idx = np.tile([year_pos[aliases.get(y, y)] for y in years], n_counties)
+    wide = {
+        'fips': counties['fips'].astype(str).to_numpy()[county_idx],
+        'county': counties['county'].astype(str).to_numpy()[county_idx],
+        'state': counties['state'].astype(str).to_numpy()[county_idx],
+        'year': np.tile(years, n_counties),
+    }
+    static_values = static.set_index('county_id').reindex(counties['county_id'])
+    for metric in meta['static_metrics']:
+        wide[metric] = static_values[metric].to_numpy(dtype=np.float32)[county_idx]
+    for i, metric in enumerate(series_metrics):
+        wide[metric] = cube[year_idx, county_idx, i]
+
+    return pd.DataFrame(wide)[meta['columns']]
@@ -0,0 +1,173 @@
+"""
+Precomputed summary statistics and class breaks per (year, metric[, state])
+
+Everything is computed on one sorted array: values are ordered by
+(group, value), so counts/min/max/quantiles are index arithmetic on group
+offsets and sums come from np.bincount. Jenks natural breaks run a
+Fisher-Jenks dynamic program batched across equally sized groups, on a
+quantile sample of at most JENKS_POINTS values per group, so no step loops
+over individual groups in Python.
+
+The JSON sidecar is loaded once by the front end (see updateInsights in
+script.js) instead of recomputing stats on every metric change.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from .converter import metric_columns
+
+SUMMARIES_FILE = 'data/summaries.json'
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+N_CLASSES = 5
+JENKS_POINTS = 128
+JENKS_BATCH = 256
+
+STAT_FIELDS = ['count', 'mean', 'std', 'min', 'max', 'median']
+
+
+def _long_values(df):
+    """Non-null (year, state, metric, value) rows."""
+    long = df.melt(id_vars=['year', 'state'], value_vars=metric_columns(df),
+                   var_name='metric', value_name='value')
+    return long[long['value'].notna()]
+
+
+def _interpolate(sorted_values, starts, counts, probs):
+    """Linear-interpolated quantiles (numpy/d3 definition) for every group at once."""
+    pos = starts[:, None] + np.asarray(probs)[None, :] * (counts[:, None] - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, (starts + counts - 1)[:, None])
+    frac = pos - lo
+    return sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
+
+
+def jenks_breaks(samples, n_classes=N_CLASSES):
+    """Fisher-Jenks inner breaks for each row of sorted `samples` (groups x points)."""
+    n_groups, n_points = samples.shape
+    # Center each row so the running sums stay well conditioned
+    x = samples - samples.mean(axis=1, keepdims=True)
+    zeros = np.zeros((n_groups, 1))
+    s1 = np.hstack([zeros, np.cumsum(x, axis=1)])
+    s2 = np.hstack([zeros, np.cumsum(x * x, axis=1)])
+
+    # ssd[g, i, j] = within-class sum of squares for points i..j
+    i = np.arange(n_points)[:, None]
+    j = np.arange(n_points)[None, :]
+    size = np.maximum(j - i + 1, 1)
+    seg1 = s1[:, None, 1:] - s1[:, :-1, None]
+    seg2 = s2[:, None, 1:] - s2[:, :-1, None]
+    ssd = np.where(i <= j, seg2 - seg1 ** 2 / size, np.inf)
+
+    cost = ssd[:, 0, :]
+    starts = []
+    for _ in range(1, n_classes):
+        # The next class starts at i >= 1, after the best split of 0..i-1
+        candidates = cost[:, :-1, None] + ssd[:, 1:, :]
+        best = candidates.argmin(axis=1)
+        cost = np.take_along_axis(candidates, best[:, None, :], axis=1)[:, 0, :]
+        starts.append(best + 1)
+
+    rows = np.arange(n_groups)
+    breaks = np.empty((n_groups, n_classes - 1))
+    end = np.full(n_groups, n_points - 1)
+    for c in reversed(range(n_classes - 1)):
+        start = starts[c][rows, end]
+        breaks[:, c] = samples[rows, start - 1]
+        end = start - 1
+    return breaks
+
+
+def summarize(long, keys, n_classes=N_CLASSES):
+    """One summary row per group of `keys` over the long value table."""
+    grouped = long.groupby(keys, sort=True, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    table = grouped.size().index.to_frame(index=False)
+
+    values = long['value'].to_numpy(dtype=float)
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=len(table))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    mean = np.bincount(codes, weights=values) / counts
+    sq_dev = np.bincount(codes, weights=(values - mean[codes]) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(sq_dev / (counts - 1))
+
+    table['count'] = counts
+    table['mean'] = mean
+    table['std'] = std
+    table['min'] = sorted_values[starts]
+    table['max'] = sorted_values[starts + counts - 1]
+    table['median'] = _interpolate(sorted_values, starts, counts, [0.5])[:, 0]
+    quantiles = _interpolate(sorted_values, starts, counts, QUANTILES)
+    for q, column in zip(QUANTILES, quantiles.T):
+        table[f'q{round(q * 100):02d}'] = column
+
+    inner = np.arange(1, n_classes) / n_classes
+    table['quantile_breaks'] = list(_interpolate(sorted_values, starts, counts, inner))
+
+    # Batch groups by sample size: a group with at most JENKS_POINTS values
+    # is sampled at exactly its own values, so its breaks are exact
+    jenks = np.full((len(table), n_classes - 1), np.nan)
+    n_points = np.minimum(counts, JENKS_POINTS)
+    for size in np.unique(n_points[counts >= n_classes]):
+        same_size = np.flatnonzero((n_points == size) & (counts >= n_classes))
+        for lo in range(0, len(same_size), JENKS_BATCH):
+            batch = same_size[lo:lo + JENKS_BATCH]
+            samples = _interpolate(sorted_values, starts[batch], counts[batch],
+                                   np.linspace(0, 1, size))
+            jenks[batch] = jenks_breaks(samples, n_classes)
+    table['jenks_breaks'] = list(jenks)
+    return table
+
+
+def build_summaries(df, n_classes=N_CLASSES):
+    """(national, by_state) summary tables for an integrated frame."""
+    long = _long_values(df)
+    national = summarize(long, ['metric', 'year'], n_classes)
+    by_state = summarize(long, ['state', 'metric', 'year'], n_classes)
+    return national, by_state
+
+
+def _record(row, fields):
+    def clean(value):
+        if isinstance(value, np.ndarray):
+            return [clean(v) for v in value]
+        value = float(value)
+        if np.isnan(value):
+            return None
+        return int(value) if value.is_integer() else round(value, 4)
+    return [clean(row[field]) for field in fields]
+
+
+def _nest(table, fields, keys):
+    out = {}
+    for row in table.to_dict('records'):
+        node = out
+        for key in keys[:-1]:
+            node = node.setdefault(str(row[key]), {})
+        node[str(row[keys[-1]])] = _record(row, fields)
+    return out
+
+
+def write_summaries(df, path=SUMMARIES_FILE, n_classes=N_CLASSES):
+    """Write the JSON sidecar: per-group records are arrays in `fields` order."""
+    national, by_state = build_summaries(df, n_classes)
+    fields = STAT_FIELDS + [f'q{round(q * 100):02d}' for q in QUANTILES] + \
+        ['quantile_breaks', 'jenks_breaks']
+    sidecar = {
+        'fields': fields,
+        'quantiles': list(QUANTILES),
+        'classes': n_classes,
+        'national': _nest(national, fields, ['metric', 'year']),
+        'states': _nest(by_state, fields, ['state', 'metric', 'year']),
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    print(f"\n[OK] Summaries written to {path}: {len(national)} national and "
+          f"{len(by_state)} state groups")
+    return sidecar
@@ -0,0 +1,252 @@
+"""
+Per-county trends over the PLACES years, fitted for every county at once
+
+The integrated dataset repeats the CHR 2024 row for 2023-2024, so only the
+years that come from a PLACES release (places_file_mapping) are fitted.
+Those rows become one (counties x years x metrics) array with NaN where a
+county has no value, and every fit is a reduction over the year axis:
+
+    OLS         masked sums give each series' mean, Sxx, Sxy and Syy, so
+                slope = Sxy / Sxx and R² = Sxy² / (Sxx Syy), residuals and
+                a prediction interval from the residual variance
+    Theil-Sen   the slope of every year pair in one (counties x pairs x
+                metrics) array, median over pairs; the intercept is the
+                median of y - slope t
+
+Nothing loops over counties; cost is linear in counties, so tracts use the
+same code. A series needs MIN_POINTS observed years to be fitted. Flags:
+a year is an outlier when its OLS residual exceeds OUTLIER_Z robust
+residual scales (MAD over all of that metric's residuals), and a county's
+slope is an outlier when it is OUTLIER_Z robust z-scores from the metric's
+median slope. Projections for later years extend the chosen fit and are
+always labeled as estimates, with a PREDICTION_LEVEL interval for OLS.
+"""
+
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import profiling
+from .cache import frame_digest
+from .places import PLACES_MAPPING, places_file_mapping
+
+TRENDS_FILE = 'data/trends.json'
+TREND_YEARS = sorted(places_file_mapping)
+MIN_POINTS = 3
+OUTLIER_Z = 3.5
+PREDICTION_LEVEL = 0.95
+METHODS = ('ols', 'theil-sen')
+ESTIMATE_LABEL = 'Estimate: extrapolated trend, not observed data'
+# MAD -> standard deviation for normal data
+MAD_SCALE = 1.4826
+# Bump when the fits, flags or result layout change
+CACHE_VERSION = 1
+
+
+def series_cube(df, metrics, years=TREND_YEARS):
+    """(sorted FIPS, counties x years x metrics array) of the given years."""
+    rows = df[df['year'].isin(years)]
+    fips = np.sort(rows['fips'].unique())
+    Y = np.full((len(fips), len(years), len(metrics)), np.nan)
+    Y[np.searchsorted(fips, rows['fips']), np.searchsorted(years, rows['year'])] = \
+        rows[metrics].to_numpy(dtype=float)
+    return fips, Y
+
+
+def fit_ols(Y, t):
+    """Masked least-squares line for every (county, metric) series along axis 1."""
+    observed = ~np.isnan(Y)
+    T = np.broadcast_to(t[None, :, None], Y.shape)
+    n = observed.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_mean = np.where(observed, T, 0.0).sum(axis=1) / n
+        y_mean = np.where(observed, Y, 0.0).sum(axis=1) / n
+        dt = np.where(observed, T - t_mean[:, None], 0.0)
+        dy = np.where(observed, Y - y_mean[:, None], 0.0)
+        sxx, sxy, syy = (dt * dt).sum(axis=1), (dt * dy).sum(axis=1), (dy * dy).sum(axis=1)
+        slope = sxy / sxx
+        intercept = y_mean - slope * t_mean
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), np.nan)
+        residuals = Y - (intercept[:, None] + slope[:, None] * T)
+        scale = np.sqrt(np.nansum(residuals ** 2, axis=1) / (n - 2))
+
+    fitted = (n >= MIN_POINTS) & (sxx > 0)
+    for values in (slope, intercept, r2, scale):
+        values[~fitted] = np.nan
+    residuals[~np.broadcast_to(fitted[:, None], Y.shape)] = np.nan
+    return {'n': n, 'slope': slope, 'intercept': intercept, 'r2': r2, 'scale': scale,
+            'residuals': residuals, 't_mean': t_mean, 'sxx': sxx}
+
+
+def fit_theil_sen(Y, t):
+    """Theil-Sen slope and intercept for every series along axis 1."""
+    i, j = np.triu_indices(len(t), k=1)
+    pair_slopes = (Y[:, j] - Y[:, i]) / (t[j] - t[i])[None, :, None]
+    n = (~np.isnan(Y)).sum(axis=1)
+    with warnings.catch_warnings():
+        # All-NaN series (too few years) just come back as NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        slope = np.nanmedian(pair_slopes, axis=1)
+        intercept = np.nanmedian(Y - slope[:, None] * t[None, :, None], axis=1)
+    fitted = n >= MIN_POINTS
+    slope[~fitted] = np.nan
+    intercept[~fitted] = np.nan
+    return {'slope': slope, 'intercept': intercept}
+
+
+def _robust_z(values, axis):
+    """(values - median) / (MAD_SCALE * MAD) along `axis`, ignoring NaN."""
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        center = np.nanmedian(values, axis=axis, keepdims=True)
+        mad = MAD_SCALE * np.nanmedian(np.abs(values - center), axis=axis, keepdims=True)
+        return (values - center) / mad
+
+
+def fit_trends(df, metrics=None, years=TREND_YEARS, project=(), method='ols'):
+    """Fit every county and metric over `years` and extend the fit to `project` years.
+
+    Returns {'fips', 'metrics', 'years', 'projected', 'method', plus
+    (counties x metrics) arrays n, slope, intercept, r2, slope_robust,
+    intercept_robust, slope_outlier, the (counties x years x metrics)
+    outlier mask and (counties x projected x metrics) estimate/lo/hi}.
+    """
+    if method not in METHODS:
+        raise ValueError(f'unknown trend method {method!r}; expected one of {METHODS}')
+    from scipy import stats
+
+    requested = metrics or list(PLACES_MAPPING.values())
+    metrics = [m for m in requested if m in df.columns]
+    present = set(df['year'])
+    missing_years = [y for y in years if y not in present]
+    years = [y for y in years if y in present]
+    problems = []
+    if len(years) < MIN_POINTS:
+        problems.append(f"PLACES years {missing_years} are not in the dataset; "
+                        f"{len(years)} left, {MIN_POINTS} needed")
+    if not metrics:
+        problems.append(f"none of the metrics {requested} are in the dataset")
+    if problems:
+        raise ValueError('cannot fit trends: ' + '; '.join(problems))
+    fips, Y = series_cube(df, metrics, years)
+    t = np.asarray(years, dtype=float) - years[0]
+
+    with profiling.stage('trends.fit', rows_in=Y.shape[0], years=len(years), metrics=len(metrics)) as s:
+        ols = fit_ols(Y, t)
+        robust = fit_theil_sen(Y, t)
+        s.rows_out = int(np.isfinite(ols['slope']).sum())
+
+    # Residuals against one robust scale per metric (a 3-5 point series has no scale of its own)
+    outliers = np.abs(_robust_z(ols['residuals'].transpose(2, 0, 1).reshape(len(metrics), -1), axis=1))
+    outliers = (outliers.reshape(len(metrics), *Y.shape[:2]).transpose(1, 2, 0) > OUTLIER_Z)
+    slope_outlier = np.abs(_robust_z(ols['slope'], axis=0)) > OUTLIER_Z
+
+    fit = ols if method == 'ols' else robust
+    tp = np.asarray(project, dtype=float)[None, :, None] - years[0]
+    estimate = fit['intercept'][:, None] + fit['slope'][:, None] * tp
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = ols['n'][:, None]
+        q = stats.t.ppf(0.5 + PREDICTION_LEVEL / 2, np.maximum(n - 2, 1))
+        half = q * ols['scale'][:, None] * np.sqrt(
+            1 + 1 / n + (tp - ols['t_mean'][:, None]) ** 2 / ols['sxx'][:, None])
+    # Theil-Sen has no closed-form interval; leave it to the OLS fit
+    if method != 'ols':
+        half = np.full_like(estimate, np.nan)
+
+    return {
+        'fips': fips, 'metrics': metrics, 'years': years, 'projected': list(project), 'method': method,
+        'n': ols['n'], 'slope': ols['slope'], 'intercept': ols['intercept'], 'r2': ols['r2'],
+        'slope_robust': robust['slope'], 'intercept_robust': robust['intercept'],
+        'slope_outlier': slope_outlier, 'outliers': outliers,
+        'estimate': estimate, 'lo': estimate - half, 'hi': estimate + half,
+    }
+
+
+def load_trends(df, project=(), method='ols', cache=None):
+    """fit_trends(), reused from `cache` while the input frame is unchanged."""
+    if cache is None:
+        return fit_trends(df, project=project, method=method)
+    config = {'version': CACHE_VERSION, 'data': frame_digest(df), 'years': TREND_YEARS,
+              'project': list(project), 'method': method}
+    result, hit = cache.get_or_build('trends', [], config,
+                                     lambda: fit_trends(df, project=project, method=method))
+    if hit:
+        print("[CACHE] Dataset unchanged, reusing trend fits")
+    return result
+
+
+def trend_table(result):
+    """Long per-series table: fips, metric, n, slope, intercept, r2, robust fit and flags."""
+    n_fips, n_metrics = result['slope'].shape
+    outlier_years = np.asarray(result['years'])
+    flagged = result['outliers'].transpose(0, 2, 1).reshape(-1, len(outlier_years))
+    table = pd.DataFrame({
+        'fips': np.repeat(result['fips'], n_metrics),
+        'metric': np.tile(result['metrics'], n_fips),
+        **{key: result[key].ravel() for key in ('n', 'slope', 'intercept', 'r2', 'slope_robust',
+                                                'intercept_robust', 'slope_outlier')},
+        'outlier_years': [outlier_years[row].tolist() for row in flagged],
+    })
+    return table[table['slope'].notna() | table['slope_robust'].notna()].reset_index(drop=True)
+
+
+def projection_table(result):
+    """Long table of projected values: fips, year, metric, estimate, lo, hi, label."""
+    n_fips, n_years, n_metrics = result['estimate'].shape
+    table = pd.DataFrame({
+        'fips': np.repeat(result['fips'], n_years * n_metrics),
+        'year': np.tile(np.repeat(result['projected'], n_metrics), n_fips),
+        'metric': np.tile(result['metrics'], n_fips * n_years),
+        **{key: result[key].ravel() for key in ('estimate', 'lo', 'hi')},
+        'label': ESTIMATE_LABEL,
+    })
+    return table[table['estimate'].notna()].reset_index(drop=True)
+
+
+def _clean(values, digits):
+    return [None if v != v else round(float(v), digits) for v in values.tolist()]
+
+
+def write_trends(df, path=TRENDS_FILE, project=None, method='ols', cache=None):
+    """Write the front-end JSON: per metric, arrays in `fips` order."""
+    if project is None:
+        project = sorted(int(y) for y in df['year'].unique() if y > TREND_YEARS[-1])
+    result = load_trends(df, project=project, method=method, cache=cache)
+
+    out = {}
+    for m, metric in enumerate(result['metrics']):
+        fitted = np.isfinite(result['slope'][:, m]) | np.isfinite(result['slope_robust'][:, m])
+        if not fitted.any():
+            print(f"    {metric:22s} no county has {MIN_POINTS}+ observed years, skipped")
+            continue
+        rows, years = np.nonzero(result['outliers'][:, :, m])
+        out[metric] = {
+            'n': result['n'][:, m].tolist(),
+            'slope': _clean(result['slope'][:, m], 4),
+            'r2': _clean(result['r2'][:, m], 3),
+            'slope_robust': _clean(result['slope_robust'][:, m], 4),
+            'slope_outlier': np.flatnonzero(result['slope_outlier'][:, m]).tolist(),
+            # [county index, year] pairs
+            'outliers': [[int(r), result['years'][y]] for r, y in zip(rows, years)],
+            'estimate': {str(year): {key: _clean(result[key][:, i, m], 2) for key in ('estimate', 'lo', 'hi')}
+                         for i, year in enumerate(result['projected'])},
+        }
+        print(f"    {metric:22s} {int(fitted.sum()):,} counties fitted, "
+              f"{len(out[metric]['slope_outlier'])} slope outliers, {len(rows)} outlying years")
+
+    sidecar = {
+        'fips': result['fips'].tolist(),
+        'years': result['years'],
+        'projected': result['projected'],
+        'method': result['method'],
+        'prediction_level': PREDICTION_LEVEL,
+        'label': ESTIMATE_LABEL,
+        'metrics': out,
+    }
+    with open(path, 'w') as f:
+        json.dump(sidecar, f, separators=(',', ':'))
+    print(f"\n[OK] Trends written to {path}: {len(out)} metrics fitted over "
+          f"{result['years'][0]}-{result['years'][-1]}, estimates for {result['projected']}")
+    return sidecar
@@ -4,6 +4,20 @@
 // Global variables
 let countyData = null;
 let geoData = null;
+let summaries = null;  // Precomputed stats sidecar (python -m chr_pipeline summaries)
+let shardIndex = null;  // County time-series shard index (python -m chr_pipeline shards)
+let neighborTable = null;  // Precomputed similar counties (python -m chr_pipeline neighbors)
+const neighborRows = new Map();  // year -> Map(fips -> row in neighborTable.years[year])
+let rankingTable = null;  // Within-state ranks per year (python -m chr_pipeline rankings)
+let trendTable = null;  // Per-county PLACES trends + estimates (python -m chr_pipeline trends)
+let trendRows = null;  // Map(fips -> position in trendTable.fips)
+let spatialClusters = null;  // LISA cluster codes per metric/year (python -m chr_pipeline spatial)
+let spatialRows = null;  // Map(fips -> position in spatialClusters.fips)
+let showClusters = false;
+const CLUSTER_COLORS = { '0': '#eeeeee', '1': '#d7191c', '2': '#abd9e9', '3': '#2c7bb6', '4': '#fdae61' };
+let geometryIndex = null;  // Pre-projected geometry levels (python -m chr_pipeline geometry)
+const geometryLevels = new Map();
+let geometryZoom = null;
 let currentYear = 2024;  // 2024 data now available
 let currentMetric = 'life_expectancy';  // Default to life expectancy
 let currentState = 'all';
@@ -11,6 +25,8 @@ let svg = null;
 let projection = null;
 let path = null;
 let colorScale = null;
+let colorBreaks = null;  // { kind, breaks } behind a threshold colorScale, null when sequential
+const CLASS_BREAKS = 'jenks';  // Which summaries breaks color the map: 'jenks' or 'quantile'
 
 // Metric configurations
 const metrics = {
@@ -132,6 +148,12 @@ function setupEventListeners() {
         updateVisualization();
     });
     
+    // Hot/cold spot overlay (only shown when data/spatial.json exists)
+    d3.select('#cluster-toggle').on('change', function() {
+        showClusters = this.checked;
+        updateVisualization();
+    });
+    
     // Reset button
     d3.select('#reset-button').on('click', function() {
         resetVisualization();
@@ -142,14 +164,34 @@ async function loadData() {
     try {
         console.log('Loading data...');
         
-        // Load US counties TopoJSON
-        const us = await d3.json('https://cdn.jsdelivr.net/npm/us-atlas@3/counties-10m.json');
-        geoData = us;
+        // Prefer pre-projected geometry; otherwise project the US counties TopoJSON here
+        geometryIndex = await d3.json('data/geometry/index.json').catch(() => null);
+        if (geometryIndex) {
+            await loadGeometryLevel(geometryIndex.levels[0]);
+        } else {
+            const us = await d3.json('https://cdn.jsdelivr.net/npm/us-atlas@3/counties-10m.json');
+            geoData = us;
+        }
         
         // For now, load sample data (you'll replace this with actual County Health Rankings data)
         // This is a placeholder structure
         countyData = await loadCountyHealthData();
         
+        // Optional: precomputed per-year/metric/state statistics
+        summaries = await d3.json('data/summaries.json').catch(() => null);
+        shardIndex = await d3.json('data/shards/index.json').catch(() => null);
+        neighborTable = await d3.json('data/neighbors.json').catch(() => null);
+        rankingTable = await d3.json('data/rankings.json').catch(() => null);
+        trendTable = await d3.json('data/trends.json').catch(() => null);
+        if (trendTable) {
+            trendRows = new Map(trendTable.fips.map((f, i) => [f, i]));
+        }
+        spatialClusters = await d3.json('data/spatial.json').catch(() => null);
+        if (spatialClusters) {
+            spatialRows = new Map(spatialClusters.fips.map((f, i) => [f, i]));
+            d3.select('#cluster-control').style('display', null);
+        }
+        
         console.log('Data loaded successfully');
         
         // Initialize the map
@@ -223,24 +265,67 @@ async function loadCountyHealthData() {
     }
 }
 
+async function loadGeometryLevel(level) {
+    if (!geometryLevels.has(level.zoom)) {
+        geometryLevels.set(level.zoom, await d3.json(`data/geometry/${level.file}`));
+    }
+    return geometryLevels.get(level.zoom);
+}
+
+function drawGeometry(geometry) {
+    svg.select('.counties')
+        .selectAll('path')
+        .data(Object.keys(geometry.counties).map(id => ({ id })), d => d.id)
+        .join('path')
+        .attr('class', 'county')
+        .attr('d', d => geometry.counties[d.id]);
+    
+    svg.select('.states')
+        .selectAll('path')
+        .data([geometry.states])
+        .join('path')
+        .attr('class', 'state-boundary')
+        .attr('d', d => d);
+}
+
+async function selectGeometryLevel(k) {
+    // Finest level whose zoom factor has been reached
+    const level = geometryIndex.levels.filter(l => l.zoom <= k).pop() || geometryIndex.levels[0];
+    if (level.zoom === geometryZoom) return;
+    
+    geometryZoom = level.zoom;
+    const geometry = await loadGeometryLevel(level);
+    if (level.zoom === geometryZoom) {
+        drawGeometry(geometry);
+    }
+}
+
 function initializeMap() {
     // Set up SVG
     svg = d3.select('#map-svg');
     const width = svg.node().getBoundingClientRect().width;
     const height = 600;
     
-    // Set up projection
-    projection = d3.geoAlbersUsa()
-        .scale(width * 1.3)
-        .translate([width / 2, height / 2]);
-    
-    path = d3.geoPath().projection(projection);
+    if (geometryIndex) {
+        // Geometry is already projected into this frame
+        svg.attr('viewBox', geometryIndex.viewBox.join(' '));
+    } else {
+        // Set up projection
+        projection = d3.geoAlbersUsa()
+            .scale(width * 1.3)
+            .translate([width / 2, height / 2]);
+        
+        path = d3.geoPath().projection(projection);
+    }
     
     // Add zoom behavior
     const zoom = d3.zoom()
         .scaleExtent([1, 8])
         .on('zoom', (event) => {
             svg.selectAll('g').attr('transform', event.transform);
+            if (geometryIndex) {
+                selectGeometryLevel(event.transform.k);
+            }
         });
     
     svg.call(zoom);
@@ -250,10 +335,15 @@ function initializeMap() {
     
     // Create group for state boundaries
     svg.append('g').attr('class', 'states');
+    
+    if (geometryIndex) {
+        geometryZoom = geometryIndex.levels[0].zoom;
+        drawGeometry(geometryLevels.get(geometryZoom));
+    }
 }
 
 function updateVisualization() {
-    if (!geoData || !countyData) return;
+    if ((!geoData && !geometryIndex) || !countyData) return;
     
     console.log(`Updating visualization: Year=${currentYear}, Metric=${currentMetric}, State=${currentState}`);
     
@@ -269,36 +359,63 @@ function updateVisualization() {
     // For metrics where HIGH is BAD (reverse=true), we want high values to be DARK
     // For metrics where HIGH is GOOD (reverse=false), we want high values to be DARK
     // So we always use the domain as-is, D3 interpolators go from light to dark naturally
-    colorScale = d3.scaleSequential()
-        .domain(metricConfig.domain)
-        .interpolator(metricConfig.colorScheme);
+    colorBreaks = classBreaks(currentMetric, currentYear, currentState);
+    if (colorBreaks) {
+        // One color per class, from the summaries sidecar's breaks for this view
+        colorScale = d3.scaleThreshold()
+            .domain(colorBreaks.breaks)
+            .range(d3.quantize(metricConfig.colorScheme, colorBreaks.breaks.length + 1));
+    } else {
+        colorScale = d3.scaleSequential()
+            .domain(metricConfig.domain)
+            .interpolator(metricConfig.colorScheme);
+    }
     
     // Update counties
     updateCounties(dataMap, metricConfig);
     
     // Update legend
-    updateLegend(metricConfig);
+    if (clusterCodes()) {
+        updateClusterLegend(metricConfig);
+    } else {
+        updateLegend(metricConfig);
+    }
     
     // Update insights
     updateInsights(yearData, metricConfig);
 }
 
 function updateCounties(dataMap, metricConfig) {
-    const counties = topojson.feature(geoData, geoData.objects.counties).features;
+    let countyPaths;
     
-    const countyElements = svg.select('.counties')
-        .selectAll('path')
-        .data(counties, d => d.id);
+    if (geometryIndex) {
+        // Pre-projected paths are already drawn; only the fills change
+        countyPaths = svg.select('.counties').selectAll('path');
+    } else {
+        const counties = topojson.feature(geoData, geoData.objects.counties).features;
+        
+        const countyElements = svg.select('.counties')
+            .selectAll('path')
+            .data(counties, d => d.id);
+        
+        // Enter + Update
+        countyPaths = countyElements.enter()
+            .append('path')
+            .merge(countyElements)
+            .attr('class', 'county')
+            .attr('d', path);
+    }
     
-    // Enter + Update
-    countyElements.enter()
-        .append('path')
-        .merge(countyElements)
-        .attr('class', 'county')
-        .attr('d', path)
+    const codes = clusterCodes();
+    
+    countyPaths
         .transition()
         .duration(500)
         .attr('fill', d => {
+            if (codes) {
+                const row = spatialRows.get(d.id);
+                return CLUSTER_COLORS[row === undefined ? '-' : codes[row]] || '#ccc';
+            }
             const countyData = dataMap.get(d.id);
             if (!countyData || !countyData[currentMetric]) {
                 return '#ccc';
@@ -332,7 +449,9 @@ function updateCounties(dataMap, metricConfig) {
             }
         });
     
-    // Update state boundaries
+    // Update state boundaries (pre-projected geometry draws its own)
+    if (geometryIndex) return;
+    
     const states = topojson.mesh(geoData, geoData.objects.states, (a, b) => a !== b);
     
     svg.select('.states')
@@ -356,6 +475,16 @@ function showCountyInfo(countyGeo, dataMap) {
             <p><strong>Year:</strong> ${currentYear}</p>
         `;
         
+        const rank = countyRank(countyGeo.id, countyData.state, currentMetric, currentYear);
+        if (rank) {
+            html += `<p><strong>State rank:</strong> ${rank.rank} of ${rank.of} in ${countyData.state}</p>`;
+        }
+        if (rank && rank.composite) {
+            const [, overall, lo, hi] = rank.composite;
+            html += `<p><strong>Overall health rank:</strong> ${overall} of ${rank.compositeOf} ` +
+                `(95% CI ${lo}&ndash;${hi})</p>`;
+        }
+        
         // Show additional metrics
         if (countyData.life_expectancy && currentMetric !== 'life_expectancy') {
             html += `<p><strong>Life Expectancy:</strong> ${metrics.life_expectancy.format(countyData.life_expectancy)}</p>`;
@@ -363,12 +492,79 @@ function showCountyInfo(countyGeo, dataMap) {
         if (countyData.median_income && currentMetric !== 'median_income') {
             html += `<p><strong>Median Income:</strong> ${metrics.median_income.format(countyData.median_income)}</p>`;
         }
+        
+        const codes = clusterCodes();
+        const row = codes && spatialRows.get(countyGeo.id);
+        if (codes && row !== undefined && codes[row] !== '-') {
+            html += `<p><strong>Spatial cluster:</strong> ${spatialClusters.classes[codes[row]]}</p>`;
+        }
+        
+        const similar = similarCounties(countyGeo.id, currentYear, 5);
+        if (similar.length) {
+            const names = similar
+                .map(fips => dataMap.get(fips))
+                .filter(d => d)
+                .map(d => `${d.county}, ${d.state}`);
+            html += `<p><strong>Similar counties:</strong> ${names.join('; ')}</p>`;
+        }
     }
     
     d3.select('#county-info').html(html);
 }
 
+function countyRank(fips, state, metric, year) {
+    // Lookup only: ranks and state group sizes are precomputed per year
+    const table = rankingTable && rankingTable.years[year];
+    const column = rankingTable ? rankingTable.metrics.indexOf(metric) : -1;
+    if (!table || column < 0 || !table.rank[fips] || !table.of[state]) return null;
+    const rank = table.rank[fips][column];
+    if (rank === null) return null;
+    const sizes = table.of[state];
+    return {
+        rank,
+        of: sizes[column],
+        composite: table.composite[fips] || null,
+        compositeOf: sizes[sizes.length - 1]
+    };
+}
+
+function clusterCodes() {
+    // One character per county in spatialClusters.fips order, or null when off/unavailable
+    if (!showClusters || !spatialClusters) return null;
+    const record = spatialClusters.metrics[currentMetric] && spatialClusters.metrics[currentMetric][currentYear];
+    return record ? record.clusters : null;
+}
+
+function similarCounties(fips, year, limit) {
+    // Lookup only: the neighbor table is precomputed per year
+    const table = neighborTable && neighborTable.years[year];
+    if (!table) return [];
+    if (!neighborRows.has(year)) {
+        neighborRows.set(year, new Map(table.fips.map((f, i) => [f, i])));
+    }
+    const row = neighborRows.get(year).get(fips);
+    if (row === undefined) return [];
+    return table.neighbors[row].slice(0, limit).map(i => table.fips[i]);
+}
+
+function classBreaks(metric, year, state) {
+    const stats = lookupSummary(metric, year, state);
+    if (!stats) return null;
+    
+    // Jenks needs at least as many counties as classes; fall back to quantiles
+    for (const kind of [CLASS_BREAKS, 'quantile']) {
+        const breaks = stats[`${kind}_breaks`];
+        if (breaks && breaks.length && breaks.every(b => b !== null)) return { kind, breaks };
+    }
+    return null;
+}
+
 function updateLegend(metricConfig) {
+    if (colorBreaks) {
+        updateClassLegend(metricConfig);
+        return;
+    }
+    
     const legendSvg = d3.select('#legend-svg');
     legendSvg.selectAll('*').remove();
     
@@ -424,21 +620,114 @@ function updateLegend(metricConfig) {
         .text(metricConfig.name);
 }
 
-function updateInsights(yearData, metricConfig) {
-    // Calculate basic statistics
+function updateClassLegend(metricConfig) {
+    const legendSvg = d3.select('#legend-svg');
+    legendSvg.selectAll('*').remove();
+    
+    const width = legendSvg.node().getBoundingClientRect().width;
+    const margin = { top: 30, right: 100, bottom: 30, left: 100 };
+    const legendWidth = width - margin.left - margin.right;
+    const legendHeight = 20;
+    
+    const g = legendSvg.append('g')
+        .attr('transform', `translate(${margin.left}, ${margin.top})`);
+    
+    // Equal-width swatches, one per class, with the breaks between them
+    const colors = colorScale.range();
+    const swatch = legendWidth / colors.length;
+    g.selectAll('rect')
+        .data(colors)
+        .enter()
+        .append('rect')
+        .attr('x', (d, i) => i * swatch)
+        .attr('width', swatch)
+        .attr('height', legendHeight)
+        .style('fill', d => d);
+    
+    const legendScale = d3.scalePoint()
+        .domain(d3.range(1, colors.length))
+        .range([swatch, legendWidth - swatch]);
+    
+    const legendAxis = d3.axisBottom(legendScale)
+        .tickFormat(i => metricConfig.format(colorBreaks.breaks[i - 1]));
+    
+    g.append('g')
+        .attr('transform', `translate(0, ${legendHeight})`)
+        .call(legendAxis);
+    
+    g.append('text')
+        .attr('x', legendWidth / 2)
+        .attr('y', -5)
+        .attr('text-anchor', 'middle')
+        .style('font-weight', 'bold')
+        .text(`${metricConfig.name} (${colorBreaks.kind === 'jenks' ? 'natural breaks' : 'quantiles'})`);
+}
+
+function updateClusterLegend(metricConfig) {
+    const legendSvg = d3.select('#legend-svg');
+    legendSvg.selectAll('*').remove();
+    
+    const record = spatialClusters.metrics[currentMetric][currentYear];
+    const g = legendSvg.append('g')
+        .attr('transform', 'translate(20, 30)');
+    
+    g.append('text')
+        .attr('y', -10)
+        .style('font-weight', 'bold')
+        .text(`${metricConfig.name}: Moran's I = ${record.I.toFixed(3)} (p = ${record.p})`);
+    
+    Object.entries(spatialClusters.classes).forEach(([code, label], i) => {
+        const item = g.append('g')
+            .attr('transform', `translate(${i * 170}, 10)`);
+        item.append('rect')
+            .attr('width', 16)
+            .attr('height', 16)
+            .style('fill', CLUSTER_COLORS[code])
+            .style('stroke', '#999');
+        item.append('text')
+            .attr('x', 22)
+            .attr('y', 13)
+            .text(label);
+    });
+}
+
+function lookupSummary(metric, year, state) {
+    if (!summaries) return null;
+    
+    const scope = state === 'all' ? summaries.national : (summaries.states[state] || {});
+    const record = scope[metric] && scope[metric][year];
+    if (!record) return null;
+    
+    // Records are arrays in summaries.fields order
+    return Object.fromEntries(summaries.fields.map((field, i) => [field, record[i]]));
+}
+
+function computeSummary(yearData) {
     const values = yearData
         .map(d => d[currentMetric])
         .filter(v => v !== null && !isNaN(v));
     
-    if (values.length === 0) {
+    if (values.length === 0) return null;
+    
+    return {
+        count: values.length,
+        mean: d3.mean(values),
+        median: d3.median(values),
+        min: d3.min(values),
+        max: d3.max(values)
+    };
+}
+
+function updateInsights(yearData, metricConfig) {
+    // Use precomputed statistics when available, otherwise calculate them
+    const stats = lookupSummary(currentMetric, currentYear, currentState) || computeSummary(yearData);
+    
+    if (!stats) {
         d3.select('#insights-content').html('<p>No data available for the selected filters.</p>');
         return;
     }
     
-    const mean = d3.mean(values);
-    const median = d3.median(values);
-    const min = d3.min(values);
-    const max = d3.max(values);
+    const { count, mean, median, min, max } = stats;
     
     const html = `
         <p><strong>${metricConfig.name}</strong> statistics for <strong>${currentYear}</strong>:</p>
@@ -446,7 +735,7 @@ function updateInsights(yearData, metricConfig) {
             <li><strong>Mean:</strong> ${metricConfig.format(mean)}</li>
             <li><strong>Median:</strong> ${metricConfig.format(median)}</li>
             <li><strong>Range:</strong> ${metricConfig.format(min)} to ${metricConfig.format(max)}</li>
-            <li><strong>Counties with data:</strong> ${values.length.toLocaleString()}</li>
+            <li><strong>Counties with data:</strong> ${count.toLocaleString()}</li>
         </ul>
         <p>Use the controls above to explore different health metrics, years, and states.</p>
     `;
@@ -518,13 +807,56 @@ function hideCountyModal() {
     selectedCountyFips = null;
 }
 
-function updateModalMetrics() {
-    if (!selectedCountyFips || !countyData) return;
+const countySeriesCache = new Map();
+
+async function loadCountySeries(fips) {
+    if (!shardIndex || !shardIndex.counties[fips]) return null;
+    if (countySeriesCache.has(fips)) return countySeriesCache.get(fips);
+    
+    // Fetch just this county's record from its state shard
+    const [shard, offset] = shardIndex.counties[fips];
+    const length = shardIndex.record_bytes;
+    const response = await fetch(`data/shards/${shard}.bin`, {
+        headers: { Range: `bytes=${offset}-${offset + length - 1}` }
+    }).catch(() => null);
+    if (!response || !response.ok) return null;
+    
+    let buffer = await response.arrayBuffer();
+    if (response.status !== 206) {
+        // Server ignored the Range header and sent the whole shard
+        buffer = buffer.slice(offset, offset + length);
+    }
+    
+    // Record layout: years x metrics, little-endian float32, NaN = missing
+    const view = new DataView(buffer);
+    const nMetrics = shardIndex.metrics.length;
+    const series = new Map(shardIndex.years.map((year, i) => {
+        const row = {};
+        shardIndex.metrics.forEach((metric, j) => {
+            const value = view.getFloat32((i * nMetrics + j) * 4, true);
+            row[metric] = isNaN(value) ? null : value;
+        });
+        return [year, row];
+    }));
+    
+    countySeriesCache.set(fips, series);
+    return series;
+}
+
+async function updateModalMetrics() {
+    if (!selectedCountyFips) return;
+    
+    const fips = selectedCountyFips;
+    const year = modalYear;
+    const series = await loadCountySeries(fips);
+    
+    // Ignore responses that arrive after the selection has moved on
+    if (fips !== selectedCountyFips || year !== modalYear) return;
     
     // Find data for the selected county and year
-    const countyYearData = countyData.find(d => 
-        d.fips === selectedCountyFips && d.year === modalYear
-    );
+    const countyYearData = series
+        ? series.get(year)
+        : countyData && countyData.find(d => d.fips === fips && d.year === year);
     
     if (!countyYearData) {
         d3.select('#modal-metrics-container').html('<p style="color: #999; text-align: center;">No data available for this year</p>');
@@ -566,9 +898,39 @@ function updateModalMetrics() {
         row.append('div')
             .attr('class', value != null ? 'metric-value' : 'metric-value na')
             .text(value != null ? metricConfig.format(value) : 'N/A');
+        
+        const trend = describeTrend(fips, metric.key, year, metricConfig);
+        if (trend) {
+            row.append('div')
+                .attr('class', 'metric-trend')
+                .attr('title', trend.title)
+                .html(trend.html);
+        }
     });
 }
 
+function describeTrend(fips, metric, year, metricConfig) {
+    // Fitted slope over the PLACES years; in later years also the extrapolated estimate
+    const record = trendTable && trendTable.metrics[metric];
+    const row = trendRows && trendRows.get(fips);
+    if (!record || row === undefined || record.slope[row] === null) return null;
+    
+    const slope = record.slope[row];
+    const first = trendTable.years[0];
+    const last = trendTable.years[trendTable.years.length - 1];
+    let html = `Trend ${first}&ndash;${last}: ${slope >= 0 ? '+' : ''}${slope.toFixed(2)}/yr` +
+        (record.r2[row] !== null ? ` (R² ${record.r2[row].toFixed(2)})` : '');
+    
+    const projected = record.estimate[year];
+    if (projected && projected.estimate[row] !== null) {
+        const { estimate, lo, hi } = projected;
+        html += `<br><em>Estimate: ${metricConfig.format(estimate[row])}` +
+            (lo[row] !== null ? ` (${metricConfig.format(lo[row])}&ndash;${metricConfig.format(hi[row])})` : '') +
+            '</em>';
+    }
+    return { html, title: trendTable.label };
+}
+
 // Set up modal event listeners
 function setupModalListeners() {
     // Close button
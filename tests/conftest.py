@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def dataset():
+    """Small integrated frame: three counties in two states over three years."""
+    rng = np.random.default_rng(0)
+    fips = ['01001', '01003', '02020']
+    years = [2022, 2023, 2024]
+    df = pd.DataFrame({
+        'fips': np.repeat(fips, len(years)),
+        'county': np.repeat(['Autauga', 'Baldwin', 'Anchorage'], len(years)),
+        'state': np.repeat(['Alabama', 'Alabama', 'Alaska'], len(years)),
+        'year': np.tile(years, len(fips)),
+    })
+    # CHR-only metric repeated every year, PLACES-style metric varying by year
+    df['life_expectancy'] = np.repeat([75.5, 78.25, 79.0], len(years))
+    df['diabetes'] = rng.uniform(5, 15, size=len(df)).round(2)
+    df.loc[4, 'diabetes'] = np.nan
+    return df
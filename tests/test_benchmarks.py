@@ -0,0 +1,36 @@
+import pandas as pd
+
+from benchmarks import run, synthetic
+from chr_pipeline import converter, places
+
+
+def test_synthetic_inputs_go_through_convert_and_integrate(tmp_path):
+    workbook, file_mapping, rows = synthetic.generate(str(tmp_path), n_counties=60, n_years=2)
+    chr_df = converter.convert(workbook)
+    assert len(chr_df) == 60
+    assert chr_df['fips'].str.len().eq(5).all()
+    assert sorted(file_mapping) == [synthetic.FIRST_DATA_YEAR, synthetic.FIRST_DATA_YEAR + 1]
+    for data_year, (_, path) in file_mapping.items():
+        assert len(pd.read_csv(path)) == rows[data_year]
+    combined = places.integrate(places.chr_baseline(chr_df), file_mapping)
+    assert set(places.PLACES_MAPPING.values()) <= set(combined.columns)
+
+
+def test_plan_stages_adds_untimed_prerequisites():
+    assert run.plan_stages(['figures']) == [('convert', False), ('integrate', False), ('figures', True)]
+    assert run.plan_stages(['write', 'convert']) == [('convert', True), ('integrate', False), ('write', True)]
+
+
+def point(**seconds):
+    return {'counties': 100, 'years': 2, 'measures': 7, 'jobs': 1,
+            'stages': {stage: {'seconds': s} for stage, s in seconds.items()}}
+
+
+def test_compare_flags_only_slowdowns_past_tolerance():
+    baseline = {'points': [point(convert=1.0, integrate=2.0, write=0.0)]}
+    results = {'points': [point(convert=1.1, integrate=3.0, write=0.5, figures=9.0),
+                          dict(point(convert=50.0), counties=200)]}
+    regressions = run.compare(results, baseline, tolerance=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith('integrate at 100 counties')
+    assert '(1.50x)' in regressions[0]
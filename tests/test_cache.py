@@ -0,0 +1,64 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from chr_pipeline.cache import BuildCache, config_digest
+
+
+def test_get_or_build_hits_until_config_changes(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {'rows': [1, 2, 3]}
+
+    assert cache.get_or_build('x', [], {'v': 1}, build) == ({'rows': [1, 2, 3]}, False)
+    assert BuildCache(str(tmp_path)).get_or_build('x', [], {'v': 1}, build) == ({'rows': [1, 2, 3]}, True)
+    assert cache.get_or_build('x', [], {'v': 2}, build)[1] is False
+    assert len(calls) == 2
+
+
+def test_source_change_misses(tmp_path):
+    source = tmp_path / 'source.txt'
+    source.write_text('a')
+    cache = BuildCache(str(tmp_path / 'cache'))
+    cache.get_or_build('x', [str(source)], None, lambda: 1)
+    source.write_text('bb')
+    assert cache.get_or_build('x', [str(source)], None, lambda: 2) == (2, False)
+
+
+def test_corrupt_entry_is_dropped_with_its_file(tmp_path):
+    cache = BuildCache(str(tmp_path))
+    cache.get_or_build('x', [], None, lambda: [1])
+    (key,) = cache.entries
+    with open(cache._path(key), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+    cache.save()
+    assert key not in BuildCache(str(tmp_path)).entries
+
+
+def test_eviction_keeps_budget_and_newest(tmp_path):
+    cache = BuildCache(str(tmp_path), max_bytes=1)
+    cache.get_or_build('a', [], None, lambda: 'a' * 100)
+    cache.get_or_build('b', [], None, lambda: 'b' * 100)
+    (entry,) = cache.entries.values()
+    assert entry['label'] == 'b'
+    assert len([f for f in os.listdir(tmp_path) if f.endswith('.pkl')]) == 1
+
+
+def _fill(root, worker):
+    cache = BuildCache(root)
+    for i in range(10):
+        cache.get_or_build(f'{worker}-{i}', [], {'worker': worker, 'i': i}, lambda: list(range(100)))
+
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_fill, [str(tmp_path)] * 4, range(4)))
+    with open(tmp_path / 'manifest.json') as f:
+        entries = json.load(f)['entries']
+    assert len(entries) == 40
+    assert config_digest({'label': '0-0', 'sources': [], 'config': {'worker': 0, 'i': 0}}) in entries
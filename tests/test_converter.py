@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from chr_pipeline.converter import _map_metrics, normalize_fips
+
+
+def test_normalize_fips():
+    result = normalize_fips(['01001', 1001, 1001.0, ' 24510 ', '6037', 'abc', None, '123456', '35013.0'])
+    assert result.tolist()[:5] == ['01001', '01001', '01001', '24510', '06037']
+    assert result[5:8].isna().all()
+    assert result[8] == '35013'
+    assert pd.isna(normalize_fips([float('nan')])[0])
+
+
+def test_duplicate_fips_keeps_last_non_empty_value():
+    select = pd.DataFrame({'FIPS': ['01000', '01001', '01003'], 'County': [None, 'Autauga', 'Baldwin'],
+                           'State': 'Alabama', '% Fair or Poor Health': [20.0, 18.0, 16.0]})
+    select['fips'] = normalize_fips(select['FIPS'])
+    # 01001 appears twice; the later row lacks life expectancy but has a newer income
+    additional = pd.DataFrame({'FIPS': ['01001', '01003', '01001'],
+                               'Life Expectancy': [76.5, 79.0, np.nan],
+                               'Median Household Income': [60000, 65000, 61000]})
+    additional['fips'] = normalize_fips(additional['FIPS'])
+    df = _map_metrics(select, additional).set_index('fips')
+    assert df.index.tolist() == ['01001', '01003']
+    assert df.loc['01001', 'life_expectancy'] == 76.5
+    assert df.loc['01001', 'median_income'] == 61000
+    assert df.loc['01003', 'life_expectancy'] == 79.0
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chr_pipeline import correlations
+
+
+def frame(seed=0, rows=120, metrics=5, states=('AA', 'BB', 'CC')):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, metrics))
+    values[:, 1] += values[:, 0]
+    # Ties, so average ranks matter
+    values[:, 2] = np.round(values[:, 2])
+    df = pd.DataFrame(values, columns=[f'm{i}' for i in range(metrics)])
+    df['year'] = rng.choice([2020, 2021], size=rows)
+    df['state'] = rng.choice(states, size=rows)
+    df['fips'] = [f'{i:05d}' for i in range(rows)]
+    return df
+
+
+def reference(df, result, method):
+    metrics = result['metrics']
+    for index, group in result['groups'].iterrows():
+        rows = df['year'] == group['year']
+        if group['state'] is not None:
+            rows &= df['state'] == group['state']
+        expected = df.loc[rows, metrics].corr(method, min_periods=correlations.MIN_PAIRS)
+        yield result[method][index], expected.to_numpy()
+
+
+def test_spearman_matches_pandas_with_shared_missingness():
+    df = frame()
+    # Whole rows missing: every pair has the same complete rows
+    df.loc[df.index % 7 == 0, ['m0', 'm1', 'm2', 'm3', 'm4']] = np.nan
+    result = correlations.correlate(df, metrics=['m0', 'm1', 'm2', 'm3', 'm4'])
+    for got, expected in reference(df, result, 'spearman'):
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+
+
+def test_spearman_matches_pandas_with_different_missingness():
+    df = frame(seed=1)
+    rng = np.random.default_rng(2)
+    for column in ['m0', 'm1', 'm2', 'm3']:
+        df.loc[rng.random(len(df)) < 0.2, column] = np.nan
+    # m4 shares m3's pattern
+    df.loc[df['m3'].isna(), 'm4'] = np.nan
+    result = correlations.correlate(df, metrics=['m0', 'm1', 'm2', 'm3', 'm4'])
+    for got, expected in reference(df, result, 'spearman'):
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+
+
+def test_spearman_cross_pattern_differs_from_marginal_ranks():
+    # y is monotone in x on the shared rows; x's extra rows make its marginal ranks 1, 3, 5, 6
+    x = np.array([1.0, 3.0, 5.0, 7.0, 2.0, 4.0])
+    y = np.array([1.0, 2.0, 3.0, 4.0, np.nan, np.nan])
+    values = np.column_stack([x, y])
+    rho = correlations.pairwise_spearman(values, np.zeros(len(x), dtype=np.int64), 1)
+    assert rho[0, 0, 1] == 1.0
+
+
+def test_pearson_matches_pandas_per_group():
+    df = frame(seed=3)
+    rng = np.random.default_rng(4)
+    for column in ['m0', 'm1', 'm3']:
+        df.loc[rng.random(len(df)) < 0.25, column] = np.nan
+    result = correlations.correlate(df, metrics=['m0', 'm1', 'm2', 'm3', 'm4'])
+    for got, expected in reference(df, result, 'pearson'):
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-12)
+
+
+def test_pairwise_pearson_counts_and_min_pairs():
+    X = np.array([[1.0, 2.0], [2.0, np.nan], [3.0, 7.0], [4.0, 1.0]])
+    r, n = correlations.pairwise_pearson(X, min_pairs=3)
+    np.testing.assert_array_equal(n, [[4, 3], [3, 3]])
+    expected = np.corrcoef(X[[0, 2, 3], 0], X[[0, 2, 3], 1])[0, 1]
+    assert r[0, 1] == pytest.approx(expected)
+    r, _ = correlations.pairwise_pearson(X, min_pairs=4)
+    assert np.isnan(r[0, 1]) and r[0, 0] == pytest.approx(1.0)
+
+
+def test_spearman_chunks_agree_with_one_batch(monkeypatch):
+    df = frame(seed=5, rows=300)
+    rng = np.random.default_rng(6)
+    for column in ['m0', 'm2', 'm4']:
+        df.loc[rng.random(len(df)) < 0.3, column] = np.nan
+    metrics = ['m0', 'm1', 'm2', 'm3', 'm4']
+    whole = correlations.correlate(df, metrics=metrics)
+    monkeypatch.setattr(correlations, 'BATCH_ELEMENTS', 1)
+    chunked = correlations.correlate(df, metrics=metrics)
+    np.testing.assert_array_equal(chunked['spearman'], whole['spearman'])
+    np.testing.assert_array_equal(chunked['n'], whole['n'])
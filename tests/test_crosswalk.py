@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from chr_pipeline.crosswalk import Crosswalk, normalize_names
+
+# Reference names as they appear in the CHR workbook
+REFERENCE = pd.DataFrame([
+    ('24005', 'Baltimore', 'MD'),
+    ('24510', 'Baltimore City', 'MD'),
+    ('29189', 'St. Louis', 'MO'),
+    ('29510', 'St. Louis City', 'MO'),
+    ('35013', 'Dona Ana', 'NM'),
+    ('51059', 'Fairfax', 'VA'),
+    ('51600', 'Fairfax City', 'VA'),
+    ('51510', 'Alexandria City', 'VA'),
+    ('22071', 'Orleans', 'LA'),
+    ('02020', 'Anchorage', 'AK'),
+    ('24033', "Prince George's", 'MD'),
+], columns=['fips', 'name', 'state'])
+
+
+@pytest.fixture(scope='module')
+def crosswalk():
+    return Crosswalk.build(REFERENCE['fips'], REFERENCE['name'], REFERENCE['state'])
+
+
+@pytest.mark.parametrize('name, state, fips', [
+    ('Baltimore', 'MD', '24005'),
+    ('Baltimore County', 'MD', '24005'),
+    ('Baltimore city', 'MD', '24510'),
+    ('St. Louis', 'MO', '29189'),
+    ('Saint Louis County', 'MO', '29189'),
+    ('St. Louis city', 'MO', '29510'),
+    ('Doña Ana', 'NM', '35013'),
+    ('Dona Ana County', 'NM', '35013'),
+    ('Fairfax', 'VA', '51059'),
+    ('Fairfax city', 'VA', '51600'),
+    ('Alexandria', 'VA', '51510'),
+    ('Orleans Parish', 'LA', '22071'),
+    ('Anchorage Municipality', 'AK', '02020'),
+    ('Prince Georges', 'md', '24033'),
+])
+def test_lookup(crosswalk, name, state, fips):
+    assert crosswalk.lookup([name], [state]).tolist() == [fips]
+
+
+def test_wrong_state_or_unknown_name_does_not_match(crosswalk):
+    result = crosswalk.lookup(['Baltimore', 'Nowhere', None], ['MO', 'MD', 'MD'])
+    assert result.isna().all()
+
+
+def test_core_name_shared_by_two_counties_is_ambiguous(crosswalk):
+    assert 'MD|baltimore' in crosswalk.ambiguous
+    assert 'VA|fairfax' in crosswalk.ambiguous
+
+
+def test_normalize_names():
+    assert normalize_names(["Prince George's", 'De Kalb', 'Ste. Genevieve', 'Doña Ana']).tolist() == \
+        ['prince georges', 'de kalb', 'ste genevieve', 'dona ana']
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from chr_pipeline.cube import MetricCube, build_cube
+
+
+def test_cube_round_trip(dataset, tmp_path):
+    build_cube(dataset, str(tmp_path))
+    cube = MetricCube(str(tmp_path))
+    assert cube.shape == (3, 3, 2)
+    for row in dataset.itertuples(index=False):
+        for metric in ('life_expectancy', 'diabetes'):
+            expected = getattr(row, metric)
+            if np.isnan(expected):
+                assert np.isnan(cube.get(row.fips, row.year, metric))
+                assert not cube.has(row.fips, row.year, metric)
+            else:
+                # Stored as float32
+                assert cube.get(row.fips, row.year, metric) == pytest.approx(expected, rel=1e-6)
+    np.testing.assert_array_equal(cube.year_metric(2024, 'life_expectancy'), [75.5, 78.25, 79.0])
@@ -0,0 +1,61 @@
+import json
+
+from chr_pipeline.figures import MANIFEST, FigureSpec, plan_jobs, run_jobs
+
+
+def draw(df, path, year, scope):
+    with open(path, 'w') as f:
+        f.write(f'{scope} {year} {len(df)}')
+
+
+def nothing_to_draw(df, path, year, scope):
+    print('   nothing to draw')
+
+
+def fail(df, path, year, scope):
+    raise RuntimeError('broken')
+
+
+def statuses(results):
+    return sorted((r['path'].rsplit('/', 1)[-1], r['status']) for r in results)
+
+
+def test_jobs_render_skip_and_fail(dataset, tmp_path):
+    specs = [FigureSpec('drawn', draw, ['diabetes']), FigureSpec('skipped', nothing_to_draw, ['diabetes']),
+             FigureSpec('failed', fail, ['diabetes'])]
+    jobs = plan_jobs(dataset, specs, [2024], [None], str(tmp_path), flat=True)
+    assert statuses(run_jobs(jobs, str(tmp_path))) == [
+        ('drawn.png', 'rendered'), ('failed.png', 'failed'), ('skipped.png', 'skipped')]
+    with open(tmp_path / MANIFEST) as f:
+        assert list(json.load(f)) == ['drawn.png']
+
+    # Only the rendered figure counts as done; the others are retried
+    assert statuses(run_jobs(jobs, str(tmp_path))) == [
+        ('drawn.png', 'unchanged'), ('failed.png', 'failed'), ('skipped.png', 'skipped')]
+
+
+def test_changed_input_rerenders(dataset, tmp_path):
+    specs = [FigureSpec('drawn', draw, ['diabetes'])]
+    run_jobs(plan_jobs(dataset, specs, [2024], [None], str(tmp_path), flat=True), str(tmp_path))
+    changed = dataset.assign(diabetes=dataset['diabetes'] + 1)
+    results = run_jobs(plan_jobs(changed, specs, [2024], [None], str(tmp_path), flat=True), str(tmp_path))
+    assert statuses(results) == [('drawn.png', 'rendered')]
+
+
+def test_stale_png_is_not_reported_as_rendered(dataset, tmp_path):
+    run_jobs(plan_jobs(dataset, [FigureSpec('figure', draw, ['diabetes'])], [2024], [None],
+                       str(tmp_path), flat=True), str(tmp_path))
+    specs = [FigureSpec('figure', nothing_to_draw, ['diabetes'], version=2)]
+    results = run_jobs(plan_jobs(dataset, specs, [2024], [None], str(tmp_path), flat=True), str(tmp_path))
+    assert statuses(results) == [('figure.png', 'skipped')]
+
+
+def test_changed_key_rerenders(dataset, tmp_path):
+    def plan(model):
+        specs = [FigureSpec('drawn', draw, ['diabetes'], key=lambda data: model)]
+        return plan_jobs(dataset, specs, [2024], [None], str(tmp_path), flat=True)
+
+    run_jobs(plan('model-a'), str(tmp_path))
+    assert statuses(run_jobs(plan('model-a'), str(tmp_path))) == [('drawn.png', 'unchanged')]
+    # Same rows, different stored model: the figure is stale
+    assert statuses(run_jobs(plan('model-b'), str(tmp_path))) == [('drawn.png', 'rendered')]
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from chr_pipeline import geometry
+from chr_pipeline.cache import file_digest
+
+
+def test_dp_importance_keeps_ends_and_nests():
+    points = np.array([[0, 0], [1, 0.1], [2, -0.1], [3, 5], [4, 6], [5, 7], [6, 0]], dtype=float)
+    weight = geometry.dp_importance(points)
+    assert np.isinf(weight[[0, -1]]).all()
+    # The farthest vertex from the chord is the most important interior one
+    assert weight[1:-1].argmax() + 1 == 5 and weight[5] == pytest.approx(7.0)
+    # Coarser tolerances keep a subset of finer ones
+    for fine, coarse in [(0.05, 0.5), (0.5, 2.0)]:
+        assert set(np.flatnonzero(weight >= coarse)) <= set(np.flatnonzero(weight >= fine))
+
+
+def test_fetch_topology_records_then_verifies_checksum(tmp_path):
+    source = tmp_path / 'source.json'
+    source.write_text('{"type": "Topology"}')
+    target = tmp_path / 'geo' / 'counties.json'
+
+    geometry.fetch_topology(str(target), source.as_uri())
+    assert target.read_text() == source.read_text()
+    recorded = (tmp_path / 'geo' / 'counties.json.sha256').read_text().split()[0]
+    assert recorded == file_digest(str(source))
+    assert geometry.topology_problem(str(target)) is None
+
+    # A changed upstream file no longer matches the recorded hash
+    target.write_text('{"type": "Topology", "changed": true}')
+    assert 'SHA-256' in geometry.topology_problem(str(target))
+    source.write_text('tampered')
+    with pytest.raises(ValueError, match='SHA-256 mismatch'):
+        geometry.fetch_topology(str(target), source.as_uri())
+    assert not list((tmp_path / 'geo').glob('*.tmp'))
+
+
+def test_missing_topology_is_reported(tmp_path):
+    assert 'not found' in geometry.topology_problem(str(tmp_path / 'missing.json'))
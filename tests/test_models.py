@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+
+from chr_pipeline import models  # noqa: E402
+
+PARAMS = dict(forest={'n_estimators': 10, 'random_state': 0}, folds=3, repeats=2)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 60
+    df = pd.DataFrame({'fips': [f'01{i:03d}' for i in range(n)], 'state': 'Alabama', 'year': 2024})
+    for feature in models.FEATURE_SETS['all']:
+        df[feature] = rng.normal(size=n)
+    df[models.TARGET] = 75 + 3 * df['median_income'] + rng.normal(scale=0.5, size=n)
+    return df
+
+
+def test_train_all_stores_and_reuses(frame, tmp_path):
+    feature_sets = {'all': models.FEATURE_SETS['all']}
+    first = models.train_all(frame, feature_sets=feature_sets, out_dir=str(tmp_path), workers=1, **PARAMS)
+    assert first['status'].tolist() == ['trained']
+    second = models.train_all(frame, feature_sets=feature_sets, out_dir=str(tmp_path), workers=1, **PARAMS)
+    assert second['status'].tolist() == ['reused']
+    assert second['key'].tolist() == first['key'].tolist()
+
+    importance = pd.read_csv(tmp_path / 'importance.csv').set_index('feature')
+    assert importance['permutation_mean'].idxmax() == 'median_income'
+
+
+def test_stored_result_is_found_by_key(frame, tmp_path):
+    features = models.FEATURE_SETS['all']
+    data = frame[features + [models.TARGET]].dropna().reset_index(drop=True)
+    key = models.model_key(data, features, **PARAMS)
+    assert models.load_result(key, str(tmp_path)) is None
+    trained = models.fit_cached(data, features, str(tmp_path), **PARAMS)
+    stored = models.load_result(key, str(tmp_path))
+    assert trained['key'] == key and stored['cv_r2'] == trained['cv_r2']
+    assert len(stored['cv_r2']) == PARAMS['folds']
+
+
+def test_fit_cached_trains_once(frame, tmp_path):
+    features = models.FEATURE_SETS['all']
+    data = frame[features + [models.TARGET]].dropna().reset_index(drop=True)
+    trained = models.fit_cached(data, features, str(tmp_path), **PARAMS)
+    reused = models.fit_cached(data, features, str(tmp_path), **PARAMS)
+    assert (trained['status'], reused['status']) == ('trained', 'reused')
+    assert reused['key'] == trained['key'] and reused['cv_r2'] == trained['cv_r2']
+    # Other rows are another model
+    other = models.fit_cached(data.iloc[:-1], features, str(tmp_path), **PARAMS)
+    assert other['status'] == 'trained' and other['key'] != trained['key']
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('sklearn')
+
+from chr_pipeline import neighbors  # noqa: E402
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    z = rng.normal(size=(300, 6))
+    indices, distances = neighbors.nearest(z, k=5, batch=64)
+    full = np.sqrt(((z[:, None] - z[None]) ** 2).sum(axis=2))
+    np.fill_diagonal(full, np.inf)
+    expected = np.argsort(full, axis=1)[:, :5]
+    np.testing.assert_array_equal(indices, expected)
+    np.testing.assert_allclose(distances, np.take_along_axis(full, expected, axis=1))
+
+
+def test_nearest_never_returns_self_with_duplicates():
+    z = np.zeros((4, 2))
+    indices, distances = neighbors.nearest(z, k=3)
+    assert not (indices == np.arange(4)[:, None]).any()
+    assert (distances == 0).all()
+
+
+def test_standardize_drops_sparse_metrics_and_counties():
+    df = pd.DataFrame({
+        'a': [1.0, 2.0, 3.0, 4.0],
+        'b': [1.0, np.nan, 3.0, np.nan],  # 50% coverage: dropped
+        'c': [2.0, 4.0, np.nan, 8.0],
+    })
+    keep, used, z = neighbors.standardize(df, ['a', 'b', 'c'])
+    assert used == ['a', 'c']
+    assert keep.all()
+    # Missing values sit at the mean
+    assert z[2, 1] == 0
+    np.testing.assert_allclose(z.mean(axis=0), 0, atol=1e-12)
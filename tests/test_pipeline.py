@@ -0,0 +1,13 @@
+from benchmarks import synthetic
+from chr_pipeline import pipeline
+
+
+def test_parallel_run_writes_the_same_bytes_as_serial(tmp_path):
+    workbook, file_mapping, _ = synthetic.generate(str(tmp_path / 'inputs'), n_counties=80, n_years=3)
+    outputs = {}
+    for jobs in (1, 2):
+        outputs[jobs] = tmp_path / f'jobs{jobs}.csv'
+        pipeline.run(workbook, file_mapping, output=str(outputs[jobs]), jobs=jobs)
+    serial = outputs[1].read_bytes()
+    assert len(serial.splitlines()) > 80
+    assert outputs[2].read_bytes() == serial
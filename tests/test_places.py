@@ -0,0 +1,54 @@
+import pandas as pd
+
+from chr_pipeline import places
+
+ROWS = [
+    # Year, Measure, LocationID, LocationName, StateAbbr, Data_Value
+    (2021, 'Diagnosed diabetes among adults', '1001', 'Autauga', 'AL', 12.3),
+    (2021, 'Obesity among adults', '1001', 'Autauga', 'AL', 30.1),
+    (2020, 'Diagnosed diabetes among adults', '1001', 'Autauga', 'AL', 99.0),
+    (2021, 'Some unmapped measure', '1001', 'Autauga', 'AL', 1.0),
+    (2021, 'Diagnosed diabetes among adults', '2020', 'Anchorage', 'AK', 8.7),
+    (2021, 'Obesity among adults', '2020', 'Anchorage', 'AK', 31.4),
+]
+
+
+def write_release(path):
+    df = pd.DataFrame(ROWS, columns=places.PLACES_COLUMNS)
+    df['Category'] = 'Health Outcomes'  # unused columns are skipped
+    df.to_csv(path, index=False)
+
+
+def test_chunked_read_filters_year_and_measures(tmp_path):
+    path = tmp_path / 'release.csv'
+    write_release(path)
+    whole = places.read_places_release(path, 2021)
+    chunked = places.read_places_release(path, 2021, chunksize=2)
+    pd.testing.assert_frame_equal(whole, chunked)
+    assert len(chunked) == 4
+    assert set(chunked['Measure'].astype(str)) == {'Diagnosed diabetes among adults', 'Obesity among adults'}
+
+
+def test_pivot_is_one_row_per_county_with_exact_values(tmp_path):
+    path = tmp_path / 'release.csv'
+    write_release(path)
+    rows, pivot = places.load_release(2021, path)
+    pivot = pivot.set_index('fips')
+    assert rows == 4
+    assert sorted(pivot.index) == ['01001', '02020']
+    # float32 storage does not leak into the values (30.1 stays 30.1)
+    assert pivot.loc['01001', 'adult_obesity'] == 30.1
+    assert pivot.loc['02020', 'diabetes'] == 8.7
+
+
+def test_release_without_matching_rows_reads_empty(tmp_path):
+    header_only = tmp_path / 'header_only.csv'
+    pd.DataFrame(columns=places.PLACES_COLUMNS).to_csv(header_only, index=False)
+    filtered_out = tmp_path / 'release.csv'
+    write_release(filtered_out)
+    for df in (places.read_places_release(header_only, 2021),
+               places.read_places_release(filtered_out, 2019, chunksize=2)):
+        assert len(df) == 0
+        assert list(df.columns) == [c for c in places.PLACES_COLUMNS if c != 'Year']
+        assert df['Measure'].dtype == places.MEASURE_DTYPE
+        assert df['Data_Value'].dtype == 'float32'
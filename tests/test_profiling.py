@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from chr_pipeline import profiling
+
+
+@pytest.fixture
+def profiler():
+    if not profiling._reset_peak():
+        pytest.skip('RSS high-water mark cannot be reset here')
+    yield profiling.enable()
+    profiling.disable()
+
+
+def peaks(profiler):
+    return {r['name']: r['peak_mem_delta_mb'] for r in profiler.records}
+
+
+def test_parent_keeps_peak_reached_before_child(profiler):
+    with profiling.stage('outer'):
+        block = np.ones(25_000_000)
+        del block
+        with profiling.stage('inner'):
+            pass
+    assert peaks(profiler)['outer'] > 150
+
+
+def test_parent_includes_child_peak(profiler):
+    with profiling.stage('outer'):
+        with profiling.stage('inner'):
+            block = np.ones(25_000_000)
+            del block
+    result = peaks(profiler)
+    assert result['inner'] > 150
+    assert result['outer'] >= result['inner']
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chr_pipeline import rankings
+
+
+def frame():
+    return pd.DataFrame({
+        'fips': ['01001', '01003', '01005', '01007', '02010', '02020'],
+        'county': list('ABCDEF'),
+        'state': ['Alabama'] * 4 + ['Alaska'] * 2,
+        'year': 2024,
+        'life_expectancy': [78.0, 80.0, 80.0, np.nan, 70.0, 75.0],
+        'adult_smoking': [20.0, 10.0, 15.0, 12.0, 30.0, 25.0],
+    })
+
+
+def test_metric_ranks_follow_direction_within_state():
+    df = frame()
+    rank, count, percentile = rankings.metric_ranks(df, ['life_expectancy', 'adult_smoking'])
+    # Higher life expectancy is better; ties share the best rank; missing is unranked
+    assert rank['life_expectancy'].tolist()[:3] == [3, 1, 1]
+    assert np.isnan(rank['life_expectancy'][3])
+    assert count['life_expectancy'].tolist()[:3] == [3, 3, 3]
+    # Lower smoking is better
+    assert rank['adult_smoking'].tolist() == [4, 1, 3, 2, 2, 1]
+    assert percentile['adult_smoking'].tolist() == [25, 100, 50, 75, 50, 100]
+
+
+def test_rank_table_rejects_metric_without_direction():
+    df = frame().assign(new_metric=1.0)
+    with pytest.raises(ValueError, match='new_metric'):
+        rankings.rank_table(df, resamples=10)
+
+
+def test_composite_ci_brackets_rank_by_construction():
+    # Every metric orders the counties the same way, so every resample ranks them alike
+    n = 5
+    quality = np.arange(n, 0, -1, dtype=float)
+    df = pd.DataFrame({
+        'fips': [f'01{i:03d}' for i in range(n)], 'county': 'x', 'state': 'Alabama', 'year': 2024,
+        'life_expectancy': 70 + quality, 'adult_smoking': 30 - quality,
+        'diabetes': 20 - quality, 'uninsured': 15 - quality,
+    })
+    table = rankings.rank_table(df, resamples=200)
+    assert table['composite_rank'].tolist() == [1, 2, 3, 4, 5]
+    assert table['rank_lo'].tolist() == table['rank_hi'].tolist() == [1, 2, 3, 4, 5]
+
+    # County 0 lacks two of the four metrics. Resamples drawing only those have no
+    # composite for it: they are left out of its interval rather than ranked last,
+    # and the others are ranked among the counties that do have one
+    df.loc[0, ['diabetes', 'uninsured']] = np.nan
+    table = rankings.rank_table(df, resamples=200)
+    assert table['composite_rank'].tolist() == [1, 2, 3, 4, 5]
+    assert (table.loc[0, 'rank_lo'], table.loc[0, 'rank_hi']) == (1, 1)
+    assert table['rank_hi'].tolist() == [1, 2, 3, 4, 5]
+    assert table['rank_lo'].tolist()[1:] == [1, 2, 3, 4]
+    # Seeded: the same input gives the same intervals
+    pd.testing.assert_frame_equal(table, rankings.rank_table(df, resamples=200))
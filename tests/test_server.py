@@ -0,0 +1,115 @@
+import asyncio
+import gzip
+import json
+
+from chr_pipeline import server
+
+
+def exchange(service, raw):
+    """Send raw bytes to a throwaway server; returns everything it sent back."""
+    async def run():
+        listener = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(raw)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        return response
+
+    return asyncio.run(run())
+
+
+def request(service, raw):
+    """Send one raw HTTP request to a throwaway server; returns (status line, headers, body)."""
+    head, _, body = exchange(service, raw).partition(b'\r\n\r\n')
+    status, *lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines)
+    return status, headers, body
+
+
+def get(service, target, *headers):
+    raw = f'GET {target} HTTP/1.1\r\nConnection: close\r\n' + ''.join(h + '\r\n' for h in headers)
+    return request(service, (raw + '\r\n').encode())
+
+
+def test_metric_slice_and_etag(dataset):
+    service = server.DataService(server.ColumnarCache(dataset))
+    status, headers, body = request(
+        service, b'GET /metric/diabetes?year=2024&state=Alabama HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert status == 'HTTP/1.1 200 OK'
+    payload = json.loads(body)
+    assert payload['total'] == 2
+    assert payload['fips'] == ['01001', '01003']
+    status, _, body = request(
+        service, b'GET /metric/diabetes?year=2024&state=Alabama HTTP/1.1\r\nConnection: close\r\n'
+                 b'If-None-Match: ' + headers['ETag'].encode() + b'\r\n\r\n')
+    assert status == 'HTTP/1.1 304 Not Modified' and body == b''
+
+
+def test_unsupported_method_lists_allowed_ones(dataset):
+    service = server.DataService(server.ColumnarCache(dataset))
+    status, headers, _ = request(service, b'POST /meta HTTP/1.1\r\nConnection: close\r\n\r\n')
+    assert status == 'HTTP/1.1 405 Method Not Allowed'
+    assert headers['Allow'] == 'GET, HEAD'
+
+
+def test_version_covers_every_served_column(dataset):
+    version = server.ColumnarCache(dataset).version
+    renamed = dataset.assign(county=dataset['county'].replace('Baldwin', 'Renamed'))
+    assert server.ColumnarCache(renamed).version != version
+    assert server.ColumnarCache(dataset.sample(frac=1, random_state=0)).version == version
+
+
+def test_post_body_is_not_read_as_the_next_request(dataset):
+    service = server.DataService(server.ColumnarCache(dataset))
+    body = b'GET /county/01001 HTTP/1.1\r\n\r\n'
+    response = exchange(service, b'POST /meta HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body
+                        + b'GET /meta HTTP/1.1\r\nConnection: close\r\n\r\n')
+    statuses = [line for line in response.split(b'\r\n') if line.startswith(b'HTTP/1.1 ')]
+    assert statuses == [b'HTTP/1.1 405 Method Not Allowed', b'HTTP/1.1 200 OK']
+    assert b'"metrics"' in response and b'"fips":"01001"' not in response
+
+
+def test_unframed_body_closes_the_connection(dataset):
+    service = server.DataService(server.ColumnarCache(dataset))
+    response = exchange(service, b'POST /meta HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+                                 b'5\r\nhello\r\n0\r\n\r\n')
+    assert response.count(b'HTTP/1.1 ') == 1
+    assert b'Connection: close' in response
+
+
+def test_pagination_follows_next_links(dataset):
+    service = server.DataService(server.ColumnarCache(dataset))
+    status, _, body = get(service, '/metric/diabetes?year=2024&per_page=2')
+    first = json.loads(body)
+    assert (first['total'], first['pages'], first['page']) == (3, 2, 1)
+    assert first['fips'] == ['01001', '01003']
+    assert first['next'] == '/metric/diabetes?page=2&per_page=2&year=2024'
+    second = json.loads(get(service, first['next'])[2])
+    assert second['fips'] == ['02020'] and second['next'] is None
+
+    status, _, body = get(service, '/metric/diabetes?year=2024&per_page=0')
+    assert status == 'HTTP/1.1 400 Bad Request'
+    assert json.loads(body)['error'] == f'per_page must be between 1 and {server.MAX_PER_PAGE}'
+    status, _, body = get(service, '/metric/diabetes?year=2024&page=0')
+    assert json.loads(body)['error'] == 'page must be at least 1'
+
+
+def test_gzip_only_when_accepted_and_large_enough(dataset, monkeypatch):
+    service = server.DataService(server.ColumnarCache(dataset))
+    _, headers, plain = get(service, '/county/01001')
+    assert 'Content-Encoding' not in headers and headers['Vary'] == 'Accept-Encoding'
+    _, headers, body = get(service, '/county/01001', 'Accept-Encoding: gzip, deflate')
+    assert 'Content-Encoding' not in headers and body == plain  # under GZIP_MIN_BYTES
+
+    monkeypatch.setattr(server, 'GZIP_MIN_BYTES', 1)
+    service = server.DataService(server.ColumnarCache(dataset))
+    _, headers, body = get(service, '/county/01001', 'Accept-Encoding: gzip, deflate')
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Length'] == str(len(body))
+    assert gzip.decompress(body) == plain
+    _, headers, body = get(service, '/county/01001')
+    assert 'Content-Encoding' not in headers and body == plain
@@ -0,0 +1,14 @@
+import numpy as np
+
+from chr_pipeline import shards
+
+
+def test_read_county_returns_its_record(dataset, tmp_path):
+    index = shards.write_shards(dataset, str(tmp_path))
+    assert sorted(index['counties']) == ['01001', '01003', '02020']
+    assert {shard for shard, _ in index['counties'].values()} == {'01', '02'}
+    metrics = index['metrics']
+    for fips, rows in dataset.groupby('fips'):
+        record = shards.read_county(fips, str(tmp_path), index)
+        expected = rows.set_index('year').loc[index['years'], metrics].to_numpy(dtype=np.float32)
+        np.testing.assert_array_equal(record, expected)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+from chr_pipeline import spatial  # noqa: E402
+
+
+def grid_topology(rows, cols):
+    """TopoJSON of unit squares; neighbouring cells share one arc per edge."""
+    arcs, edges = [], {}
+
+    def edge(a, b):
+        if (b, a) in edges:
+            return ~edges[(b, a)]
+        edges[(a, b)] = len(arcs)
+        arcs.append([list(a), list(b)])
+        return edges[(a, b)]
+
+    geometries = []
+    for r in range(rows):
+        for c in range(cols):
+            corners = [(c, r), (c + 1, r), (c + 1, r + 1), (c, r + 1), (c, r)]
+            ring = [edge(a, b) for a, b in zip(corners[:-1], corners[1:])]
+            geometries.append({'type': 'Polygon', 'id': f'01{r * cols + c + 1:03d}', 'arcs': [ring]})
+    return {'type': 'Topology', 'arcs': arcs,
+            'objects': {'counties': {'type': 'GeometryCollection', 'geometries': geometries}}}
+
+
+def test_adjacency_is_rook_contiguity():
+    fips, W = spatial.build_adjacency(grid_topology(3, 3))
+    assert list(fips) == [f'01{i:03d}' for i in range(1, 10)]
+    degree = np.asarray(W.sum(axis=1)).ravel()
+    # Corners 2, edges 3, centre 4; diagonal cells are not neighbours
+    np.testing.assert_array_equal(degree, [2, 3, 2, 3, 4, 3, 2, 3, 2])
+    assert W[0, 4] == 0 and W[0, 1] == 1 and (W != W.T).nnz == 0
+
+
+def test_checkerboard_is_perfectly_dispersed():
+    fips, W = spatial.build_adjacency(grid_topology(4, 4))
+    x = np.array([(i // 4 + i % 4) % 2 for i in range(16)], dtype=float)
+    result = spatial.analyze(x, W, permutations=99)
+    assert result['I'] == pytest.approx(-1.0)
+    assert result['p'] <= 0.05
+
+
+def test_moran_matches_dense_formula():
+    fips, W = spatial.build_adjacency(grid_topology(6, 7))
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=len(fips)) + np.repeat(np.arange(6), 7)
+    x[[3, 20]] = np.nan
+    result = spatial.analyze(x, W, permutations=99)
+
+    keep = ~np.isnan(x)
+    dense = W.toarray()[keep][:, keep]
+    dense /= dense.sum(axis=1, keepdims=True)
+    z = x[keep] - x[keep].mean()
+    n = keep.sum()
+    expected = n / dense.sum() * (z @ dense @ z) / (z @ z)
+    assert result['n'] == n
+    assert result['I'] == pytest.approx(expected)
+    # Local statistics sum to n * I
+    assert np.nansum(result['local_i']) == pytest.approx(n * result['I'])
+    # A smooth north-south gradient is a significant positive cluster
+    assert result['I'] > 0.5 and result['p'] <= 0.05
+    assert (result['clusters'][~keep] == -1).all()
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from chr_pipeline.store import load_wide, write_store  # noqa: E402
+
+
+def test_store_round_trip(dataset, tmp_path):
+    write_store(dataset, str(tmp_path))
+    wide = load_wide(str(tmp_path))
+    columns = ['fips', 'county', 'state', 'year', 'life_expectancy', 'diabetes']
+    got = wide[columns].sort_values(['fips', 'year']).reset_index(drop=True)
+    expected = dataset[columns].sort_values(['fips', 'year']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, rtol=1e-6)
+
+
+def test_load_wide_year_subset(dataset, tmp_path):
+    write_store(dataset, str(tmp_path))
+    assert sorted(load_wide(str(tmp_path), years=[2023])['year'].unique()) == [2023]
@@ -0,0 +1,50 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chr_pipeline import summaries
+
+
+def brute_force_breaks(values, n_classes):
+    """Upper bound of each class but the last, over every possible split."""
+    best, best_cost = None, np.inf
+    for cuts in combinations(range(1, len(values)), n_classes - 1):
+        bounds = (0,) + cuts + (len(values),)
+        cost = sum(((values[a:b] - values[a:b].mean()) ** 2).sum() for a, b in zip(bounds, bounds[1:]))
+        if cost < best_cost:
+            best, best_cost = [values[c - 1] for c in cuts], cost
+    return best
+
+
+@pytest.mark.parametrize('n_points, n_classes', [(9, 3), (12, 4), (10, 5)])
+def test_jenks_matches_brute_force(n_points, n_classes):
+    rng = np.random.default_rng(n_points)
+    samples = np.sort(rng.lognormal(size=(6, n_points)), axis=1)
+    breaks = summaries.jenks_breaks(samples, n_classes)
+    for row, got in zip(samples, breaks):
+        np.testing.assert_allclose(got, brute_force_breaks(row, n_classes))
+
+
+def test_jenks_separates_obvious_clusters():
+    samples = np.array([[1.0, 1.1, 1.2, 5.0, 5.1, 9.0, 9.2, 9.3]])
+    np.testing.assert_allclose(summaries.jenks_breaks(samples, 3), [[1.2, 5.1]])
+
+
+def test_summarize_matches_pandas():
+    rng = np.random.default_rng(0)
+    long = pd.DataFrame({
+        'metric': rng.choice(['a', 'b'], size=500),
+        'year': rng.choice([2020, 2021, 2022], size=500),
+        'value': rng.normal(size=500),
+    })
+    table = summaries.summarize(long, ['metric', 'year'])
+    for row in table.itertuples(index=False):
+        values = long.loc[(long['metric'] == row.metric) & (long['year'] == row.year), 'value']
+        assert row.count == len(values)
+        assert row.mean == pytest.approx(values.mean())
+        assert row.std == pytest.approx(values.std())
+        assert row.median == pytest.approx(values.median())
+        assert row.q25 == pytest.approx(np.percentile(values, 25))
+        np.testing.assert_allclose(row.quantile_breaks, np.percentile(values, [20, 40, 60, 80]))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chr_pipeline import trends
+
+
+def series(seed=0, counties=40, years=5, metrics=2, missing=0.15):
+    rng = np.random.default_rng(seed)
+    t = np.arange(years, dtype=float)
+    Y = (rng.normal(size=(counties, 1, metrics)) + rng.normal(size=(counties, 1, metrics)) * t[None, :, None]
+         + rng.normal(scale=0.3, size=(counties, years, metrics)))
+    Y[rng.random(Y.shape) < missing] = np.nan
+    return t, Y
+
+
+def test_fit_ols_matches_polyfit():
+    t, Y = series()
+    fit = trends.fit_ols(Y, t)
+    for c in range(Y.shape[0]):
+        for m in range(Y.shape[2]):
+            observed = ~np.isnan(Y[c, :, m])
+            if observed.sum() < trends.MIN_POINTS:
+                assert np.isnan(fit['slope'][c, m])
+                continue
+            slope, intercept = np.polyfit(t[observed], Y[c, observed, m], 1)
+            assert fit['slope'][c, m] == pytest.approx(slope, abs=1e-10)
+            assert fit['intercept'][c, m] == pytest.approx(intercept, abs=1e-10)
+            r = np.corrcoef(t[observed], Y[c, observed, m])[0, 1]
+            assert fit['r2'][c, m] == pytest.approx(r * r, abs=1e-10)
+
+
+def test_fit_theil_sen_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    t, Y = series(seed=1)
+    fit = trends.fit_theil_sen(Y, t)
+    for c in range(Y.shape[0]):
+        for m in range(Y.shape[2]):
+            observed = ~np.isnan(Y[c, :, m])
+            if observed.sum() < trends.MIN_POINTS:
+                continue
+            slope = stats.theilslopes(Y[c, observed, m], t[observed])[0]
+            assert fit['slope'][c, m] == pytest.approx(slope, abs=1e-10)
+            # Intercept is the median residual, not scipy's median(y) - slope median(t)
+            intercept = np.median(Y[c, observed, m] - slope * t[observed])
+            assert fit['intercept'][c, m] == pytest.approx(intercept, abs=1e-10)
+
+
+def test_fit_trends_projects_a_linear_series_exactly():
+    pytest.importorskip('scipy')
+    years = trends.TREND_YEARS
+    metric = next(iter(trends.PLACES_MAPPING.values()))
+    df = pd.DataFrame({
+        'fips': np.repeat(['01001', '01003'], len(years)),
+        'year': np.tile(years, 2),
+        metric: np.concatenate([10 + 2.0 * np.arange(len(years)), 5 - 0.5 * np.arange(len(years))]),
+    })
+    result = trends.fit_trends(df, metrics=[metric], project=[years[-1] + 2])
+    np.testing.assert_allclose(result['slope'][:, 0], [2.0, -0.5])
+    np.testing.assert_allclose(result['estimate'][:, 0, 0], [10 + 2.0 * (len(years) + 1),
+                                                             5 - 0.5 * (len(years) + 1)])
+    assert not result['outliers'].any()
+
+
+def test_fit_trends_names_missing_years_and_metrics():
+    # Converter-only output: one CHR year, no PLACES measures
+    df = pd.DataFrame({'fips': ['01001', '01003'], 'year': 2024, 'life_expectancy': [75.0, 78.0]})
+    with pytest.raises(ValueError, match=r'PLACES years \[2018.*uninsured'):
+        trends.fit_trends(df)